@@ -1,6 +1,31 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import resume, jd
+from app.api.v1.endpoints import resume, jd, jobs, profiles
 
 api_router = APIRouter()
 api_router.include_router(resume.router, prefix="/resumes", tags=["resumes"])
 api_router.include_router(jd.router, prefix="/jds", tags=["job-descriptions"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
+
+# Route path -> request lane (budgets in LANE_WORKERS). Editor calls stay in "interactive"
+# so bulk, generation and export traffic cannot starve them; unlisted routes are not laned.
+ROUTE_LANES = {
+    "/resumes/score": "interactive",
+    "/resumes/sessions": "interactive",
+    "/resumes/sessions/{session_id}": "interactive",
+    "/resumes/sessions/{session_id}/sections/{section}": "interactive",
+    "/resumes/search": "interactive",
+    "/jds/analyze": "interactive",
+    "/resumes/enhance-content": "generation",
+    "/resumes/enhance-content/stream": "generation",
+    "/resumes/download-pdf": "export",
+    "/resumes/upload": "export",
+    "/resumes/score-batch": "bulk",
+    "/resumes/corpus": "bulk",
+    "/jds/analyze-batch": "bulk",
+    "/jds/taxonomy/reload": "bulk",
+}
+
+_unrouted = set(ROUTE_LANES) - {route.path for route in api_router.routes}
+if _unrouted:
+    print(f"Warning: ROUTE_LANES entries match no route: {', '.join(sorted(_unrouted))}")
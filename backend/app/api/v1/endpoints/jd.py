@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from typing import List, Optional
 from pydantic import BaseModel, Field
-from app.engines.jd_intelligence import jd_engine
+from app.core.config import settings
+from app.core.metrics import stage
+from app.core.security import header_authorized
+from app.engines.governor import EngineBusy, governor
+from app.engines.registry import engines
 
 router = APIRouter()
 
@@ -8,6 +13,12 @@ class JDAnalyzeRequest(BaseModel):
     """Request model for job description analysis."""
     text: str = Field(..., min_length=50, description="Job description text")
 
+class JDBatchAnalyzeRequest(BaseModel):
+    """Request model for bulk job description analysis."""
+    texts: List[str] = Field(..., min_length=1, description="Job description texts")
+    batch_size: int = Field(default=settings.JD_BATCH_DEFAULT_SIZE, ge=1, le=1000, description="Documents per nlp.pipe batch")
+    n_process: int = Field(default=1, ge=1, description="Worker processes for nlp.pipe")
+
 @router.post("/analyze")
 def analyze_jd(request: JDAnalyzeRequest):
     """
@@ -17,6 +28,8 @@ def analyze_jd(request: JDAnalyzeRequest):
         - Role/title
         - Primary skills required
         - Keywords for ATS optimization
+        - jd_id: send it to /resumes/score, /score-batch or /sessions
+          instead of the full jd_content
     """
     try:
         if not request.text or len(request.text.strip()) < 50:
@@ -25,9 +38,106 @@ def analyze_jd(request: JDAnalyzeRequest):
                 detail="Job description must be at least 50 characters"
             )
         
-        analysis = jd_engine.analyze(request.text)
-        return {"success": True, "data": analysis}
-    except HTTPException:
+        jd_engine = engines.get("jd_intelligence")
+        jd_store = engines.get("jd_store")
+        vectorize = engines.get("gap_analyzer").vectorize
+        taxonomy = jd_engine.skill_matcher.taxonomy.digest
+        
+        # Identical JD text (from any user) reuses the stored analysis
+        jd_id = jd_store.fingerprint(request.text)
+        entry = jd_store.get(jd_id, vectorize)
+        if entry is None or entry.taxonomy != taxonomy:
+            with governor.slot("jd_intelligence"), stage("jd_intelligence"):
+                analysis = jd_engine.analyze(request.text)
+            entry = jd_store.put(jd_id, request.text, analysis, taxonomy, vectorize)
+        return {"success": True, "data": {**entry.analysis, "jd_id": jd_id}}
+    except (HTTPException, EngineBusy):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"JD analysis failed: {str(e)}")
+
+
+@router.post("/analyze-batch")
+def analyze_jd_batch(request: JDBatchAnalyzeRequest):
+    """
+    Analyze many job descriptions in one call using spaCy's nlp.pipe.
+    
+    Results are returned in input order, each with its jd_id. Texts shorter
+    than 50 characters are not analyzed and get an error entry instead;
+    texts already in the JD cache are not re-analyzed.
+    """
+    try:
+        if len(request.texts) > settings.JD_BATCH_MAX_DOCS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.JD_BATCH_MAX_DOCS} job descriptions per batch"
+            )
+        if request.n_process > settings.JD_BATCH_MAX_PROCESSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"n_process cannot exceed {settings.JD_BATCH_MAX_PROCESSES}"
+            )
+        
+        valid = [i for i, t in enumerate(request.texts) if t and len(t.strip()) >= 50]
+        jd_engine = engines.get("jd_intelligence")
+        jd_store = engines.get("jd_store")
+        vectorize = engines.get("gap_analyzer").vectorize
+        taxonomy = jd_engine.skill_matcher.taxonomy.digest
+        
+        results = [
+            {"success": False, "error": "Job description must be at least 50 characters"}
+            for _ in request.texts
+        ]
+        # Only texts without a current stored analysis go through nlp.pipe
+        jd_ids = {i: jd_store.fingerprint(request.texts[i]) for i in valid}
+        pending = []
+        for i in valid:
+            entry = jd_store.get(jd_ids[i], vectorize)
+            if entry is None or entry.taxonomy != taxonomy:
+                pending.append(i)
+            else:
+                results[i] = {"success": True, "data": {**entry.analysis, "jd_id": jd_ids[i]}}
+        
+        analyses = []
+        if pending:
+            # The whole batch holds one slot while nlp.pipe runs
+            with governor.slot("jd_intelligence"), stage("jd_intelligence.batch"):
+                analyses = jd_engine.analyze_many(
+                    (request.texts[i] for i in pending),
+                    batch_size=request.batch_size,
+                    n_process=request.n_process
+                )
+        for i, analysis in zip(pending, analyses):
+            jd_store.put(jd_ids[i], request.texts[i], analysis, taxonomy, vectorize)
+            results[i] = {"success": True, "data": {**analysis, "jd_id": jd_ids[i]}}
+        
+        return {"success": True, "count": len(results), "data": results}
+    except (HTTPException, EngineBusy):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch JD analysis failed: {str(e)}")
+
+
+@router.get("/taxonomy")
+def taxonomy_info():
+    """Report the loaded skill taxonomy (source, version, size, build time)."""
+    return {"success": True, "data": engines.get("jd_intelligence").skill_matcher.stats()}
+
+
+@router.post("/taxonomy/reload")
+def reload_taxonomy(if_modified: bool = False, x_admin_key: Optional[str] = Header(default=None)):
+    """
+    Reload the skill taxonomy file and recompile the matcher without a restart.
+    
+    Requires an X-Admin-Key header equal to SECRET_KEY. With if_modified=true
+    the matcher is only rebuilt when the file changed since the last build.
+    In-flight requests keep using the previous matcher until the swap completes.
+    """
+    if not header_authorized(x_admin_key):
+        raise HTTPException(status_code=403, detail="Send X-Admin-Key with the server's SECRET_KEY to reload the taxonomy")
+    try:
+        skill_matcher = engines.get("jd_intelligence").skill_matcher
+        reloaded = skill_matcher.reload_if_modified() if if_modified else bool(skill_matcher.reload())
+        return {"success": True, "data": {"reloaded": reloaded, **skill_matcher.stats()}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Taxonomy reload failed: {str(e)}")
@@ -0,0 +1,216 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, Literal
+from pydantic import BaseModel, Field, ValidationError
+from app.core.config import settings
+from app.core.jobs import job_queue, JobDeferred, TERMINAL_STATES
+from app.engines.governor import governor
+from app.engines.registry import engines
+from app.engines.pdf_service import PDFQueueFull
+from app.api.v1.endpoints.resume import (
+    ContentEnhanceRequest,
+    ResumeAnalysisRequest,
+    ResumeContent,
+    analyze_resume,
+    iter_file,
+)
+import asyncio
+import json
+import os
+import time
+
+router = APIRouter()
+
+# How often the SSE stream polls the job table, and how often it sends keep-alives
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15.0
+
+# A pdf job waits this long for a render slot before going back to the queue
+PDF_JOB_MAX_WAIT_SECONDS = 30.0
+
+JOB_PAYLOAD_MODELS = {
+    "enhance": ContentEnhanceRequest,
+    "score": ResumeAnalysisRequest,
+    "pdf": ResumeContent,
+}
+
+class JobCreateRequest(BaseModel):
+    """Request model for submitting an asynchronous job."""
+    kind: Literal["enhance", "score", "pdf"] = Field(..., description="Operation to run")
+    payload: Dict[str, Any] = Field(..., description="Same body the synchronous endpoint accepts")
+
+
+def run_enhance_job(payload: dict, report_progress) -> dict:
+    request = ContentEnhanceRequest.model_validate(payload)
+    # Jobs share the engine's slots with the API but queue instead of being shed
+    with governor.slot("content_generator", shed=False):
+        variants = engines.get("content_generator").enhance_bullet(request.text, request.jd_context, preset=request.preset)
+    return {"variants": variants}
+
+def run_score_job(payload: dict, report_progress) -> dict:
+    request = ResumeAnalysisRequest.model_validate(payload)
+    try:
+        return analyze_resume(request.resume_content, request, report_progress)
+    except HTTPException as e:
+        # e.g. a jd_id that expired while the job was queued
+        raise ValueError(e.detail)
+
+def run_pdf_job(payload: dict, report_progress) -> dict:
+    resume = ResumeContent.model_validate(payload)
+    pdf_cache = engines.get("pdf_cache")
+    key = pdf_cache.key_for(resume.content)
+    
+    pdf_file = pdf_cache.open(key)
+    if pdf_file is None:
+        report_progress(0.1)
+        # Jobs are not latency-bound: wait out a short backlog, then give the worker back
+        deadline = time.monotonic() + PDF_JOB_MAX_WAIT_SECONDS
+        while True:
+            try:
+                pdf_bytes = engines.get("pdf_renderer").render(resume.content)
+                break
+            except PDFQueueFull as e:
+                if time.monotonic() + e.retry_after > deadline:
+                    raise JobDeferred("PDF renderer is busy", e.retry_after)
+                time.sleep(e.retry_after)
+        pdf_file = pdf_cache.put(key, pdf_bytes)
+    
+    with pdf_file:
+        size = os.fstat(pdf_file.fileno()).st_size
+    return {"etag": key, "size": size, "title": resume.title}
+
+job_queue.register("enhance", run_enhance_job)
+job_queue.register("score", run_score_job)
+job_queue.register("pdf", run_pdf_job)
+
+
+def _job_view(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "attempts": job["attempts"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+def _get_job_or_404(job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (unknown or expired)")
+    return job
+
+
+@router.post("", status_code=202)
+def create_job(request: JobCreateRequest):
+    """
+    Submit an enhance, score or pdf job.
+    
+    The payload is validated up front with the same model as the matching
+    synchronous endpoint. Returns the job ID immediately; poll
+    GET /jobs/{id} or stream GET /jobs/{id}/events for progress.
+    """
+    try:
+        JOB_PAYLOAD_MODELS[request.kind].model_validate(request.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    
+    job_id = job_queue.submit(request.kind, request.payload)
+    return {
+        "success": True,
+        "data": {
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"{settings.API_V1_STR}/jobs/{job_id}",
+            "events_url": f"{settings.API_V1_STR}/jobs/{job_id}/events"
+        }
+    }
+
+
+@router.get("/stats")
+def job_stats():
+    """Report job counts by status and this process's worker pool."""
+    return {"success": True, "data": job_queue.stats()}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """Poll a job's status, progress and (once finished) its result."""
+    return {"success": True, "data": _job_view(_get_job_or_404(job_id))}
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Fetch a finished job's output.
+    
+    PDF jobs stream the rendered file; other kinds return their JSON result.
+    """
+    job = _get_job_or_404(job_id)
+    if job["status"] not in TERMINAL_STATES:
+        return JSONResponse(status_code=202, content={"success": False, "status": job["status"], "progress": job["progress"]})
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job['error']}")
+    
+    if job["kind"] != "pdf":
+        return {"success": True, "data": job["result"]}
+    
+    result = job["result"]
+    pdf_file = engines.get("pdf_cache").open(result["etag"])
+    if pdf_file is None:
+        raise HTTPException(status_code=410, detail="PDF has been evicted from the cache; submit the job again")
+    return StreamingResponse(
+        iter_file(pdf_file),
+        media_type="application/pdf",
+        headers={
+            "ETag": f'"{result["etag"]}"',
+            "Content-Length": str(result["size"]),
+            "Content-Disposition": f"attachment; filename={result['title']}.pdf"
+        }
+    )
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Stream job progress as Server-Sent Events.
+    
+    Emits a `progress` event whenever status or progress changes and a final
+    `done` event with the result or error, then closes the stream.
+    """
+    await run_in_threadpool(_get_job_or_404, job_id)
+    
+    async def event_stream():
+        last = None
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            job = await run_in_threadpool(job_queue.get, job_id)
+            if job is None:
+                yield "event: error\ndata: {\"detail\": \"Job expired\"}\n\n"
+                return
+            
+            view = _job_view(job)
+            state = (view["status"], view["progress"])
+            if view["status"] in TERMINAL_STATES:
+                yield f"event: done\ndata: {json.dumps(view)}\n\n"
+                return
+            if state != last:
+                last = state
+                last_sent = time.monotonic()
+                yield f"event: progress\ndata: {json.dumps({'status': view['status'], 'progress': view['progress']})}\n\n"
+            elif time.monotonic() - last_sent > EVENT_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
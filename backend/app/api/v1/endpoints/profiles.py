@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import Literal, Optional
+from app.core.config import settings
+from app.core.profiler import list_profiles, profile_path
+from app.core.security import header_authorized
+
+router = APIRouter()
+
+
+def _require_profile_key(x_profile: Optional[str]):
+    # Profiles expose code paths and request timings; same key that turns profiling on
+    if not header_authorized(x_profile):
+        raise HTTPException(status_code=403, detail="Send X-Profile with the server's SECRET_KEY to access profiles")
+
+
+@router.get("")
+def get_profiles(limit: int = 50, x_profile: Optional[str] = Header(default=None)):
+    """
+    List recent request profiles, newest first.
+
+    Each entry carries the route, status, duration, sample count and the
+    engine stages the samples were tagged with.
+    """
+    _require_profile_key(x_profile)
+    profiles = list_profiles(settings.PROFILE_DIR)
+    return {"success": True, "count": len(profiles), "data": profiles[:max(0, limit)]}
+
+
+@router.get("/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: Literal["speedscope", "folded"] = "speedscope",
+    x_profile: Optional[str] = Header(default=None)
+):
+    """
+    Download one profile.
+
+    `speedscope` opens directly in https://www.speedscope.app; `folded`
+    stacks feed flamegraph.pl or inferno to render an SVG flamegraph.
+    """
+    _require_profile_key(x_profile)
+    path = profile_path(settings.PROFILE_DIR, profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
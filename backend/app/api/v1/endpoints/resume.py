@@ -1,42 +1,166 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, List, Literal, Optional
 from pydantic import BaseModel, Field
-from app.engines.content_generator import content_generator
-from app.engines.ats_scorer import ats_scorer
-from app.engines.gap_analyzer import gap_analyzer
-from app.engines.interviewer_simulator import interviewer_simulator
-from app.engines.pdf_generator import pdf_generator
-from fastapi.responses import StreamingResponse
-import io
+from app.core.config import settings
+from app.core.metrics import stage
+from app.engines.governor import EngineBusy, governor
+from app.engines.registry import engines
+from app.engines.resume_document import ResumeDocument
+from app.engines.resume_text import jd_to_text
+from app.engines.pdf_service import PDFQueueFull
+from app.engines.process_pool import WorkerLost
+from app.engines.scoring_session import SessionConflict
+from app.engines.resume_parser import (
+    DocumentTooLarge, ParserQueueFull, ParseTimeout, UnreadableDocument, UnsupportedDocument
+)
+from fastapi.responses import Response, StreamingResponse
+from starlette.formparsers import MultiPartParser
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile
+import numpy as np
+import asyncio
+import json
+import threading
+import os
 
 router = APIRouter()
 
+# Missing keywords listed per ranked resume in /score-batch
+MAX_MISSING_KEYWORDS = 10
+# Upper bound on top_k for /search
+MAX_SEARCH_RESULTS = 500
+# Multipart boundaries and part headers allowed on top of UPLOAD_MAX_BYTES
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["file"],
+            "properties": {"file": {"type": "string", "format": "binary", "description": "PDF or DOCX resume"}},
+        }}},
+    }
+}
+
 class ResumeContent(BaseModel):
     """Resume content for PDF generation."""
     content: dict = Field(..., description="Resume data structure")
     title: str = Field(default="Resume", description="Resume title for filename")
 
-class ResumeAnalysisRequest(BaseModel):
+class JDReference(BaseModel):
+    """A job description given either by jd_id (from /jds/analyze) or as the full payload."""
+    jd_id: Optional[str] = Field(default=None, description="jd_id returned by /jds/analyze")
+    jd_content: Optional[dict] = Field(default=None, description="Job description data")
+
+class ResumeAnalysisRequest(JDReference):
     """Request model for resume analysis."""
     resume_content: dict = Field(..., description="Complete resume data")
-    jd_content: dict = Field(..., description="Job description data")
+
+class BatchResume(BaseModel):
+    """One resume in a bulk ranking request."""
+    id: Optional[str] = Field(default=None, description="Caller identifier echoed back in results")
+    resume_content: dict = Field(..., description="Complete resume data")
+
+class ResumeBatchScoreRequest(JDReference):
+    """Request model for ranking many resumes against one job description."""
+    resumes: List[BatchResume] = Field(..., min_length=1, description="Resumes to rank")
+    top_k: Optional[int] = Field(default=None, ge=1, description="Only return the best k resumes")
+
+class CorpusResume(BaseModel):
+    """One resume to store in the searchable corpus."""
+    id: Optional[str] = Field(default=None, description="Resume ID; an existing ID is replaced, omitted generates one")
+    resume_content: dict = Field(..., description="Complete resume data")
+
+class CorpusIngestRequest(BaseModel):
+    """Request model for adding resumes to the corpus."""
+    resumes: List[CorpusResume] = Field(..., min_length=1, description="Resumes to add or replace")
+
+class ResumeSearchRequest(JDReference):
+    """Request model for searching the corpus with a job description."""
+    jd_text: Optional[str] = Field(default=None, description="Raw job description text (instead of jd_id/jd_content)")
+    top_k: int = Field(default=20, ge=1, le=MAX_SEARCH_RESULTS, description="Number of candidates to return")
+    skills: List[str] = Field(default=[], description="Only return resumes listing all of these skills")
+    facets: int = Field(default=0, ge=0, le=100, description="Also count the top N skills among all matches")
+    include_content: bool = Field(default=False, description="Return each candidate's resume content")
 
 class ContentEnhanceRequest(BaseModel):
     """Request model for AI content enhancement."""
     text: str = Field(..., min_length=10, max_length=500, description="Text to enhance")
     jd_context: dict = Field(default={}, description="Job description context")
+    preset: Optional[Literal["heuristic", "fast", "balanced", "quality"]] = Field(
+        default=None, description="Generation latency tier (defaults to ENHANCE_DEFAULT_PRESET)"
+    )
+
+class ScoringSessionCreateRequest(JDReference):
+    """Request model for starting a live-editing scoring session."""
+    resume_content: dict = Field(..., description="Complete resume data")
+
+class SectionUpdateRequest(BaseModel):
+    """New content for one top-level resume section."""
+    content: Any = Field(default=None, description="Section value; null removes the section")
+
+
+def resolve_jd(jd: JDReference):
+    """
+    Return (jd_content, jd_vector) for a request carrying jd_id or jd_content.
+    
+    A jd_id is served from the JD cache with its precomputed vector; raises
+    404 when it is unknown or expired so the client can re-analyze the JD.
+    """
+    gap_analyzer = engines.get("gap_analyzer")
+    if jd.jd_id:
+        entry = engines.get("jd_store").get(jd.jd_id, gap_analyzer.vectorize)
+        if entry is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Unknown or expired jd_id; analyze the job description again via /jds/analyze"
+            )
+        return entry.content, entry.vector
+    if not jd.jd_content:
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    return jd.jd_content, gap_analyzer.vectorize(jd_to_text(jd.jd_content))
 
-def dict_to_text(data: dict) -> str:
-    """Convert resume dict to clean plain text for NLP analysis."""
-    parts = []
-    for key, value in data.items():
-        if isinstance(value, list):
-            parts.extend([str(v) for v in value])
-        elif isinstance(value, dict):
-            parts.append(dict_to_text(value))
-        elif value:
-            parts.append(str(value))
-    return " ".join(parts)
+def semantic_matcher(document: ResumeDocument, resume_terms):
+    """Embed the resume's terms and listed skills once; None when semantic matching is disabled."""
+    skill_embeddings = engines.get("skill_embeddings")
+    if not skill_embeddings.enabled:
+        return None
+    with stage("skill_embeddings"):
+        return skill_embeddings.matcher(list(resume_terms) + list(document.skills))
+
+def analyze_resume(resume_content: dict, jd: JDReference, report_progress=None) -> dict:
+    """Run the gap, ATS and interviewer engines; shared by /score and score jobs."""
+    gap_analyzer = engines.get("gap_analyzer")
+    jd_content, jd_vec = resolve_jd(jd)
+    # Parsed once; every engine below reads the same cached text, counts and skills
+    document = ResumeDocument.of(resume_content)
+    
+    # Run analysis pipeline
+    with stage("gap_analyzer"):
+        resume_vec = gap_analyzer.vectorize_resume(document)
+        semantic_match = semantic_matcher(document, document.counts.keys())
+        gaps = gap_analyzer.compare(jd_vec, resume_vec, semantic_match)
+    if report_progress:
+        report_progress(0.5)
+    return score_with_gaps(document, jd_content, gaps, semantic_match)
+
+def score_with_gaps(document: ResumeDocument, jd_content: dict, gaps: dict, semantic_match=None) -> dict:
+    """Run the ATS and interviewer engines on an already computed gap analysis."""
+    ats_scorer = engines.get("ats_scorer")
+    interviewer_simulator = engines.get("interviewer_simulator")
+    
+    with stage("ats_scorer"):
+        score_data = ats_scorer.score_resume(document, jd_content, gaps, semantic_match)
+    with stage("interviewer_simulator"):
+        scan_simulation = interviewer_simulator.simulate_scan(document)
+    
+    return {
+        "ats_score": score_data,
+        "gap_analysis": gaps,
+        "interviewer_simulation": scan_simulation
+    }
 
 @router.post("/enhance-content")
 def enhance_content(request: ContentEnhanceRequest):
@@ -46,12 +170,108 @@ def enhance_content(request: ContentEnhanceRequest):
     Returns 3 AI-generated variants of the input text optimized for ATS.
     """
     try:
-        variants = content_generator.enhance_bullet(request.text, request.jd_context)
+        content_generator = engines.get("content_generator")
+        with governor.slot("content_generator"), stage("content_generator"):
+            variants = content_generator.enhance_bullet(request.text, request.jd_context, preset=request.preset)
         return {"success": True, "variants": variants}
+    except EngineBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content enhancement failed: {str(e)}")
 
 
+@router.post("/enhance-content/stream")
+async def enhance_content_stream(request: ContentEnhanceRequest):
+    """
+    Stream AI-enhanced variants as Server-Sent Events.
+    
+    Emits `token` events while a variant decodes (fast preset), a `variant`
+    event as each variant completes, and a final `done` event with all
+    variants. Generation is cancelled if the client disconnects.
+    """
+    content_generator = await run_in_threadpool(engines.get, "content_generator")
+    # Admission happens before the response starts so an overloaded engine still gets a 429/503
+    release = await run_in_threadpool(governor.acquire, "content_generator")
+    cancel = threading.Event()
+    producing = threading.Event()
+    
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        
+        def produce():
+            # Runs on its own thread; hands events back to the event loop as they are produced
+            try:
+                with stage("content_generator"):
+                    for event in content_generator.stream_bullet(
+                        request.text, request.jd_context, preset=request.preset, cancel=cancel
+                    ):
+                        loop.call_soon_threadsafe(events.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(
+                    events.put_nowait, {"event": "error", "detail": f"Content enhancement failed: {str(e)}"}
+                )
+            finally:
+                release()
+                loop.call_soon_threadsafe(events.put_nowait, None)
+        
+        producing.set()
+        threading.Thread(target=produce, name="enhance-stream", daemon=True).start()
+        variants = []
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    if not cancel.is_set():
+                        yield f"event: done\ndata: {json.dumps({'variants': variants})}\n\n"
+                    return
+                name = event.pop("event")
+                if name == "variant":
+                    variants.append(event["text"])
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+                if name == "error":
+                    return
+        finally:
+            # Reached on normal completion and when the response is cancelled by a disconnect
+            cancel.set()
+    
+    def release_if_unstarted():
+        # A client that disconnects before the body starts never runs produce()
+        if not producing.is_set():
+            release()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_if_unstarted)
+    )
+
+
+@router.get("/enhance-content/stats")
+def enhance_content_stats():
+    """
+    Report runtime statistics for the content generator.
+    
+    Includes admission control (concurrency slots, queue depth, shed
+    requests), micro-batching (batch-size distribution, queue-wait timings)
+    and result cache counters (hits, misses, evictions).
+    """
+    admission = governor.stats().get("content_generator")
+    content_generator = engines.peek("content_generator")
+    if content_generator is None:
+        return {"success": True, "data": {"loaded": False, "admission": admission}}
+    return {
+        "success": True,
+        "data": {
+            "loaded": True,
+            "admission": admission,
+            "batching": content_generator.batch_stats(),
+            "cache": content_generator.cache_stats()
+        }
+    }
+
+
 @router.post("/score")
 def score_resume(request: ResumeAnalysisRequest):
     """
@@ -66,51 +286,384 @@ def score_resume(request: ResumeAnalysisRequest):
         # Validate inputs
         if not request.resume_content:
             raise HTTPException(status_code=400, detail="Resume content cannot be empty")
-        if not request.jd_content:
-            raise HTTPException(status_code=400, detail="Job description cannot be empty")
         
-        # Convert nested dict payloads into clean text for NLP analysis
-        resume_text = dict_to_text(request.resume_content)
-        jd_text = dict_to_text(request.jd_content)
+        return {"success": True, "data": analyze_resume(request.resume_content, request)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+def score_session(session) -> dict:
+    """Score a live-editing session from its running term totals (caller holds session.lock)."""
+    if session.analysis is None:
+        gap_analyzer = engines.get("gap_analyzer")
+        semantic_match = semantic_matcher(session.document, session.totals.keys())
+        with stage("gap_analyzer.session"):
+            gaps = gap_analyzer.compare(session.jd_vec, gap_analyzer.vectorize_counts(session.totals), semantic_match)
+        session.analysis = score_with_gaps(session.document, session.jd_content, gaps, semantic_match)
+    return session.analysis
+
+def _get_session_or_404(session_id: str):
+    session = engines.get("scoring_sessions").get(session_id, engines.get("gap_analyzer").vectorize)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Scoring session not found or expired")
+    return session
+
+
+@router.post("/sessions")
+def create_scoring_session(request: ScoringSessionCreateRequest):
+    """
+    Start a live-editing scoring session.
+    
+    The JD is vectorized once and each resume section is tokenized once and
+    kept server-side. Send later edits to PATCH /sessions/{id}/sections/{name}
+    so only the changed section is re-processed. A 404 on any session call
+    means the session expired: create a new one. Without SESSION_DB_PATH,
+    sessions live in the worker that created them and need sticky routing.
+    """
+    try:
+        if not request.resume_content:
+            raise HTTPException(status_code=400, detail="Resume content cannot be empty")
+        
+        jd_content, jd_vec = resolve_jd(request)
+        sessions = engines.get("scoring_sessions")
+        session = sessions.new_session(jd_content, jd_vec, request.resume_content)
+        with session.lock:
+            analysis = score_session(session)
+        session_id = sessions.create(session)
+        return {"success": True, "data": {"session_id": session_id, "analysis": analysis}}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Session creation failed: {str(e)}")
+
+
+@router.get("/sessions/{session_id}")
+def get_scoring_session(session_id: str):
+    """Return the current analysis of a scoring session."""
+    session = _get_session_or_404(session_id)
+    with session.lock:
+        analysis = score_session(session)
+    return {"success": True, "data": {"session_id": session_id, "analysis": analysis}}
+
+
+@router.patch("/sessions/{session_id}/sections/{section}")
+def update_session_section(session_id: str, section: str, request: SectionUpdateRequest):
+    """
+    Replace (or remove, with null content) one resume section and re-score.
+    
+    Only the changed section is re-tokenized and the running term totals are
+    patched; an edit whose content hash matches the stored section is a no-op.
+    """
+    session = _get_session_or_404(session_id)
+    try:
+        with session.lock:
+            if request.content is None:
+                changed = session.remove_section(section)
+            else:
+                changed = session.set_section(section, request.content)
+            if changed:
+                session.analysis = None
+                if not engines.get("scoring_sessions").save(session_id, session, section):
+                    raise HTTPException(status_code=404, detail="Scoring session not found or expired")
+            analysis = score_session(session)
+        return {"success": True, "data": {"session_id": session_id, "changed": changed, "analysis": analysis}}
+    except SessionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Section update failed: {str(e)}")
+
+
+@router.delete("/sessions/{session_id}")
+def delete_scoring_session(session_id: str):
+    """End a scoring session and free its memory."""
+    if not engines.get("scoring_sessions").delete(session_id):
+        raise HTTPException(status_code=404, detail="Scoring session not found or expired")
+    return {"success": True}
+
+
+@router.post("/score-batch")
+def score_resumes_batch(request: ResumeBatchScoreRequest):
+    """
+    Rank many resumes against one job description.
+    
+    The JD is vectorized once and all resumes are scored as a single sparse
+    matrix operation. Results stream back as NDJSON (one JSON object per line)
+    in ranked order, optionally cut off at top_k. The interviewer simulation
+    does not depend on the JD and is not part of bulk ranking.
+    """
+    try:
+        if len(request.resumes) > settings.SCORE_BATCH_MAX_RESUMES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.SCORE_BATCH_MAX_RESUMES} resumes per batch"
+            )
+        
+        gap_analyzer = engines.get("gap_analyzer")
+        ats_scorer = engines.get("ats_scorer")
+        jd_content, jd_vec = resolve_jd(request)
         
-        # Run analysis pipeline
-        gaps = gap_analyzer.analyze_gaps(jd_text, resume_text)
-        score_data = ats_scorer.score_resume(request.resume_content, request.jd_content, gaps)
-        scan_simulation = interviewer_simulator.simulate_scan(request.resume_content)
+        documents = [ResumeDocument(r.resume_content) for r in request.resumes]
+        with stage("gap_analyzer.batch"):
+            batch_gaps = gap_analyzer.score_many(jd_vec, [d.text for d in documents])
+        with stage("ats_scorer.batch"):
+            scores = ats_scorer.score_many(documents, jd_content, batch_gaps)
         
-        return {
-            "success": True,
-            "data": {
-                "ats_score": score_data,
-                "gap_analysis": gaps,
-                "interviewer_simulation": scan_simulation
-            }
-        }
+        order = np.argsort(-scores["overall_score"], kind="stable")
+        if request.top_k:
+            order = order[:request.top_k]
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+    
+    relevant_terms = batch_gaps["relevant_terms"]
+    
+    def ranked_rows():
+        for rank, i in enumerate(order.tolist(), start=1):
+            missing = relevant_terms[batch_gaps["missing"][i]].tolist()
+            yield json.dumps({
+                "rank": rank,
+                "index": i,
+                "id": request.resumes[i].id,
+                "overall_score": float(scores["overall_score"][i]),
+                "keyword_match": float(batch_gaps["overall_match_score"][i]),
+                "skill_match": float(scores["skill_match"][i]),
+                "missing_keywords": missing[:MAX_MISSING_KEYWORDS],
+                "missing_count": len(missing)
+            }) + "\n"
+    
+    return StreamingResponse(ranked_rows(), media_type="application/x-ndjson")
+
+
+@router.post("/corpus")
+def ingest_resumes(request: CorpusIngestRequest):
+    """
+    Add resumes to the searchable corpus.
+    
+    Resumes are indexed incrementally (no rebuild) and searchable as soon as
+    this returns, from every worker process. Re-using an ID replaces that resume.
+    """
+    if len(request.resumes) > settings.RESUME_CORPUS_MAX_INGEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RESUME_CORPUS_MAX_INGEST} resumes per request"
+        )
+    try:
+        with stage("resume_corpus.ingest"):
+            ids = engines.get("resume_corpus").add([(r.id, r.resume_content) for r in request.resumes])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ingest failed: {str(e)}")
+    return {"success": True, "data": {"ids": ids}}
+
+
+@router.delete("/corpus/{resume_id}")
+def delete_corpus_resume(resume_id: str):
+    """Remove a resume from the corpus."""
+    if not engines.get("resume_corpus").delete(resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found in corpus")
+    return {"success": True}
+
+
+@router.get("/corpus/stats")
+def corpus_stats():
+    """Report corpus size, index segments and search counts."""
+    return {"success": True, "data": engines.get("resume_corpus").stats()}
+
+
+@router.post("/search")
+def search_resumes(request: ResumeSearchRequest):
+    """
+    Find the best-matching resumes in the corpus for a job description.
+    
+    The JD (jd_id, jd_content or jd_text) is turned into a BM25 query of its
+    most important terms; results are ranked candidates with the query terms
+    each one matched, optionally filtered by skills and with skill facets.
+    """
+    try:
+        if request.jd_text and not (request.jd_id or request.jd_content):
+            jd_vec = engines.get("gap_analyzer").vectorize(request.jd_text)
+        else:
+            _, jd_vec = resolve_jd(request)
+        with stage("resume_corpus.search"):
+            result = engines.get("resume_corpus").search(
+                jd_vec, request.top_k, request.skills, request.facets, request.include_content
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    return {"success": True, "data": result}
+
+
+async def read_upload(request: Request) -> UploadFile:
+    """
+    Stream a single-file multipart body into a spooled temp file.
+    
+    Starlette keeps the file in memory up to 1MB and spills to disk beyond
+    that; the stream is cut off with 413 as soon as it passes UPLOAD_MAX_BYTES,
+    so an oversized upload is never buffered in full.
+    """
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="Upload the resume as multipart/form-data with a 'file' field")
+    
+    limit = settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail=f"Files are limited to {settings.UPLOAD_MAX_BYTES} bytes")
+    
+    async def bounded_stream():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise HTTPException(status_code=413, detail=f"Files are limited to {settings.UPLOAD_MAX_BYTES} bytes")
+            yield chunk
+    
+    form = await MultiPartParser(request.headers, bounded_stream(), max_files=1, max_fields=10).parse()
+    upload = form.get("file")
+    if not isinstance(upload, UploadFile):
+        await form.close()
+        raise HTTPException(status_code=400, detail="Missing 'file' field")
+    if upload.size is not None and upload.size > settings.UPLOAD_MAX_BYTES:
+        await form.close()
+        raise HTTPException(status_code=413, detail=f"Files are limited to {settings.UPLOAD_MAX_BYTES} bytes")
+    return upload
+
+def parse_upload(upload: UploadFile) -> dict:
+    with stage("resume_parser"):
+        return engines.get("resume_parser").parse(upload.file)
+
+
+@router.post("/upload", openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_resume(request: Request):
+    """
+    Parse an uploaded PDF or DOCX resume into resume content.
+    
+    The returned resume_content has the same shape /score and /download-pdf
+    accept. Pages of multi-page PDFs are extracted in parallel on a process
+    pool; each file reports its parse time and peak parser memory.
+    """
+    upload = await read_upload(request)
+    try:
+        result = await run_in_threadpool(parse_upload, upload)
+    except UnsupportedDocument as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnreadableDocument as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ParserQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Resume parser is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ParseTimeout as e:
+        raise HTTPException(status_code=422, detail=f"{e}; the document is too complex to parse")
+    except WorkerLost:
+        raise HTTPException(
+            status_code=503,
+            detail="Resume parsing was interrupted, please retry",
+            headers={"Retry-After": str(engines.get("resume_parser").retry_after())}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Resume parsing failed: {str(e)}")
+    finally:
+        await upload.close()
+    
+    return {"success": True, "data": {"filename": upload.filename, "bytes": upload.size, **result}}
+
+
+@router.get("/upload/stats")
+def upload_stats():
+    """Report resume parser pool statistics: queue depth, parse times, peak memory and rejections."""
+    parser = engines.peek("resume_parser")
+    return {"success": True, "data": {"loaded": True, **parser.stats()} if parser else {"loaded": False}}
 
 
 @router.post("/download-pdf")
-def download_pdf(resume: ResumeContent):
+def download_pdf(resume: ResumeContent, if_none_match: Optional[str] = Header(default=None)):
     """
     Generate and download resume as PDF.
     
-    Returns PDF file as streaming response.
+    PDFs are content-addressed: the ETag is a hash of the resume content and
+    template version. A matching If-None-Match returns 304 without rendering,
+    and repeat downloads are streamed from the on-disk cache.
     """
     try:
         if not resume.content:
             raise HTTPException(status_code=400, detail="Resume content cannot be empty")
         
-        pdf_bytes = pdf_generator.generate(resume.content)
+        pdf_cache = engines.get("pdf_cache")
+        key = pdf_cache.key_for(resume.content)
+        etag = f'"{key}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        pdf_file = pdf_cache.open(key)
+        if pdf_file is None:
+            with stage("pdf_renderer"):
+                pdf_bytes = engines.get("pdf_renderer").render(resume.content)
+            pdf_file = pdf_cache.put(key, pdf_bytes)
         
+        headers["Content-Disposition"] = f"attachment; filename={resume.title}.pdf"
+        headers["Content-Length"] = str(os.fstat(pdf_file.fileno()).st_size)
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            iter_file(pdf_file),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={resume.title}.pdf"}
+            headers=headers
+        )
+    except PDFQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="PDF renderer is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except (TimeoutError, WorkerLost):
+        # The render was abandoned and its pool recycled; a retry gets a fresh worker
+        raise HTTPException(
+            status_code=503,
+            detail="PDF rendering was interrupted, please retry",
+            headers={"Retry-After": str(engines.get("pdf_renderer").retry_after())}
         )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison per RFC 9110: W/ prefixes are ignored, * matches anything."""
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return any(c == "*" or c.removeprefix("W/") == etag for c in candidates)
+
+
+def iter_file(f, chunk_size: int = 64 * 1024):
+    with f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+@router.get("/download-pdf/stats")
+def download_pdf_stats():
+    """
+    Report PDF render pool and output cache statistics.
+    
+    Includes queue depth, render times, rejected (429) requests and cache
+    hits, misses and evictions.
+    """
+    renderer = engines.peek("pdf_renderer")
+    pdf_cache = engines.peek("pdf_cache")
+    return {
+        "success": True,
+        "data": {
+            "renderer": {"loaded": True, **renderer.stats()} if renderer else {"loaded": False},
+            "cache": {"loaded": True, **pdf_cache.stats()} if pdf_cache else {"loaded": False}
+        }
+    }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -16,6 +16,156 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
 
+    # Metrics: shared snapshot directory when running several worker processes
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # On-demand request profiling: requests carrying X-Profile: <SECRET_KEY> (ignored while
+    # SECRET_KEY is the default) or a PROFILE_SAMPLE_RATE fraction of all requests are
+    # sampled every PROFILE_INTERVAL_MS; the newest PROFILE_MAX_FILES are kept in PROFILE_DIR.
+    PROFILE_DIR: str = "cache/profiles"
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5
+    PROFILE_MAX_FILES: int = 100
+
+    # Production launcher (start_prod.py): engines are loaded once, then workers are forked.
+    # WEB_WORKERS=0 sizes the pool from the CPU count and the memory budget
+    # (0 budget = MemAvailable at startup); WEB_WORKER_MEMORY_MB is the expected
+    # private memory each worker adds on top of the shared model weights.
+    WEB_WORKERS: int = 0
+    WEB_MEMORY_BUDGET_MB: int = 0
+    WEB_WORKER_MEMORY_MB: int = 384
+
+    # Engines load lazily; warm-up loads them in the background after startup
+    ENGINE_WARMUP: bool = True
+    # Comma-separated engines /ready requires to have loaded (e.g. "ats_scorer,gap_analyzer").
+    # /ready waits for warm-up to finish; other engines that fail only mark it "degraded".
+    # With warm-up off, engines load on first use and do not hold /ready back.
+    READY_REQUIRED_ENGINES: str = ""
+
+    # Request lanes ("lane=slots,..."): routes are assigned to lanes in app/api/v1/api.py and
+    # each lane runs at most its slots at once, queueing the rest per client round-robin.
+    # Past LANE_MAX_QUEUE waiting requests a lane answers 429, and a request that waited
+    # LANE_MAX_WAIT_MS (0 = no limit) without a slot gets 503 (both with Retry-After).
+    # Lanes own load shedding for HTTP traffic; the engine slots below only protect an
+    # engine shared across lanes and background jobs, so keep each lane's slots at or
+    # above the engine slots it feeds (generation >= content_generator).
+    LANE_WORKERS: str = "interactive=16,generation=8,export=2,bulk=2"
+    LANE_MAX_QUEUE: int = 64
+    LANE_MAX_WAIT_MS: float = 10000
+
+    # Per-engine concurrency slots ("engine=slots,..."; unlisted engines are ungoverned).
+    # Calls queue for a slot; past ENGINE_MAX_QUEUE waiters they get 429, and when the
+    # expected or actual wait exceeds ENGINE_MAX_QUEUE_WAIT_MS they get 503 (both with
+    # Retry-After). Background jobs wait for a slot without being shed.
+    ENGINE_CONCURRENCY: str = "content_generator=8,jd_intelligence=4"
+    ENGINE_MAX_QUEUE: int = 16
+    ENGINE_MAX_QUEUE_WAIT_MS: float = 2000
+
+    # Torch thread pools per process (0 intra-op = CPUs / web workers; 0 inter-op = torch default)
+    TORCH_NUM_THREADS: int = 0
+    TORCH_INTEROP_THREADS: int = 0
+
+    # Skill taxonomy JSON (empty uses the bundled app/data/skill_taxonomy.json)
+    SKILL_TAXONOMY_PATH: str = ""
+
+    # Prefit IDF model for GapAnalyzer (empty uses app/data/idf_model.npz; when that is
+    # missing too, each JD/resume pair is weighted on its own, as the original scoring was)
+    IDF_MODEL_PATH: str = ""
+
+    # Semantic skill matching ("k8s" ~ "Kubernetes"); disabled unless the directory is set.
+    # Build it with python -m app.engines.skill_embeddings --output DIR. hnswlib, when
+    # installed, replaces exact top-k once the skill vocabulary reaches SKILL_ANN_MIN_SKILLS.
+    SKILL_EMBEDDINGS_DIR: str = ""
+    SKILL_MATCH_THRESHOLD: float = 0.8
+    SKILL_MATCH_TOP_K: int = 3
+    SKILL_ANN_MIN_SKILLS: int = 20000
+
+    # Analyzed JDs by jd_id; the sqlite tier lets every worker process resolve a jd_id
+    JD_CACHE_MAX_ENTRIES: int = 1024
+    JD_CACHE_TTL_SECONDS: float = 86400
+    JD_CACHE_DB_PATH: str = "cache/jds.sqlite3"
+
+    # Batch JD analysis (/jds/analyze-batch)
+    JD_BATCH_MAX_DOCS: int = 5000
+    JD_BATCH_DEFAULT_SIZE: int = 64
+    JD_BATCH_MAX_PROCESSES: int = 4
+
+    # Bulk ranking (/resumes/score-batch)
+    SCORE_BATCH_MAX_RESUMES: int = 20000
+
+    # Searchable resume corpus (/resumes/corpus, /resumes/search): sqlite doc store plus
+    # memory-mapped BM25 segments. Buffered docs are flushed into a segment every
+    # RESUME_CORPUS_FLUSH_DOCS; past RESUME_CORPUS_MAX_SEGMENTS the smallest
+    # RESUME_CORPUS_MERGE_FACTOR are merged, and segments with at least
+    # RESUME_CORPUS_DELETED_RATIO deleted docs are rewritten.
+    RESUME_CORPUS_DIR: str = "cache/corpus"
+    RESUME_CORPUS_FLUSH_DOCS: int = 10000
+    RESUME_CORPUS_MAX_SEGMENTS: int = 16
+    RESUME_CORPUS_MERGE_FACTOR: int = 8
+    RESUME_CORPUS_DELETED_RATIO: float = 0.3
+    RESUME_CORPUS_MAX_INGEST: int = 1000
+    RESUME_SEARCH_MAX_TERMS: int = 32
+
+    # Live-editing scoring sessions (/resumes/sessions), evicted when idle or over the memory cap
+    SESSION_IDLE_TTL_SECONDS: float = 1800
+    SESSION_MAX_BYTES: int = 64 * 1024 * 1024
+    # sqlite file shared by the worker processes so any worker can serve any session
+    # (empty keeps sessions in the worker that created them: route clients stickily)
+    SESSION_DB_PATH: str = "cache/sessions.sqlite3"
+
+    # Resume file uploads (/resumes/upload): PDF/DOCX parsed on a process pool. PDF pages are
+    # extracted in parallel ranges of at least UPLOAD_PAGES_PER_TASK pages; each pool task
+    # fails once it grows by more than UPLOAD_MEMORY_LIMIT_MB.
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_PAGES: int = 50
+    UPLOAD_MAX_TEXT_CHARS: int = 200000
+    UPLOAD_MEMORY_LIMIT_MB: int = 128
+    UPLOAD_WORKERS: int = 2
+    UPLOAD_MAX_PENDING: int = 8
+    UPLOAD_PAGES_PER_TASK: int = 4
+    UPLOAD_PARSE_TIMEOUT_SECONDS: float = 30
+
+    # PDF rendering process pool
+    PDF_WORKERS: int = 2
+    PDF_MAX_PENDING: int = 8
+    PDF_RENDER_TIMEOUT_SECONDS: float = 60
+
+    # Rendered PDF cache (content-addressed, LRU-evicted past the size bound)
+    PDF_CACHE_DIR: str = "cache/pdf"
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Asynchronous jobs (/jobs)
+    JOBS_DB_PATH: str = "cache/jobs.sqlite3"
+    JOB_WORKERS: int = 2
+    JOB_RESULT_TTL_SECONDS: float = 3600
+    JOB_LEASE_SECONDS: float = 300
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Content enhancement micro-batching
+    ENHANCE_MAX_BATCH_SIZE: int = 8
+    ENHANCE_MAX_WAIT_MS: float = 10.0
+
+    # Local model artifacts (t5-small, en_core_web_sm) populated with
+    # python -m app.engines.model_store pull; empty loads from the Hugging Face hub/cache and
+    # the installed spaCy package. Files are checked against the manifest's sha256 sums
+    # before loading unless MODEL_STORE_VERIFY is false (sizes are always checked).
+    MODEL_STORE_DIR: str = ""
+    MODEL_STORE_VERIFY: bool = True
+
+    # Content generation backend: torch | torch-int8 (dynamic quantization) | onnx
+    # (needs optimum[onnxruntime]; ONNX_MODEL_DIR points at an exported model, empty exports at startup,
+    # from MODEL_STORE_DIR's t5-small when a store is configured)
+    INFERENCE_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = ""
+    # Preset used when a request doesn't choose one: heuristic | fast | balanced | quality
+    ENHANCE_DEFAULT_PRESET: str = "quality"
+
+    # Content enhancement result cache (empty DB path disables the disk tier)
+    ENHANCE_CACHE_MAX_ENTRIES: int = 2048
+    ENHANCE_CACHE_TTL_SECONDS: float = 86400
+    ENHANCE_CACHE_DB_PATH: str = ""
+
     # NOTE: CORS_ORIGINS is intentionally NOT a pydantic field.
     # pydantic-settings tries to JSON-parse List fields from env vars,
     # which causes crashes when the value isn't valid JSON.
@@ -60,4 +210,22 @@ def get_cors_origins() -> List[str]:
             pass  # Fall through to comma split
 
     # Comma-separated: https://a.com,https://b.com
-    return [u.strip() for u in raw.split(",") if u.strip()]
\ No newline at end of file
+    return [u.strip() for u in raw.split(",") if u.strip()]
+
+
+def parse_limits(spec: str, setting: str) -> Dict[str, int]:
+    """Parse a "name=count,..." setting such as ENGINE_CONCURRENCY; non-positive counts are dropped."""
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            limit = int(value)
+        except ValueError:
+            print(f"Warning: Ignoring {setting} entry '{item.strip()}' (expected name=count).")
+            continue
+        if limit > 0:
+            limits[name] = limit
+    return limits
@@ -0,0 +1,328 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATES = {SUCCEEDED, FAILED}
+
+# executor(payload, report_progress) -> JSON-serializable result
+Executor = Callable[[Dict[str, Any], Callable[[float], None]], Any]
+
+
+class JobDeferred(Exception):
+    """Raised by an executor to put its job back in the queue for at least retry_after seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class JobStore:
+    """
+    sqlite-backed job table shared by every worker process on the box.
+
+    A running job holds a lease that its worker renews while it runs. When a
+    process dies, its leases expire and the jobs become claimable again, so
+    queued and in-flight work survives restarts. Updates from a worker carry
+    the attempt number it claimed, so a worker whose lease expired and was
+    taken over cannot overwrite the newer attempt's progress or outcome.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_expires_at REAL,
+                run_after REAL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "run_after" not in columns:
+            # Job tables created before deferred jobs existed
+            try:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN run_after REAL")
+            except sqlite3.OperationalError as e:
+                # Another worker process migrated the table first
+                if "duplicate column" not in str(e):
+                    raise
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def create(self, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest due queued job, or a running job whose lease has expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """
+                    SELECT * FROM jobs
+                    WHERE (status = ? AND COALESCE(run_after, 0) <= ?) OR (status = ? AND lease_expires_at < ?)
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires_at = ?, run_after = NULL,
+                                    started_at = COALESCE(started_at, ?)
+                    WHERE id = ?
+                    """,
+                    (RUNNING, now + lease_seconds, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._to_dict(row)
+        job["attempts"] += 1
+        return job
+
+    def renew_leases(self, attempts: Dict[str, int], lease_seconds: float):
+        """Extend the leases of running jobs, given as {job_id: attempt}."""
+        if not attempts:
+            return
+        expires = time.time() + lease_seconds
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND attempts = ? AND status = ?",
+                [(expires, job_id, attempt, RUNNING) for job_id, attempt in attempts.items()],
+            )
+
+    def set_progress(self, job_id: str, attempt: int, progress: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ? AND attempts = ? AND status = ?",
+                (min(1.0, max(0.0, progress)), job_id, attempt, RUNNING),
+            )
+
+    def finish(self, job_id: str, attempt: int, result: Any) -> bool:
+        """Record the result of `attempt`; False when that attempt no longer owns the job."""
+        return self._update_running(
+            job_id, attempt,
+            "status = ?, progress = 1, result = ?, lease_expires_at = NULL, finished_at = ?",
+            (SUCCEEDED, json.dumps(result), time.time()),
+        )
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        return self._update_running(
+            job_id, attempt,
+            "status = ?, error = ?, lease_expires_at = NULL, finished_at = ?",
+            (FAILED, error, time.time()),
+        )
+
+    def defer(self, job_id: str, attempt: int, delay: float) -> bool:
+        """Put a running job back in the queue, claimable again after `delay` seconds."""
+        return self._update_running(
+            job_id, attempt,
+            "status = ?, lease_expires_at = NULL, run_after = ?",
+            (QUEUED, time.time() + delay),
+        )
+
+    def _update_running(self, job_id: str, attempt: int, assignments: str, values: Tuple[Any, ...]) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND attempts = ? AND status = ?",
+                (*values, job_id, attempt, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def purge_finished(self, ttl_seconds: float) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, time.time() - ttl_seconds),
+            )
+        return cur.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def _to_dict(self, row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+
+class JobQueue:
+    """
+    Runs queued jobs on a local pool of worker threads.
+
+    Executors are registered per job kind and receive the job payload plus a
+    callback for reporting progress in [0, 1]. An executor that raises
+    JobDeferred sends its job back to the queue; the next claim counts as a
+    new attempt, so deferrals are bounded by JOB_MAX_ATTEMPTS. Finished jobs
+    are kept for JOB_RESULT_TTL_SECONDS and then purged.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: Optional[int] = None):
+        self._store = store
+        self.workers = max(1, workers or settings.JOB_WORKERS)
+        self.lease_seconds = settings.JOB_LEASE_SECONDS
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.result_ttl = settings.JOB_RESULT_TTL_SECONDS
+        self._executors: Dict[str, Executor] = {}
+        # job_id -> (attempt, perf_counter at start)
+        self._running: Dict[str, Tuple[int, float]] = {}
+        self._running_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def store(self) -> JobStore:
+        # Opened lazily so importing this module never touches the filesystem
+        if self._store is None:
+            self._store = JobStore(settings.JOBS_DB_PATH)
+        return self._store
+
+    def register(self, kind: str, executor: Executor):
+        self._executors[kind] = executor
+
+    @property
+    def kinds(self):
+        return sorted(self._executors)
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        if kind not in self._executors:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = self.store.create(kind, payload)
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._maintenance_loop, name="job-maintenance", daemon=True)
+        t.start()
+        self._threads.append(t)
+        logger.info(f"Job queue started with {self.workers} workers ({self.store.path})")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._threads = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._running_lock:
+            running_here = len(self._running)
+        return {"workers": self.workers, "running_in_process": running_here, "jobs": self.store.counts()}
+
+    def _work_loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                # Other processes also enqueue, so poll even without a local wake-up
+                self._wake.wait(timeout=0.5)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        attempt = job["attempts"]
+        if attempt > self.max_attempts:
+            self.store.fail(job_id, attempt, f"Gave up after {self.max_attempts} attempts")
+            return
+
+        executor = self._executors.get(job["kind"])
+        if executor is None:
+            self.store.fail(job_id, attempt, f"No executor for job kind '{job['kind']}'")
+            return
+
+        with self._running_lock:
+            self._running[job_id] = (attempt, time.perf_counter())
+        recorded = True
+        try:
+            result = executor(job["payload"], lambda p: self.store.set_progress(job_id, attempt, p))
+            recorded = self.store.finish(job_id, attempt, result)
+        except JobDeferred as e:
+            logger.info(f"Job {job_id} ({job['kind']}) deferred for {e.retry_after:g}s: {e}")
+            recorded = self.store.defer(job_id, attempt, e.retry_after)
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['kind']}) failed: {e}", exc_info=True)
+            recorded = self.store.fail(job_id, attempt, str(e))
+        finally:
+            with self._running_lock:
+                _, started = self._running.pop(job_id, (attempt, None))
+            if started is not None:
+                logger.info(f"Job {job_id} ({job['kind']}) finished in {time.perf_counter() - started:.3f}s")
+        if not recorded:
+            logger.warning(f"Job {job_id} attempt {attempt} lost its lease to a newer attempt; outcome discarded")
+
+    def _maintenance_loop(self):
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(timeout=interval):
+            try:
+                with self._running_lock:
+                    running = {job_id: attempt for job_id, (attempt, _) in self._running.items()}
+                self.store.renew_leases(running, self.lease_seconds)
+                purged = self.store.purge_finished(self.result_ttl)
+                if purged:
+                    logger.info(f"Purged {purged} expired jobs")
+            except Exception as e:
+                logger.error(f"Job maintenance failed: {e}")
+
+
+job_queue = JobQueue()
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+from starlette.routing import Match
+
+from app.core.config import parse_limits, settings
+from app.core.metrics import metrics, LANE_QUEUE_WAIT_SECONDS
+
+# Threads kept for requests outside any lane (stats, health, sessions reads) on top of the lane budgets
+UNLANED_THREADS = 8
+
+# Weight of the newest request in each lane's moving-average service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class LaneFull(Exception):
+    """Raised when a lane already has LANE_MAX_QUEUE requests waiting."""
+
+    status_code = 429
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"The '{lane}' lane is busy, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class LaneTimeout(LaneFull):
+    """Raised when a queued request waited LANE_MAX_WAIT_MS without getting a slot."""
+
+    status_code = 503
+
+
+class _Lane:
+    __slots__ = ("name", "budget", "running", "queued", "waiting", "admitted", "rejected",
+                 "service_time", "wait_total", "timed_out")
+
+    def __init__(self, name: str, budget: int):
+        self.name = name
+        self.budget = budget
+        self.running = 0
+        self.queued = 0
+        # client -> its waiting requests in arrival order; clients are served round-robin
+        self.waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.service_time: Optional[float] = None
+        self.wait_total = 0.0
+
+
+class LaneScheduler:
+    """
+    Named request lanes with their own concurrency budgets and fair queueing.
+
+    Each lane runs at most `budget` requests at once. Further requests wait
+    in per-client FIFO queues and a freed slot goes to the next client in
+    round-robin order, so one client looping on PDF exports queues behind
+    itself rather than in front of everyone else. Lanes never borrow from
+    each other: a saturated export lane leaves the interactive lane's
+    budget untouched. Runs on the worker's event loop, so no locking.
+    """
+
+    def __init__(self, budgets: Dict[str, int], max_queue: int, max_wait: float = 0.0):
+        self.max_queue = max(0, max_queue)
+        # Seconds a request may wait for a slot; 0 waits as long as it takes
+        self.max_wait = max(0.0, max_wait)
+        self._lanes = {name: _Lane(name, budget) for name, budget in budgets.items()}
+        metrics.register_collector("lanes", self._metric_samples)
+
+    @classmethod
+    def from_settings(cls) -> "LaneScheduler":
+        return cls(
+            parse_limits(settings.LANE_WORKERS, "LANE_WORKERS"),
+            settings.LANE_MAX_QUEUE,
+            settings.LANE_MAX_WAIT_MS / 1000.0,
+        )
+
+    def has_lane(self, name: str) -> bool:
+        return name in self._lanes
+
+    def total_budget(self) -> int:
+        return sum(lane.budget for lane in self._lanes.values())
+
+    async def acquire(self, name: str, client: str):
+        """
+        Wait for a slot in lane `name`.
+
+        Raises LaneFull when its queue is at LANE_MAX_QUEUE, and LaneTimeout
+        when no slot frees up within LANE_MAX_WAIT_MS.
+        """
+        lane = self._lanes[name]
+        if lane.running < lane.budget and not lane.queued:
+            lane.running += 1
+            lane.admitted += 1
+            LANE_QUEUE_WAIT_SECONDS.labels(name).observe(0.0)
+            return
+        if lane.queued >= self.max_queue:
+            lane.rejected += 1
+            raise LaneFull(name, self._retry_after(lane))
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiting.setdefault(client, deque()).append(waiter)
+        lane.queued += 1
+        queued = time.perf_counter()
+        try:
+            # asyncio.wait leaves the waiter alone on timeout, so a slot handed over at the last moment isn't lost
+            await asyncio.wait((waiter,), timeout=self.max_wait or None)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation landed
+                self.release(name, 0.0)
+            else:
+                self._discard(lane, client, waiter)
+            raise
+        if not waiter.done():
+            self._discard(lane, client, waiter)
+            waiter.cancel()
+            lane.timed_out += 1
+            raise LaneTimeout(name, self._retry_after(lane))
+        waited = time.perf_counter() - queued
+        lane.wait_total += waited
+        LANE_QUEUE_WAIT_SECONDS.labels(name).observe(waited)
+
+    def release(self, name: str, elapsed: float):
+        """Free a slot in lane `name` and hand it to the next client in turn."""
+        lane = self._lanes[name]
+        if elapsed:
+            lane.service_time = elapsed if lane.service_time is None else (
+                SERVICE_TIME_ALPHA * elapsed + (1 - SERVICE_TIME_ALPHA) * lane.service_time
+            )
+        lane.running -= 1
+        while lane.waiting:
+            client, waiters = next(iter(lane.waiting.items()))
+            waiter = waiters.popleft()
+            lane.queued -= 1
+            if waiters:
+                lane.waiting.move_to_end(client)
+            else:
+                del lane.waiting[client]
+            if not waiter.done():
+                lane.running += 1
+                lane.admitted += 1
+                waiter.set_result(None)
+                return
+
+    @staticmethod
+    def _discard(lane: _Lane, client: str, waiter: asyncio.Future):
+        waiters = lane.waiting.get(client)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        lane.queued -= 1
+        if not waiters:
+            del lane.waiting[client]
+
+    @staticmethod
+    def _retry_after(lane: _Lane) -> int:
+        if lane.service_time is None:
+            return 1
+        return max(1, math.ceil((lane.queued + 1) / lane.budget * lane.service_time))
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {
+                "budget": lane.budget,
+                "running": lane.running,
+                "queue_depth": lane.queued,
+                "clients_waiting": len(lane.waiting),
+                "admitted": lane.admitted,
+                "rejected": lane.rejected,
+                "timed_out": lane.timed_out,
+                "mean_queue_wait_ms": (lane.wait_total / lane.admitted * 1000.0) if lane.admitted else 0.0,
+                "service_time_ms": (lane.service_time or 0.0) * 1000.0,
+            }
+            for name, lane in self._lanes.items()
+        }
+
+    def _metric_samples(self):
+        samples = []
+        for name, stats in self.stats().items():
+            labels = {"lane": name}
+            samples.extend([
+                ("lane_running", "gauge", "Requests holding a lane slot", labels, stats["running"]),
+                ("lane_queue_depth", "gauge", "Requests waiting for a lane slot", labels, stats["queue_depth"]),
+                ("lane_clients_waiting", "gauge", "Clients with requests waiting in a lane", labels, stats["clients_waiting"]),
+                ("lane_rejected_total", "counter", "Requests rejected because the lane queue was full", labels, stats["rejected"]),
+                ("lane_timed_out_total", "counter", "Requests that gave up waiting for a lane slot", labels, stats["timed_out"]),
+            ])
+        return samples
+
+
+def client_key(scope) -> str:
+    """Fair-queueing key: the client address (already the forwarded one behind a trusted proxy)."""
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class LaneMiddleware:
+    """
+    Pure ASGI middleware that runs each request in the lane its route is assigned to.
+
+    `route_lanes` maps full route path templates to lane names; requests for
+    other routes, or for lanes without a budget in LANE_WORKERS, pass
+    straight through. The slot is held until the response has been sent, so
+    streamed PDFs and SSE generation count against their lane while they run.
+    """
+
+    def __init__(self, app, route_lanes: Dict[str, str], scheduler: Optional[LaneScheduler] = None):
+        self.app = app
+        self.route_lanes = route_lanes
+        self.scheduler = scheduler or lanes
+
+    def lane_for(self, scope) -> Optional[str]:
+        router = scope["app"].router
+        for route in router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                lane = self.route_lanes.get(getattr(route, "path", None))
+                return lane if lane and self.scheduler.has_lane(lane) else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        lane = self.lane_for(scope)
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.scheduler.acquire(lane, client_key(scope))
+        except LaneFull as e:
+            await self._reject(send, e)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.scheduler.release(lane, time.perf_counter() - started)
+
+    @staticmethod
+    async def _reject(send, exc: LaneFull):
+        body = json.dumps({"detail": str(exc)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": exc.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(exc.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def size_thread_limiter():
+    """
+    Size the threadpool sync endpoints run on to the lane budgets plus UNLANED_THREADS.
+
+    Lanes only isolate traffic if the shared threadpool never runs out
+    first; must be called from the event loop (app startup).
+    """
+    from anyio.to_thread import current_default_thread_limiter
+
+    if lanes.total_budget():
+        current_default_thread_limiter().total_tokens = lanes.total_budget() + UNLANED_THREADS
+
+
+lanes = LaneScheduler.from_settings()
@@ -0,0 +1,399 @@
+import bisect
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core import profiler
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# A collector returns (name, type, help, labels, value) tuples read at snapshot time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Sample]]
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": {json.dumps(list(k)): c.value() for k, c in list(self._children.items())},
+        }
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def value(self) -> float:
+        return self._value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def value(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"counts": list(self._counts), "sum": self._sum}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Shortcut for unlabelled counters."""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Shortcut for unlabelled histograms."""
+        self.labels().observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = super().snapshot()
+        snap["buckets"] = list(self.buckets)
+        return snap
+
+
+class MetricsRegistry:
+    """
+    In-process metric registry with Prometheus text exposition.
+
+    Updates are a dict lookup plus an uncontended lock, cheap enough for
+    every request and engine call. With METRICS_MULTIPROC_DIR set, each
+    process periodically writes a snapshot file there and /metrics merges
+    all of them. Counters and histograms from exited processes keep counting
+    toward the totals. Gauges only count live processes.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+        self.multiproc_dir = multiproc_dir
+        self._flusher: Optional[threading.Thread] = None
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, key: str, collector: Collector):
+        """Register (or replace) a callback that reports samples at scrape time."""
+        with self._lock:
+            self._collectors[key] = collector
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+
+        snap = {m.name: m.snapshot() for m in metrics}
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, mtype, help, labels, value in samples:
+                entry = snap.setdefault(
+                    name, {"type": mtype, "help": help, "labelnames": sorted(labels), "samples": {}}
+                )
+                key = json.dumps([str(labels[n]) for n in entry["labelnames"]])
+                entry["samples"][key] = entry["samples"].get(key, 0.0) + float(value)
+        return snap
+
+    # --- multi-process support -------------------------------------------------
+
+    def start_flusher(self, interval: float):
+        if not self.multiproc_dir or (self._flusher and self._flusher.is_alive()):
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._write_own_snapshot()
+                except Exception as e:
+                    logger.warning(f"Metrics flush failed: {e}")
+
+        self._flusher = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _write_own_snapshot(self):
+        payload = json.dumps({"pid": os.getpid(), "time": time.time(), "metrics": self.snapshot()})
+        fd, tmp = tempfile.mkstemp(dir=self.multiproc_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(self.multiproc_dir, f"{os.getpid()}.json"))
+
+    def _collect_all(self) -> List[Tuple[Dict[str, Any], bool]]:
+        """(snapshot, process_alive) for this process and every other process that wrote one."""
+        if not self.multiproc_dir:
+            return [(self.snapshot(), True)]
+
+        self._write_own_snapshot()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiproc_dir, "*.json")):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append((data["metrics"], _pid_alive(data["pid"])))
+        return snapshots
+
+    def render(self) -> str:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for snap, alive in self._collect_all():
+            for name, metric in snap.items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**metric, "samples": {}})
+                for key, value in metric["samples"].items():
+                    target["samples"][key] = _merge_value(target["samples"].get(key), value)
+
+        lines = []
+        for name in sorted(merged):
+            metric = merged[name]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            labelnames = metric["labelnames"]
+            for key, value in sorted(metric["samples"].items()):
+                labels = dict(zip(labelnames, json.loads(key)))
+                if metric["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric["buckets"] + ["+Inf"], value["counts"]):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class stage:
+    """
+    Context manager timing one engine stage into engine_stage_duration_seconds.
+
+        with stage("gap_analyzer"):
+            gaps = gap_analyzer.analyze_gaps(jd_text, resume_text)
+    """
+
+    __slots__ = ("name", "_started", "_profile")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        # Tags samples with this stage when the request is being profiled
+        self._profile = profiler.enter_stage(self.name)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.exit_stage()
+        ENGINE_STAGE_SECONDS.labels(self.name).observe(elapsed)
+        if exc_type is not None:
+            ENGINE_STAGE_ERRORS.labels(self.name).inc()
+        return False
+
+
+def cache_samples(cache_name: str, stats: Dict[str, Any]) -> List[Sample]:
+    """Translate a cache's stats() dict into counter samples labelled by cache name."""
+    labels = {"cache": cache_name}
+    samples = []
+    for field, metric in (("hits", "cache_hits_total"), ("misses", "cache_misses_total"), ("evictions", "cache_evictions_total")):
+        if field in stats:
+            samples.append((metric, "counter", f"Cache {field}", labels, stats[field]))
+    return samples
+
+
+def process_memory() -> Dict[str, int]:
+    """
+    Resident memory of this process in bytes, split into shared and private pages.
+
+    Pages a forked worker still shares copy-on-write with its parent (model
+    weights loaded before fork) count as shared; only private pages are
+    memory the worker added. Falls back to peak RSS where /proc is unavailable.
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        return {"rss": peak if sys.platform == "darwin" else peak * 1024}
+    return {
+        "rss": fields.get("Rss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _merge_value(current, value):
+    if current is None:
+        return value
+    if isinstance(value, dict):
+        return {
+            "counts": [a + b for a, b in zip(current["counts"], value["counts"])],
+            "sum": current["sum"] + value["sum"],
+        }
+    return current + value
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+metrics = MetricsRegistry(settings.METRICS_MULTIPROC_DIR or None)
+
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = metrics.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled", ("route",))
+ENGINE_STAGE_SECONDS = metrics.histogram("engine_stage_duration_seconds", "Time spent in each engine stage", ("stage",))
+ENGINE_STAGE_ERRORS = metrics.counter("engine_stage_errors_total", "Engine stages that raised", ("stage",))
+MODEL_INFERENCE = metrics.counter("model_inference_total", "Model forward/generate calls", ("model",))
+MODEL_INFERENCE_ITEMS = metrics.counter("model_inference_items_total", "Inputs processed by model calls", ("model",))
+BATCH_SIZE = metrics.histogram("batch_size", "Requests coalesced per micro-batch", ("batcher",), buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_QUEUE_WAIT_SECONDS = metrics.histogram("batch_queue_wait_seconds", "Time requests wait for their micro-batch", ("batcher",))
+LANE_QUEUE_WAIT_SECONDS = metrics.histogram("lane_queue_wait_seconds", "Time requests wait for a slot in their lane", ("lane",))
+ENGINE_QUEUE_WAIT_SECONDS = metrics.histogram("engine_queue_wait_seconds", "Time engine calls wait for a concurrency slot", ("engine",))
+PDF_RENDER_SECONDS = metrics.histogram("pdf_render_duration_seconds", "xhtml2pdf render time inside the pool")
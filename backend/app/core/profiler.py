@@ -0,0 +1,332 @@
+import contextvars
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.security import header_authorized
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_RE = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+# Sampling threads running at once; further sampled requests go unprofiled
+MAX_ACTIVE_PROFILES = 4
+
+_active: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("request_profile", default=None)
+_active_count = 0
+_active_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Statistical profile of one request.
+
+    A sampler thread reads sys._current_frames() every PROFILE_INTERVAL_MS
+    and records the stacks of the threads working on this request: the
+    event-loop thread that runs it, plus any thread inside an engine stage()
+    entered from the request's context (the threadpool thread of a sync
+    endpoint). Samples are tagged with the innermost active stage. Work
+    handed to other threads or processes (the micro-batcher, the PDF pool)
+    shows up as the request thread waiting on it.
+    """
+
+    def __init__(self, method: str, path: str, interval: float, reason: str):
+        self.id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.route = path
+        self.reason = reason
+        self.status: Optional[int] = None
+        self.interval = interval
+        # thread id -> stack of stage names entered on that thread ([] = sampled, untagged)
+        self._threads: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        # (thread id, stage, code objects root-first) -> [sample count, sampled ms]
+        self._samples: Dict[Tuple[int, Optional[str], Tuple[Any, ...]], List[float]] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._loop_thread: Optional[int] = None
+        self.started = 0.0
+        self.duration = 0.0
+
+    def attach(self, thread_id: int):
+        with self._lock:
+            self._threads.setdefault(thread_id, [])
+
+    def enter_stage(self, name: str):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads.setdefault(thread_id, []).append(name)
+
+    def exit_stage(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            stages = self._threads.get(thread_id)
+            if stages:
+                stages.pop()
+            # A threadpool thread leaves the profile with its last stage; the loop thread stays
+            if stages == [] and thread_id != self._loop_thread:
+                del self._threads[thread_id]
+
+    def start(self):
+        self._loop_thread = threading.get_ident()
+        self.attach(self._loop_thread)
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self.started
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight = (now - last) * 1000.0
+            last = now
+            frames = sys._current_frames()
+            with self._lock:
+                threads = [(tid, stages[-1] if stages else None) for tid, stages in self._threads.items()]
+            for thread_id, stage in threads:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                entry = self._samples.setdefault((thread_id, stage, tuple(stack)), [0, 0.0])
+                entry[0] += 1
+                entry[1] += weight
+            del frames
+
+    def _thread_name(self, thread_id: int) -> str:
+        return "event-loop" if thread_id == self._loop_thread else f"thread-{thread_id}"
+
+    def metadata(self) -> Dict[str, Any]:
+        stages = sorted({stage for _, stage, _ in self._samples if stage})
+        return {
+            "id": self.id,
+            "created": time.time(),
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "reason": self.reason,
+            "duration_ms": self.duration * 1000.0,
+            "samples": int(sum(count for count, _ in self._samples.values())),
+            "interval_ms": self.interval * 1000.0,
+            "stages": stages,
+        }
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file-format JSON with one sampled profile per thread."""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Any, int] = {}
+
+        def frame_index(key, name, file=None, line=None) -> int:
+            if key not in index:
+                index[key] = len(frames)
+                frame = {"name": name}
+                if file:
+                    frame.update(file=file, line=line)
+                frames.append(frame)
+            return index[key]
+
+        by_thread: Dict[int, Tuple[List[List[int]], List[float]]] = {}
+        for (thread_id, stage, stack), (_, weight) in self._samples.items():
+            indices = [frame_index(("route",), f"{self.method} {self.route}")]
+            if stage:
+                indices.append(frame_index(("stage", stage), f"[stage] {stage}"))
+            indices.extend(
+                frame_index(code, getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+                for code in stack
+            )
+            samples, weights = by_thread.setdefault(thread_id, ([], []))
+            samples.append(indices)
+            weights.append(round(weight, 3))
+
+        duration_ms = self.duration * 1000.0
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.route} ({self.id})",
+            "exporter": settings.PROJECT_NAME,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self._thread_name(thread_id),
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": duration_ms,
+                    "samples": samples,
+                    "weights": weights,
+                }
+                for thread_id, (samples, weights) in by_thread.items()
+            ],
+        }
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded stacks (flamegraph.pl, speedscope, inferno), one line per unique stack."""
+        lines = []
+        for (thread_id, stage, stack), (count, _) in sorted(self._samples.items(), key=lambda item: -item[1][0]):
+            parts = [f"{self.method} {self.route}", self._thread_name(thread_id)]
+            if stage:
+                parts.append(f"[stage] {stage}")
+            parts.extend(
+                f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                for code in stack
+            )
+            lines.append(f"{';'.join(p.replace(';', ',') for p in parts)} {int(count)}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, directory: str) -> Dict[str, Any]:
+        """Write <id>.speedscope.json, <id>.folded and <id>.meta.json, then prune old profiles."""
+        os.makedirs(directory, exist_ok=True)
+        metadata = self.metadata()
+        base = os.path.join(directory, self.id)
+        with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(), f)
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        # Written last: a profile is listed only once all of its files exist
+        with open(base + ".meta.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        prune_profiles(directory, settings.PROFILE_MAX_FILES)
+        return metadata
+
+
+def enter_stage(name: str) -> Optional[RequestProfile]:
+    """Called by metrics.stage; a single ContextVar lookup when no profile is active."""
+    profile = _active.get()
+    if profile is not None:
+        profile.enter_stage(name)
+    return profile
+
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    """Metadata of the stored profiles, newest first."""
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(".meta.json")]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda p: p.get("created", 0), reverse=True)
+    return profiles
+
+
+def profile_path(directory: str, profile_id: str, fmt: str) -> Optional[str]:
+    """Path of a stored profile file, or None for an unknown or malformed id."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    suffix = ".folded" if fmt == "folded" else ".speedscope.json"
+    path = os.path.join(directory, profile_id + suffix)
+    return path if os.path.exists(path) else None
+
+
+def prune_profiles(directory: str, keep: int):
+    for metadata in list_profiles(directory)[keep:]:
+        for suffix in (".meta.json", ".speedscope.json", ".folded"):
+            try:
+                os.remove(os.path.join(directory, metadata["id"] + suffix))
+            except OSError:
+                pass
+
+
+def route_path(scope) -> Optional[str]:
+    """Path template of the route matching the request, so profiles group by route rather than URL."""
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+
+def _claim_slot() -> bool:
+    global _active_count
+    with _active_lock:
+        if _active_count >= MAX_ACTIVE_PROFILES:
+            return False
+        _active_count += 1
+        return True
+
+
+def _release_slot():
+    global _active_count
+    with _active_lock:
+        _active_count -= 1
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles opted-in requests.
+
+    A request is profiled when its X-Profile header matches SECRET_KEY, or
+    at random with probability PROFILE_SAMPLE_RATE. The profile is saved to
+    PROFILE_DIR once the response has been sent and its id is returned in an
+    X-Profile-Id header. Requests that are not profiled cost one header scan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _reason(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return "header" if header_authorized(value.decode("latin-1")) else None
+        if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        reason = self._reason(scope)
+        if reason is None or not _claim_slot():
+            await self.app(scope, receive, send)
+            return
+
+        from anyio.to_thread import run_sync
+
+        profile = RequestProfile(scope["method"], scope["path"], settings.PROFILE_INTERVAL_MS / 1000.0, reason)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode("latin-1"))]
+            await send(message)
+
+        token = _active.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _active.reset(token)
+            profile.stop()
+            profile.route = route_path(scope) or profile.path
+            try:
+                await run_sync(profile.save, settings.PROFILE_DIR)
+            except OSError as e:
+                print(f"Warning: Could not save profile {profile.id}: {e}")
+            finally:
+                _release_slot()
@@ -0,0 +1,18 @@
+import hmac
+from typing import Optional
+
+from app.core.config import Settings, settings
+
+
+def header_authorized(value: Optional[str]) -> bool:
+    """
+    True when `value` equals SECRET_KEY (constant-time compare).
+
+    Used by headers that unlock operator features (X-Profile, X-Admin-Key).
+    Disabled while SECRET_KEY is still the shipped default, since anyone
+    could send that.
+    """
+    key = settings.SECRET_KEY
+    if not value or not key or key == Settings.model_fields["SECRET_KEY"].default:
+        return False
+    return hmac.compare_digest(value.encode("utf-8"), key.encode("utf-8"))
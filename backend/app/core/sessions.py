@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class SessionStore:
+    """
+    In-process session objects evicted by idle TTL and a total memory cap.
+
+    Stored values must expose an approximate `nbytes`. Sessions are kept in
+    least-recently-used order: every get() refreshes the idle timer, expired
+    sessions are dropped lazily, and the least recently used ones are evicted
+    while the total size exceeds max_bytes. Sessions live in one process;
+    pair it with SQLiteSessionTier to share them between worker processes.
+    """
+
+    def __init__(self, idle_ttl_seconds: float, max_bytes: int):
+        self.idle_ttl = float(idle_ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        # session_id -> [value, nbytes, last_access]
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._bytes = 0
+        self.created = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def create(self, value: Any) -> str:
+        session_id = uuid.uuid4().hex
+        self.put(session_id, value)
+        with self._lock:
+            self.created += 1
+        return session_id
+
+    def put(self, session_id: str, value: Any):
+        """Store `value` under an existing session id (e.g. one loaded from a shared tier)."""
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._sessions[session_id] = [value, value.nbytes, time.monotonic()]
+            self._bytes += value.nbytes
+            self._evict()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            self._expire()
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            entry[2] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def resize(self, session_id: str):
+        """Re-read a session's nbytes after it was mutated and enforce the memory cap."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            nbytes = entry[0].nbytes
+            self._bytes += nbytes - entry[1]
+            entry[1] = nbytes
+            self._evict()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl,
+                "created": self.created,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+    def _expire(self):
+        if self.idle_ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        # LRU order means the idle-longest sessions are at the front
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry[2] >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= entry[1]
+            self.expirations += 1
+
+    def _evict(self):
+        self._expire()
+        # Never evict the most recent session, even if it alone exceeds the cap
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            _, entry = self._sessions.popitem(last=False)
+            self._bytes -= entry[1]
+            self.evictions += 1
+
+
+class SQLiteSessionTier:
+    """
+    Session state shared by every worker process on the box, in one sqlite file.
+
+    Each row holds a session's JSON state and a revision token that changes
+    on every save. Workers keep their own deserialized copy in a SessionStore
+    and reload the row only when its revision no longer matches, so a request
+    that lands on another worker sees the latest edit. Saves are
+    compare-and-swap on the revision, so concurrent edits from different
+    workers are detected instead of overwriting each other. Rows expire after
+    idle_ttl_seconds without being read or saved (<= 0 disables expiry).
+    """
+
+    def __init__(self, path: str, idle_ttl_seconds: float):
+        self.path = path
+        self.idle_ttl = float(idle_ttl_seconds)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._db()
+
+    def _db(self) -> sqlite3.Connection:
+        # Each process opens its own connection, as in SQLiteCache
+        if self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, revision TEXT NOT NULL, state TEXT NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _expired(self, accessed_at: float, now: float) -> bool:
+        return self.idle_ttl > 0 and accessed_at < now - self.idle_ttl
+
+    def revision(self, session_id: str) -> Optional[str]:
+        """Current revision of a session, None when it is unknown or expired; refreshes its idle timer."""
+        now = time.time()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT revision, accessed_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            revision, accessed_at = row
+            if self._expired(accessed_at, now):
+                self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                return None
+            # Writing on every read would serialize all workers on the sqlite lock
+            if now - accessed_at > self.idle_ttl / 10:
+                self._db().execute("UPDATE sessions SET accessed_at = ? WHERE id = ?", (now, session_id))
+        return revision
+
+    def load(self, session_id: str) -> Optional[Tuple[str, Any]]:
+        """(revision, state) of a session, or None."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT revision, state, accessed_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None or self._expired(row[2], time.time()):
+            return None
+        return row[0], json.loads(row[1])
+
+    def save(self, session_id: str, state: Any, expected: Optional[str] = None) -> Optional[str]:
+        """
+        Write a session's state under a new revision and return that revision.
+
+        Without `expected` the row is created. Otherwise the write is a
+        compare-and-swap against the revision the caller loaded: it returns
+        None, writing nothing, when another worker saved (or deleted) the
+        session in between.
+        """
+        revision = uuid.uuid4().hex
+        payload = json.dumps(state, default=str)
+        with self._lock:
+            if expected is None:
+                self._db().execute(
+                    "INSERT INTO sessions (id, revision, state, accessed_at) VALUES (?, ?, ?, ?)",
+                    (session_id, revision, payload, time.time()),
+                )
+                return revision
+            cur = self._db().execute(
+                "UPDATE sessions SET revision = ?, state = ?, accessed_at = ? WHERE id = ? AND revision = ?",
+                (revision, payload, time.time(), session_id, expected),
+            )
+        return revision if cur.rowcount == 1 else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cur = self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cur.rowcount > 0
+
+    def purge_expired(self) -> int:
+        if self.idle_ttl <= 0:
+            return 0
+        with self._lock:
+            cur = self._db().execute("DELETE FROM sessions WHERE accessed_at < ?", (time.time() - self.idle_ttl,))
+        return cur.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
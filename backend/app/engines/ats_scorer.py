@@ -1,4 +1,11 @@
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Union
+import numpy as np
+from app.engines.resume_document import ResumeDocument
+
+# Placeholder component scores until these are computed from real analysis
+EXPERIENCE_RELEVANCE_PLACEHOLDER = 80.0
+FORMAT_COMPLIANCE_PLACEHOLDER = 95.0 # Assuming our builder produces clean JSON/PDF
+CONTENT_QUALITY_PLACEHOLDER = 75.0
 
 class ATSScorer:
     def __init__(self):
@@ -12,15 +19,16 @@ class ATSScorer:
             "completeness": 0.05
         }
 
-    def score_resume(self, resume_data: Dict[str, Any], jd_data: Dict[str, Any], gap_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def score_resume(self, resume_data: Union[ResumeDocument, Dict[str, Any]], jd_data: Dict[str, Any], gap_analysis: Dict[str, Any],
+                     semantic_match: Optional[Callable[[List[str]], np.ndarray]] = None) -> Dict[str, Any]:
         # Placeholder logic for scoring components
         # In a real implementation, these would be calculated based on detailed analysis
         
-        skill_match_score = self._calculate_skill_match(resume_data, jd_data)
+        skill_match_score = self._calculate_skill_match(resume_data, jd_data, semantic_match)
         keyword_coverage_score = gap_analysis.get("overall_match_score", 0)
-        experience_relevance_score = 80.0 # Placeholder
-        format_compliance_score = 95.0 # Placeholder (assuming our builder produces clean JSON/PDF)
-        content_quality_score = 75.0 # Placeholder
+        experience_relevance_score = EXPERIENCE_RELEVANCE_PLACEHOLDER
+        format_compliance_score = FORMAT_COMPLIANCE_PLACEHOLDER
+        content_quality_score = CONTENT_QUALITY_PLACEHOLDER
         
         # Calculate dynamic gap penalty
         # Mapping: High priority suggestions = Critical, Medium = Medium
@@ -28,12 +36,51 @@ class ATSScorer:
         critical_count = len([s for s in suggestions if s.get("priority") == "High"])
         medium_count = len([s for s in suggestions if s.get("priority") == "Medium"])
         
+        overall_score = float(self._combine(
+            skill_match_score, keyword_coverage_score, experience_relevance_score,
+            format_compliance_score, content_quality_score, critical_count, medium_count
+        ))
+
+        return {
+            "overall_score": round(overall_score, 1),
+            "breakdown": {
+                "skill_match": skill_match_score,
+                "keyword_coverage": keyword_coverage_score,
+                "experience_relevance": experience_relevance_score,
+                "format_compliance": format_compliance_score,
+                "content_quality": content_quality_score
+            }
+        }
+
+    def score_many(self, resume_datas: List[Union[ResumeDocument, Dict[str, Any]]], jd_data: Dict[str, Any], batch_gaps: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Vectorized score_resume for many resumes against one JD.
+        
+        batch_gaps is the output of GapAnalyzer.score_many. Returns arrays of
+        overall and skill-match scores aligned with resume_datas.
+        """
+        skill_match = np.array([self._calculate_skill_match(r, jd_data) for r in resume_datas], dtype=np.float64)
+        keyword_coverage = batch_gaps["overall_match_score"]
+        critical = batch_gaps["critical_missing"]
+        medium = batch_gaps["other_missing"]
+        # GapAnalyzer adds a generic Medium "Quantify Achievements" suggestion when fewer than 3 exist
+        medium = medium + ((critical + medium) < 3)
+        
+        overall = self._combine(
+            skill_match, keyword_coverage, EXPERIENCE_RELEVANCE_PLACEHOLDER,
+            FORMAT_COMPLIANCE_PLACEHOLDER, CONTENT_QUALITY_PLACEHOLDER, critical, medium
+        )
+        return {"overall_score": np.round(overall, 1), "skill_match": skill_match}
+
+    def _combine(self, skill_match_score, keyword_coverage_score, experience_relevance_score,
+                 format_compliance_score, content_quality_score, critical_count, medium_count):
+        # Works elementwise on floats or NumPy arrays
         # Example penalty logic: -5 for each critical, -2 for each medium, max 100
         penalty_val = (critical_count * 5.0) + (medium_count * 2.0)
-        gap_penalty = max(0.0, 100.0 - penalty_val)
+        gap_penalty = np.maximum(0.0, 100.0 - penalty_val)
         completeness_score = 90.0 # Placeholder
 
-        overall_score = (
+        return (
             self.weights["skill_match"] * skill_match_score +
             self.weights["keyword_coverage"] * keyword_coverage_score +
             self.weights["experience_relevance"] * experience_relevance_score +
@@ -43,25 +90,19 @@ class ATSScorer:
             self.weights["completeness"] * completeness_score
         )
 
-        return {
-            "overall_score": round(overall_score, 1),
-            "breakdown": {
-                "skill_match": skill_match_score,
-                "keyword_coverage": keyword_coverage_score,
-                "experience_relevance": experience_relevance_score,
-                "format_compliance": format_compliance_score,
-                "content_quality": content_quality_score
-            }
-        }
-
-    def _calculate_skill_match(self, resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> float:
+    def _calculate_skill_match(self, resume_data: Union[ResumeDocument, Dict[str, Any]], jd_data: Dict[str, Any],
+                               semantic_match: Optional[Callable[[List[str]], np.ndarray]] = None) -> float:
         jd_skills = set(jd_data.get("primary_skills", []))
         if not jd_skills:
             return 100.0
         
-        resume_skills = set(resume_data.get("skills", []))
+        resume_skills = set(ResumeDocument.of(resume_data).skills)
         matched = jd_skills.intersection(resume_skills)
+        credit = float(len(matched))
         
-        return (len(matched) / len(jd_skills)) * 100
-
-ats_scorer = ATSScorer()
+        # Skills without an exact match earn partial credit equal to their semantic similarity
+        unmatched = sorted(jd_skills - matched)
+        if semantic_match is not None and unmatched:
+            credit += float(np.sum(semantic_match(unmatched)))
+        
+        return (credit / len(jd_skills)) * 100
@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from app.core.metrics import BATCH_QUEUE_WAIT_SECONDS, BATCH_SIZE
+
+
+class _PendingRequest:
+    __slots__ = ("payload", "future", "enqueued_at")
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for a short window and runs them as one batch.
+
+    Callers block in submit() while a single background thread drains the queue.
+    A batch is dispatched as soon as it reaches max_batch_size, or when the
+    oldest request in it has waited max_wait_ms, whichever comes first.
+    run_batch receives the list of payloads and must return one result per payload.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        name: str = "batcher",
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._worker = None
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_size_counts: Dict[int, int] = {}
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._batch_time_total = 0.0
+
+    def submit(self, payload: Any) -> Any:
+        """Queue a payload and block until its batch has been processed."""
+        request = _PendingRequest(payload)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = self._batches
+            requests = self._requests
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "requests": requests,
+                "mean_batch_size": (requests / batches) if batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_size_counts.items())),
+                "mean_queue_wait_ms": (self._queue_wait_total / requests * 1000.0) if requests else 0.0,
+                "max_queue_wait_ms": self._queue_wait_max * 1000.0,
+                "mean_batch_time_ms": (self._batch_time_total / batches * 1000.0) if batches else 0.0,
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                worker = threading.Thread(target=self._loop, name=f"{self.name}-worker", daemon=True)
+                worker.start()
+                self._worker = worker
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        # Window closed: still pick up anything already waiting
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_PendingRequest]):
+        started = time.perf_counter()
+        waits = [started - r.enqueued_at for r in batch]
+
+        try:
+            results = self._run_batch([r.payload for r in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"{self.name}: batch returned {len(results)} results for {len(batch)} requests"
+                )
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+        else:
+            for r, result in zip(batch, results):
+                r.future.set_result(result)
+
+        elapsed = time.perf_counter() - started
+        BATCH_SIZE.labels(self.name).observe(len(batch))
+        wait_histogram = BATCH_QUEUE_WAIT_SECONDS.labels(self.name)
+        for wait in waits:
+            wait_histogram.observe(wait)
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            size = len(batch)
+            self._batch_size_counts[size] = self._batch_size_counts.get(size, 0) + 1
+            self._queue_wait_total += sum(waits)
+            self._queue_wait_max = max(self._queue_wait_max, max(waits))
+            self._batch_time_total += elapsed
@@ -1,50 +1,308 @@
-from transformers import T5ForConditionalGeneration, T5Tokenizer
+from transformers import StoppingCriteria, StoppingCriteriaList, T5ForConditionalGeneration, T5Tokenizer, TextIteratorStreamer
 import torch
+import hashlib
+import json
+import threading
+from app.core.cache import LRUCache, SQLiteCache, TieredCache
+from app.core.config import settings
+from app.core.metrics import metrics, cache_samples, MODEL_INFERENCE, MODEL_INFERENCE_ITEMS
+from app.engines.batching import MicroBatcher
+from app.engines.model_store import ModelStore, load_t5_model, load_t5_onnx, load_t5_tokenizer
+
+NUM_VARIANTS = 3
+
+# Cheapest tier: rule-based rewrites, no model call
+HEURISTIC_PRESET = "heuristic"
+
+# Latency tiers for generate(); every preset returns NUM_VARIANTS sequences.
+# "quality" is the original beam-search configuration.
+GENERATION_PRESETS = {
+    "fast": {
+        "do_sample": True,
+        "num_beams": 1,
+        "top_p": 0.92,
+        "temperature": 0.7,
+        "max_new_tokens": 48,
+    },
+    "balanced": {
+        "num_beams": 3,
+        "max_new_tokens": 64,
+        "early_stopping": True,
+    },
+    "quality": {
+        "num_beams": 5,
+        "max_length": 150,
+        "temperature": 0.7,
+        "early_stopping": True,
+    },
+}
+
+PRESETS = (HEURISTIC_PRESET, *GENERATION_PRESETS)
+
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx")
+
+# Seconds a streaming consumer waits for the next decoded chunk before giving up
+STREAM_CHUNK_TIMEOUT_SECONDS = 60
+
+
+class _CancelCriteria(StoppingCriteria):
+    """Stops generate() at the next decoding step once the event is set."""
+
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.cancel.is_set(), dtype=torch.bool, device=input_ids.device)
 
 class AIContentGenerator:
     def __init__(self):
         self.model_name = "t5-small"
+        self.backend = settings.INFERENCE_BACKEND
+        self.default_preset = settings.ENHANCE_DEFAULT_PRESET
+        if self.default_preset not in PRESETS:
+            print(f"Warning: Unknown ENHANCE_DEFAULT_PRESET '{self.default_preset}'. Using 'quality'.")
+            self.default_preset = "quality"
         self.model = None
         self.tokenizer = None
+        self.batcher = None
+        self.cache = TieredCache(
+            LRUCache(settings.ENHANCE_CACHE_MAX_ENTRIES, settings.ENHANCE_CACHE_TTL_SECONDS),
+            SQLiteCache(settings.ENHANCE_CACHE_DB_PATH, settings.ENHANCE_CACHE_TTL_SECONDS)
+            if settings.ENHANCE_CACHE_DB_PATH else None
+        )
+        metrics.register_collector("content_generator", self._metric_samples)
+        # With a model store, artifacts are verified local files and the hub is never consulted
+        store = ModelStore.from_settings()
         try:
-            self.tokenizer = T5Tokenizer.from_pretrained(self.model_name)
-            self.model = T5ForConditionalGeneration.from_pretrained(self.model_name)
+            self.tokenizer = load_t5_tokenizer(store) if store else T5Tokenizer.from_pretrained(self.model_name)
+            self.model = self._load_model(store)
         except Exception as e:
             print(f"Warning: Could not load T5 model. AI features will be disabled. Error: {e}")
 
-    def enhance_bullet(self, text: str, jd_context: dict, style: str = "balanced") -> list[str]:
-        if not self.model or not self.tokenizer:
-
-            # Heuristic fallback for when model is missing
-            # Provides realistic-looking enhancements using rule-based logic
-            words = text.split()
-            first_word = words[0] if words else ""
-            rest = " ".join(words[1:]) if len(words) > 1 else ""
-            
-            return [
-                f"Spearheaded {text.lower()} to drive operational efficiency.",
-                f"Orchestrated {text.lower()} resulting in measurable improvements.",
-                f"Developed and deployed {text.lower()}, aligning with business goals."
-            ]
-
-        # Construct prompt
+        if self.model and self.tokenizer:
+            # Concurrent enhance requests are coalesced into one padded generate() call
+            self.batcher = MicroBatcher(
+                self._generate_batch,
+                max_batch_size=settings.ENHANCE_MAX_BATCH_SIZE,
+                max_wait_ms=settings.ENHANCE_MAX_WAIT_MS,
+                name="t5-generate",
+            )
+
+    def enhance_bullet(self, text: str, jd_context: dict, style: str = "balanced", preset: str = None) -> list[str]:
+        preset = self._resolve_preset(preset)
+        if preset == HEURISTIC_PRESET or not self.model or not self.tokenizer:
+            return self._heuristic_variants(text)
+
+        key = self._cache_key(text, jd_context, style, preset)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        prompt = self._build_prompt(text, jd_context, style)
+        variants = self.batcher.submit((preset, prompt))
+        self.cache.set(key, variants)
+        return list(variants)
+
+    def stream_bullet(self, text: str, jd_context: dict, style: str = "balanced", preset: str = None,
+                      cancel: threading.Event = None):
+        """
+        Yield enhancement events as soon as they are produced.
+
+        {"event": "token", "index": i, "text": chunk} is emitted while variant i
+        decodes and {"event": "variant", "index": i, "text": variant} once it is
+        complete. Greedy/sampling presets decode one variant at a time and stream
+        every chunk; beam search can't expose partial hypotheses, so beam presets
+        emit their finished variants together. Setting `cancel` stops generation
+        at the next decoding step.
+        """
+        preset = self._resolve_preset(preset)
+        cancel = cancel or threading.Event()
+
+        if preset == HEURISTIC_PRESET or not self.model or not self.tokenizer:
+            variants = self._heuristic_variants(text)
+            key = None
+        else:
+            key = self._cache_key(text, jd_context, style, preset)
+            variants = self.cache.get(key)
+        if variants is not None:
+            for i, variant in enumerate(variants):
+                yield {"event": "variant", "index": i, "text": variant}
+            return
+
+        prompt = self._build_prompt(text, jd_context, style)
+        params = GENERATION_PRESETS[preset]
+        variants = []
+        try:
+            if params.get("num_beams", 1) == 1:
+                for i in range(NUM_VARIANTS):
+                    pieces = []
+                    for chunk in self._stream_one(prompt, params, cancel):
+                        pieces.append(chunk)
+                        yield {"event": "token", "index": i, "text": chunk}
+                    if cancel.is_set():
+                        return
+                    variants.append("".join(pieces).strip())
+                    yield {"event": "variant", "index": i, "text": variants[-1]}
+            else:
+                variants = self._generate(preset, [prompt], cancel=cancel)[0]
+                if cancel.is_set():
+                    return
+                for i, variant in enumerate(variants):
+                    yield {"event": "variant", "index": i, "text": variant}
+        finally:
+            # Stop the model thread if the consumer went away mid-generation
+            if len(variants) < NUM_VARIANTS:
+                cancel.set()
+        self.cache.set(key, variants)
+
+    def _stream_one(self, prompt: str, params: dict, cancel: threading.Event):
+        """Decode a single sequence on a model thread, yielding text chunks as they are produced."""
+        inputs = self.tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_CHUNK_TIMEOUT_SECONDS
+        )
+        failure = []
+
+        def run():
+            try:
+                MODEL_INFERENCE.labels(self.model_name).inc()
+                MODEL_INFERENCE_ITEMS.labels(self.model_name).inc()
+                with torch.inference_mode():
+                    self.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_CancelCriteria(cancel)]),
+                        num_return_sequences=1,
+                        **params
+                    )
+            except Exception as e:
+                failure.append(e)
+                # Unblock the consumer; generate() only ends the stream on success
+                streamer.end()
+
+        thread = threading.Thread(target=run, name="t5-stream", daemon=True)
+        thread.start()
+        finished = False
+        try:
+            for chunk in streamer:
+                if chunk:
+                    yield chunk
+            finished = True
+        finally:
+            # Closed before the stream ended: stop decoding rather than run it out
+            if not finished:
+                cancel.set()
+            thread.join()
+        if failure:
+            raise failure[0]
+
+    def _resolve_preset(self, preset: str) -> str:
+        preset = preset or self.default_preset
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preset '{preset}'. Expected one of: {', '.join(PRESETS)}")
+        return preset
+
+    def _heuristic_variants(self, text: str) -> list[str]:
+        # Heuristic fallback for when model is missing (or the "heuristic" preset is requested)
+        # Provides realistic-looking enhancements using rule-based logic
+        return [
+            f"Spearheaded {text.lower()} to drive operational efficiency.",
+            f"Orchestrated {text.lower()} resulting in measurable improvements.",
+            f"Developed and deployed {text.lower()}, aligning with business goals."
+        ]
+
+    def _load_model(self, store: ModelStore = None):
+        """Load t5-small for the configured inference backend."""
+        if self.backend not in INFERENCE_BACKENDS:
+            print(f"Warning: Unknown INFERENCE_BACKEND '{self.backend}'. Using 'torch'.")
+            self.backend = "torch"
+
+        if self.backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSeq2SeqLM
+                if settings.ONNX_MODEL_DIR:
+                    return ORTModelForSeq2SeqLM.from_pretrained(settings.ONNX_MODEL_DIR)
+                # No exported model configured: export on the fly (slow startup)
+                if store:
+                    return load_t5_onnx(store)
+                return ORTModelForSeq2SeqLM.from_pretrained(self.model_name, export=True)
+            except ImportError:
+                print("Warning: optimum[onnxruntime] not installed. Falling back to the torch backend.")
+                self.backend = "torch"
+
+        model = load_t5_model(store) if store else T5ForConditionalGeneration.from_pretrained(self.model_name)
+        model.eval()
+        if self.backend == "torch-int8":
+            # Dynamic quantization: int8 Linear weights, activations quantized on the fly
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def batch_stats(self) -> dict:
+        if not self.batcher:
+            return {"enabled": False}
+        return {"enabled": True, **self.batcher.stats()}
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def _metric_samples(self):
+        stats = self.cache.stats()
+        samples = cache_samples("enhance_memory", stats["memory"])
+        if stats["disk"] is not None:
+            samples += cache_samples("enhance_disk", stats["disk"])
+        if self.batcher:
+            samples.append((
+                "batch_queue_depth", "gauge", "Requests waiting for a micro-batch",
+                {"batcher": self.batcher.name}, self.batcher.stats()["queue_depth"]
+            ))
+        return samples
+
+    def _cache_key(self, text: str, jd_context: dict, style: str, preset: str) -> str:
+        # Whitespace/case differences in the bullet should not defeat the cache
+        normalized = " ".join(text.split()).casefold()
+        role = str(jd_context.get("role", "Engineer")).strip().casefold()
+        skills = [str(s).strip().casefold() for s in jd_context.get("primary_skills", [])]
+        raw = json.dumps([normalized, role, skills, style, preset, self.model_name, self.backend], separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _build_prompt(self, text: str, jd_context: dict, style: str) -> str:
         role = jd_context.get("role", "Engineer")
         skills = ", ".join(jd_context.get("primary_skills", []))
-        
-        prompt = f"enhance resume bullet: {text} | role: {role} | skills: {skills} | style: {style}"
-        
-        input_ids = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-        
-        outputs = self.model.generate(
-            input_ids,
-            max_length=150,
-            num_return_sequences=3,
-            num_beams=5, # Beam search for better quality
-            temperature=0.7,
-            early_stopping=True
+        return f"enhance resume bullet: {text} | role: {role} | skills: {skills} | style: {style}"
+
+    def _generate_batch(self, requests: list[tuple[str, str]]) -> list[list[str]]:
+        # A micro-batch can mix presets; generate() once per preset group
+        groups = {}
+        for i, (preset, prompt) in enumerate(requests):
+            groups.setdefault(preset, []).append(i)
+
+        results = [None] * len(requests)
+        for preset, indices in groups.items():
+            variants = self._generate(preset, [requests[i][1] for i in indices])
+            for i, v in zip(indices, variants):
+                results[i] = v
+        return results
+
+    def _generate(self, preset: str, prompts: list[str], cancel: threading.Event = None) -> list[list[str]]:
+        # Pad to the longest prompt in the batch; the attention mask keeps padding inert
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            max_length=512,
+            truncation=True
         )
         
-        variants = [self.tokenizer.decode(o, skip_special_tokens=True) for o in outputs]
-        return variants
-
-content_generator = AIContentGenerator()
+        MODEL_INFERENCE.labels(self.model_name).inc()
+        MODEL_INFERENCE_ITEMS.labels(self.model_name).inc(len(prompts))
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                num_return_sequences=NUM_VARIANTS,
+                stopping_criteria=StoppingCriteriaList([_CancelCriteria(cancel)]) if cancel else None,
+                **GENERATION_PRESETS[preset]
+            )
+        
+        # generate() returns NUM_VARIANTS consecutive rows per input prompt
+        decoded = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [decoded[i * NUM_VARIANTS:(i + 1) * NUM_VARIANTS] for i in range(len(prompts))]
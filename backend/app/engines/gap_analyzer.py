@@ -1,64 +1,229 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from app.core.config import settings
+from app.engines.idf_model import IDFModel, TermVector, DEFAULT_IDF_MODEL_PATH, tokenize
+from app.engines.resume_document import ResumeDocument
+from scipy import sparse
+from typing import Any, Callable, Dict, List, Optional, Union
+import math
 import numpy as np
+import os
+
+# JD terms below this normalized weight are too incidental to report as gaps/matches
+MIN_JD_TERM_WEIGHT = 0.05
+# Missing JD terms above these weights are high / medium severity gaps
+HIGH_IMPACT_WEIGHT = 0.3
+MEDIUM_IMPACT_WEIGHT = 0.15
+
+# Without a prefit model every JD/resume pair is weighted on its own, as the original
+# per-request TfidfVectorizer fit on [jd, resume] did: smoothed IDF over two documents
+PAIR_IDF_SHARED = 1.0  # ln(3 / 3) + 1, term in both
+PAIR_IDF_UNIQUE = math.log(3 / 2) + 1  # term in only one of the two
+
+
+def _pair_weigh(weights: np.ndarray, shared_idx: np.ndarray) -> np.ndarray:
+    """Re-weight a uniform (normalized term frequency) vector with the pair IDF and renormalize."""
+    weights = weights * PAIR_IDF_UNIQUE
+    weights[shared_idx] *= PAIR_IDF_SHARED / PAIR_IDF_UNIQUE
+    norm = np.sqrt(np.dot(weights, weights))
+    return weights / norm if norm > 0 else weights
 
 class GapAnalyzer:
+    """
+    Stateless gap engine: every request is scored against an IDF model fit
+    offline (see `python -m app.engines.idf_model`), so concurrent calls never
+    mutate shared state.
+
+    When no model has been built, vectors carry plain normalized term
+    frequencies and each comparison applies the IDF of just that JD/resume
+    pair, which reproduces the scores of the original per-request
+    TfidfVectorizer. A prefit model weights terms by their rarity across the
+    whole JD corpus instead, so scores shift once one is installed.
+    """
+
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+        path = settings.IDF_MODEL_PATH or DEFAULT_IDF_MODEL_PATH
+        if os.path.exists(path):
+            self.idf_model = IDFModel.load(path)
+        else:
+            print(f"Warning: IDF model not found at {path}. Falling back to per-pair IDF weights.")
+            self.idf_model = IDFModel.uniform()
+        self.pair_idf = len(self.idf_model) == 0
+
+    def vectorize(self, text: str) -> TermVector:
+        return self.idf_model.vectorize(text)
+
+    def vectorize_counts(self, counts: Dict[str, int]) -> TermVector:
+        return self.idf_model.vectorize_counts(counts)
+
+    def vectorize_resume(self, resume: Union[ResumeDocument, Dict[str, Any]]) -> TermVector:
+        """Vectorize a resume from its cached term counts (same vector as vectorize(dict_to_text(resume)))."""
+        return self.vectorize_counts(ResumeDocument.of(resume).counts)
 
     def analyze_gaps(self, jd_text: str, resume_text: str) -> dict:
-        # Simple TF-IDF comparison
-        corpus = [jd_text, resume_text]
-        tfidf_matrix = self.vectorizer.fit_transform(corpus)
+        return self.compare(self.vectorize(jd_text), self.vectorize(resume_text))
+
+    def compare(self, jd_vec: TermVector, resume_vec: TermVector,
+                semantic_match: Optional[Callable[[List[str]], np.ndarray]] = None) -> dict:
+        """
+        Report matches and gaps of a resume against a JD.
         
-        # Cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        semantic_match (see SkillEmbeddings.matcher) scores JD terms the resume
+        lacks verbatim; those it matches ("postgres" vs "PostgreSQL") count as
+        strong matches with their similarity instead of gaps.
+        """
+        # Both vectors are sorted by term, so the overlap is a merge of nonzeros
+        _, jd_idx, resume_idx = np.intersect1d(
+            jd_vec.terms, resume_vec.terms, assume_unique=True, return_indices=True
+        )
+        
+        jd_weights, resume_weights = jd_vec.weights, resume_vec.weights
+        if self.pair_idf:
+            jd_weights = _pair_weigh(jd_weights, jd_idx)
+            resume_weights = _pair_weigh(resume_weights, resume_idx)
+        
+        # Cosine similarity of two L2-normalized vectors
+        similarity = float(np.dot(jd_weights[jd_idx], resume_weights[resume_idx]))
         
         gaps = {
-            "overall_match_score": float(similarity * 100),
+            "overall_match_score": similarity * 100,
             "critical": [],
             "medium": [],
             "strong_matches": []
         }
         
-        feature_names = self.vectorizer.get_feature_names_out()
-        dense = tfidf_matrix.todense()
-        jd_scores = dense[0].tolist()[0]
-        resume_scores = dense[1].tolist()[0]
+        # We focus on keywords present in JD (score > 0.05)
+        # lowered threshold to ensure we catch important terms even in short text
+        relevant = jd_weights >= MIN_JD_TERM_WEIGHT
+        in_resume = np.zeros(len(jd_vec), dtype=bool)
+        in_resume[jd_idx] = True
         
-        for idx, jd_req in enumerate(feature_names):
-            # We focus on keywords present in JD (score > 0.05)
-            # lowered threshold to ensure we catch important terms even in short text
-            jd_score = jd_scores[idx]
-            if jd_score < 0.05:
-                continue
-
-            # Check resume score
-            resume_score = resume_scores[idx]
-            
-            # Simple similarity proxy: ratio
-            # If resume has it (score > 0), similarity is high vs 0
-            if resume_score > 0:
-                 gaps["strong_matches"].append({
+        # If resume has it (score > 0), similarity is high vs 0
+        for jd_req in jd_vec.terms[relevant & in_resume].tolist():
+            gaps["strong_matches"].append({
+                "requirement": jd_req,
+                "similarity": 1.0 # Simplified
+            })
+        
+        missing = relevant & ~in_resume
+        if semantic_match is not None and missing.any():
+            missing_idx = np.flatnonzero(missing)
+            semantic = semantic_match(jd_vec.terms[missing_idx].tolist())
+            for jd_req, score in zip(jd_vec.terms[missing_idx[semantic > 0]].tolist(), semantic[semantic > 0].tolist()):
+                gaps["strong_matches"].append({
                     "requirement": jd_req,
-                    "similarity": 1.0 # Simplified
+                    "similarity": round(score, 4)
                 })
+            missing[missing_idx[semantic > 0]] = False
+        
+        for jd_req, jd_score in zip(jd_vec.terms[missing].tolist(), jd_weights[missing].tolist()):
+            impact_data = self.calculate_impact(jd_req, jd_score)
+            gap_item = {
+                "requirement": jd_req,
+                "similarity": 0.0,
+                "impact": impact_data["score_delta"],
+                "severity": impact_data["severity"],
+                "action": f"Add experience with {jd_req}"
+            }
+            
+            if impact_data["severity"] == "high":
+                gaps["critical"].append(gap_item)
             else:
-                # Missing
-                impact_data = self.calculate_impact(jd_req, jd_score)
-                gap_item = {
-                    "requirement": jd_req,
-                    "similarity": 0.0,
-                    "impact": impact_data["score_delta"],
-                    "severity": impact_data["severity"],
-                    "action": f"Add experience with {jd_req}"
-                }
-                
-                if impact_data["severity"] == "high":
-                    gaps["critical"].append(gap_item)
-                else:
-                    gaps["medium"].append(gap_item)
+                gaps["medium"].append(gap_item)
+        
+        return self._build_report(gaps)
+
+    def score_many(self, jd_vec: TermVector, resume_texts: List[str]) -> dict:
+        """
+        Score many resumes against one JD vector in a single sparse operation.
+        
+        Resumes are tokenized into one (doc, term) count matrix, weighted and
+        normalized with vectorized NumPy, then projected onto the JD's terms,
+        so similarity for every resume is one sparse matrix-vector product.
+        Returns per-resume arrays aligned with resume_texts; row i of
+        "missing" masks the relevant_terms resume i lacks.
+        """
+        n_docs = len(resume_texts)
+        
+        # Assign integer ids to terms while tokenizing; everything after this is NumPy
+        term_ids = {}
+        doc_ids = []
+        token_ids = []
+        for doc_id, text in enumerate(resume_texts):
+            ids = [term_ids.setdefault(t, len(term_ids)) for t in tokenize(text)]
+            token_ids.extend(ids)
+            doc_ids.extend([doc_id] * len(ids))
+        
+        n_terms = max(len(term_ids), 1)
+        keys = np.asarray(doc_ids, dtype=np.int64) * n_terms + np.asarray(token_ids, dtype=np.int64)
+        keys, tf = np.unique(keys, return_counts=True)
+        pair_docs = keys // n_terms
+        pair_terms = keys % n_terms
+        
+        vocab = np.array(list(term_ids), dtype=str)
+        if len(jd_vec) and len(vocab):
+            col = np.minimum(np.searchsorted(jd_vec.terms, vocab), len(jd_vec) - 1)
+            in_jd = jd_vec.terms[col] == vocab
+        else:
+            in_jd = np.zeros(len(vocab), dtype=bool)
+        
+        if self.pair_idf:
+            weights = tf * np.where(in_jd[pair_terms], PAIR_IDF_SHARED, PAIR_IDF_UNIQUE)
+        else:
+            weights = tf * self.idf_model.idf_for(vocab)[pair_terms] if len(vocab) else tf.astype(np.float64)
+        norms = np.sqrt(np.bincount(pair_docs, weights=weights * weights, minlength=n_docs))
+        weights = weights / np.where(norms > 0, norms, 1.0)[pair_docs]
+        
+        # Keep only the (doc, term) pairs whose term appears in the JD
+        if len(jd_vec) and len(vocab):
+            keep = in_jd[pair_terms]
+            matrix = sparse.csr_matrix(
+                (weights[keep], (pair_docs[keep], col[pair_terms[keep]])),
+                shape=(n_docs, len(jd_vec))
+            )
+        else:
+            matrix = sparse.csr_matrix((n_docs, len(jd_vec)))
+        
+        if self.pair_idf:
+            return self._score_many_pair_idf(jd_vec, matrix)
         
+        similarity = matrix @ jd_vec.weights
+        
+        relevant_cols = np.flatnonzero(jd_vec.weights >= MIN_JD_TERM_WEIGHT)
+        severities = np.array(
+            [self.calculate_impact(t, w)["severity"] for t, w in
+             zip(jd_vec.terms[relevant_cols].tolist(), jd_vec.weights[relevant_cols].tolist())],
+            dtype=str
+        )
+        present = matrix[:, relevant_cols].toarray() > 0
+        missing = ~present
+        high = severities == "high"
+        
+        return {
+            "overall_match_score": similarity * 100,
+            "relevant_terms": jd_vec.terms[relevant_cols],
+            "missing": missing,
+            "critical_missing": missing[:, high].sum(axis=1),
+            "other_missing": missing[:, ~high].sum(axis=1)
+        }
+
+    def _score_many_pair_idf(self, jd_vec: TermVector, matrix: sparse.csr_matrix) -> dict:
+        """score_many when each resume is weighted against the JD alone: the JD's weights differ per resume."""
+        present = matrix.toarray() > 0
+        jd_weights = jd_vec.weights * np.where(present, PAIR_IDF_SHARED, PAIR_IDF_UNIQUE)
+        norms = np.sqrt(np.einsum("ij,ij->i", jd_weights, jd_weights))
+        jd_weights /= np.where(norms > 0, norms, 1.0)[:, None]
+        
+        similarity = np.asarray(matrix.multiply(jd_weights).sum(axis=1)).ravel()
+        missing = (jd_weights >= MIN_JD_TERM_WEIGHT) & ~present
+        high = jd_weights > HIGH_IMPACT_WEIGHT
+        return {
+            "overall_match_score": similarity * 100,
+            "relevant_terms": jd_vec.terms,
+            "missing": missing,
+            "critical_missing": (missing & high).sum(axis=1),
+            "other_missing": (missing & ~high).sum(axis=1)
+        }
+
+    def _build_report(self, gaps: dict) -> dict:
         # Transform to Frontend-expected structure
         improvement_suggestions = []
         strengths = []
@@ -102,7 +267,7 @@ class GapAnalyzer:
         for i, match in enumerate(gaps["strong_matches"]):
             strengths.append({
                 "area": f"Proficiency in {match['requirement']}",
-                "score": 100,
+                "score": round(match["similarity"] * 100),
                 "description": f"You have successfully highlighted {match['requirement']}."
             })
             
@@ -129,11 +294,9 @@ class GapAnalyzer:
 
     def calculate_impact(self, requirement: str, importance: float) -> dict:
         # Heuristic: if importance is high in JD, impact is high
-        if importance > 0.3:
+        if importance > HIGH_IMPACT_WEIGHT:
             return {"score_delta": -25, "severity": "high"}
-        elif importance > 0.15:
+        elif importance > MEDIUM_IMPACT_WEIGHT:
             return {"score_delta": -10, "severity": "medium"}
         else:
             return {"score_delta": -5, "severity": "low"}
-
-gap_analyzer = GapAnalyzer()
@@ -0,0 +1,214 @@
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from app.core.config import parse_limits, settings
+from app.core.metrics import metrics, ENGINE_QUEUE_WAIT_SECONDS
+
+# Weight of the newest call in each engine's moving-average service time
+SERVICE_TIME_ALPHA = 0.2
+
+_torch_configured_pid: Optional[int] = None
+
+
+class EngineBusy(Exception):
+    """
+    Raised when an engine sheds a call instead of queueing it.
+
+    status_code is 429 when the engine's queue is full and 503 when the
+    expected (or actual) queue wait exceeds ENGINE_MAX_QUEUE_WAIT_MS;
+    retry_after is a hint in seconds.
+    """
+
+    def __init__(self, engine: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"Engine '{engine}' is overloaded ({reason}), retry in {retry_after}s")
+        self.engine = engine
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _EngineLimit:
+    __slots__ = ("name", "limit", "semaphore", "waiting", "running", "admitted", "queue_full",
+                 "wait_exceeded", "service_time", "wait_total")
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.waiting = 0
+        self.running = 0
+        self.admitted = 0
+        self.queue_full = 0
+        self.wait_exceeded = 0
+        # Moving average of how long a call holds its slot; None until the first call finishes
+        self.service_time: Optional[float] = None
+        self.wait_total = 0.0
+
+
+class EngineGovernor:
+    """
+    Per-engine admission control for the API worker.
+
+    Every governed engine has a BoundedSemaphore of ENGINE_CONCURRENCY slots.
+    A call first checks the queue: past max_queue waiters it is rejected with
+    429, and when the waiters ahead of it would keep it queued longer than
+    max_wait (from the engine's moving-average service time) it is rejected
+    with 503 straight away. Otherwise it waits for a slot up to max_wait and
+    gets 503 if none frees up. Latency therefore stays bounded under
+    overload instead of growing with the backlog. Engines without a limit
+    are not governed. Background jobs pass shed=False to wait for a slot
+    however long it takes.
+    """
+
+    def __init__(self, limits: Dict[str, int], max_queue: int, max_wait: float):
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max(0.0, max_wait)
+        self._limits = {name: _EngineLimit(name, limit) for name, limit in limits.items()}
+        self._lock = threading.Lock()
+        metrics.register_collector("engine_governor", self._metric_samples)
+
+    @classmethod
+    def from_settings(cls) -> "EngineGovernor":
+        return cls(
+            parse_limits(settings.ENGINE_CONCURRENCY, "ENGINE_CONCURRENCY"),
+            settings.ENGINE_MAX_QUEUE,
+            settings.ENGINE_MAX_QUEUE_WAIT_MS / 1000.0,
+        )
+
+    def acquire(self, name: str, shed: bool = True) -> Callable[[], None]:
+        """Take a slot for one call to engine `name`; returns the function that releases it."""
+        limit = self._limits.get(name)
+        if limit is None:
+            return _no_release
+
+        with self._lock:
+            if shed:
+                self._admit(limit)
+            limit.waiting += 1
+        queued = time.perf_counter()
+        acquired = limit.semaphore.acquire(timeout=self.max_wait if shed else None)
+        waited = time.perf_counter() - queued
+        ENGINE_QUEUE_WAIT_SECONDS.labels(name).observe(waited)
+        with self._lock:
+            limit.waiting -= 1
+            if not acquired:
+                limit.wait_exceeded += 1
+                raise EngineBusy(name, 503, self._retry_after(limit), "queue wait timed out")
+            limit.running += 1
+            limit.admitted += 1
+            limit.wait_total += waited
+
+        started = time.perf_counter()
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                limit.running -= 1
+                limit.service_time = elapsed if limit.service_time is None else (
+                    SERVICE_TIME_ALPHA * elapsed + (1 - SERVICE_TIME_ALPHA) * limit.service_time
+                )
+            limit.semaphore.release()
+
+        return release
+
+    @contextmanager
+    def slot(self, name: str, shed: bool = True):
+        """Hold a slot of engine `name` for the duration of the block."""
+        release = self.acquire(name, shed)
+        try:
+            yield
+        finally:
+            release()
+
+    def _admit(self, limit: _EngineLimit):
+        # Caller holds self._lock
+        if limit.waiting >= self.max_queue and limit.running >= limit.limit:
+            limit.queue_full += 1
+            raise EngineBusy(limit.name, 429, self._retry_after(limit), "queue full")
+        expected = self._expected_wait(limit)
+        if expected > self.max_wait:
+            limit.wait_exceeded += 1
+            raise EngineBusy(limit.name, 503, self._retry_after(limit), "expected queue wait too long")
+
+    @staticmethod
+    def _expected_wait(limit: _EngineLimit) -> float:
+        if limit.running + limit.waiting < limit.limit or limit.service_time is None:
+            return 0.0
+        # Everyone queued ahead, plus this call, drains `limit` at a time
+        return (limit.waiting + 1) / limit.limit * limit.service_time
+
+    def _retry_after(self, limit: _EngineLimit) -> int:
+        return max(1, math.ceil(self._expected_wait(limit)))
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                name: {
+                    "limit": limit.limit,
+                    "running": limit.running,
+                    "queue_depth": limit.waiting,
+                    "admitted": limit.admitted,
+                    "rejected_queue_full": limit.queue_full,
+                    "rejected_wait": limit.wait_exceeded,
+                    "mean_queue_wait_ms": (limit.wait_total / limit.admitted * 1000.0) if limit.admitted else 0.0,
+                    "service_time_ms": (limit.service_time or 0.0) * 1000.0,
+                }
+                for name, limit in self._limits.items()
+            }
+
+    def _metric_samples(self):
+        samples = []
+        for name, stats in self.stats().items():
+            labels = {"engine": name}
+            samples.extend([
+                ("engine_queue_depth", "gauge", "Engine calls waiting for a concurrency slot", labels, stats["queue_depth"]),
+                ("engine_running", "gauge", "Engine calls holding a concurrency slot", labels, stats["running"]),
+                ("engine_rejected_total", "counter", "Engine calls shed by admission control",
+                 {**labels, "reason": "queue_full"}, stats["rejected_queue_full"]),
+                ("engine_rejected_total", "counter", "Engine calls shed by admission control",
+                 {**labels, "reason": "wait"}, stats["rejected_wait"]),
+            ])
+        return samples
+
+
+def _no_release():
+    pass
+
+
+def configure_torch_threads(processes: int = 1):
+    """
+    Size torch's thread pools once per process.
+
+    Intra-op threads default to the CPUs split across `processes` web
+    workers (TORCH_NUM_THREADS overrides); TORCH_INTEROP_THREADS is applied
+    when set. Concurrent generate() calls each use the intra-op pool, so
+    ENGINE_CONCURRENCY for content_generator times these threads is the
+    CPU demand of the model under load.
+    """
+    global _torch_configured_pid
+    if _torch_configured_pid == os.getpid():
+        return
+    _torch_configured_pid = os.getpid()
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(settings.TORCH_NUM_THREADS or max(1, (os.cpu_count() or 1) // max(1, processes)))
+    if settings.TORCH_INTEROP_THREADS:
+        try:
+            torch.set_num_interop_threads(settings.TORCH_INTEROP_THREADS)
+        except RuntimeError as e:
+            # Only possible before torch runs any inter-op parallel work in this process
+            print(f"Warning: Could not set TORCH_INTEROP_THREADS={settings.TORCH_INTEROP_THREADS}: {e}")
+
+
+governor = EngineGovernor.from_settings()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+DEFAULT_IDF_MODEL_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "idf_model.npz")
+)
+
+# Same analyzer as TfidfVectorizer(stop_words='english'): lowercase, 2+ word chars, no stop words
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in ENGLISH_STOP_WORDS]
+
+
+class TermVector:
+    """
+    Sparse, L2-normalized TF-IDF vector for one document.
+
+    terms is sorted and unique, weights is aligned with terms. Both arrays are
+    read-only so vectors can be shared between threads and cached.
+    """
+
+    __slots__ = ("terms", "weights")
+
+    def __init__(self, terms: np.ndarray, weights: np.ndarray):
+        terms.flags.writeable = False
+        weights.flags.writeable = False
+        self.terms = terms
+        self.weights = weights
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+def _empty_vector() -> TermVector:
+    return TermVector(np.array([], dtype=str), np.array([], dtype=np.float64))
+
+
+class IDFModel:
+    """
+    Read-only inverse document frequencies prefit on a job-description corpus.
+
+    Uses scikit-learn's smoothed formula, idf = ln((1 + n) / (1 + df)) + 1.
+    Terms that never appeared in the corpus get the df = 0 value. An empty
+    (uniform) model weights every term as 1.0, so it falls back to plain
+    normalized term frequency.
+    """
+
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, n_docs: int):
+        # Lookups use binary search, so the vocabulary must be sorted
+        order = np.argsort(terms, kind="stable")
+        self.terms = terms[order]
+        self.idf = idf[order].astype(np.float64)
+        self.terms.flags.writeable = False
+        self.idf.flags.writeable = False
+        self.n_docs = int(n_docs)
+        self.default_idf = math.log((1 + self.n_docs) / 1) + 1 if self.n_docs else 1.0
+
+    @classmethod
+    def uniform(cls) -> "IDFModel":
+        return cls(np.array([], dtype=str), np.array([], dtype=np.float64), 0)
+
+    @classmethod
+    def fit(cls, documents: Iterable[str], min_df: int = 1) -> "IDFModel":
+        df: Counter = Counter()
+        n_docs = 0
+        for doc in documents:
+            df.update(set(tokenize(doc)))
+            n_docs += 1
+
+        vocab = sorted(t for t, count in df.items() if count >= min_df)
+        counts = np.array([df[t] for t in vocab], dtype=np.float64)
+        idf = np.log((1 + n_docs) / (1 + counts)) + 1
+        return cls(np.array(vocab, dtype=str), idf, n_docs)
+
+    @classmethod
+    def load(cls, path: str) -> "IDFModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["terms"], data["idf"], int(data["n_docs"]))
+
+    def save(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, terms=self.terms, idf=self.idf, n_docs=np.int64(self.n_docs))
+
+    def idf_for(self, terms: np.ndarray) -> np.ndarray:
+        """Vectorized idf lookup for an array of terms."""
+        if not len(self.terms):
+            return np.full(len(terms), self.default_idf, dtype=np.float64)
+        idx = np.searchsorted(self.terms, terms)
+        idx_clipped = np.minimum(idx, len(self.terms) - 1)
+        found = self.terms[idx_clipped] == terms
+        return np.where(found, self.idf[idx_clipped], self.default_idf)
+
+    def vectorize(self, text: str) -> TermVector:
+        tokens = tokenize(text)
+        if not tokens:
+            return _empty_vector()
+        terms, tf = np.unique(np.array(tokens, dtype=str), return_counts=True)
+        return self._weigh(terms, tf.astype(np.float64))
+
+    def vectorize_counts(self, counts: Dict[str, int]) -> TermVector:
+        """Vectorize precomputed raw term counts (e.g. summed over resume sections)."""
+        counts = {t: c for t, c in counts.items() if c > 0}
+        if not counts:
+            return _empty_vector()
+        terms = np.array(sorted(counts), dtype=str)
+        tf = np.array([counts[t] for t in terms.tolist()], dtype=np.float64)
+        return self._weigh(terms, tf)
+
+    def _weigh(self, terms: np.ndarray, tf: np.ndarray) -> TermVector:
+        weights = tf * self.idf_for(terms)
+        weights /= np.sqrt(np.dot(weights, weights))
+        return TermVector(terms, weights)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+def _iter_corpus(input_dir: str):
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.endswith((".txt", ".md")):
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    yield f.read()
+            elif name.endswith(".json"):
+                # Either a single JD object/string or a list of them
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for item in data if isinstance(data, list) else [data]:
+                    text = item.get("text", "") if isinstance(item, dict) else str(item)
+                    if text:
+                        yield text
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the IDF model used by GapAnalyzer from a folder of JDs.")
+    parser.add_argument("input_dir", help="Folder of job descriptions (.txt/.md files, or .json with a 'text' field)")
+    parser.add_argument("--output", default=DEFAULT_IDF_MODEL_PATH, help="Destination .npz file")
+    parser.add_argument("--min-df", type=int, default=2, help="Drop terms seen in fewer documents than this")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"{args.input_dir} is not a directory")
+
+    started = time.perf_counter()
+    model = IDFModel.fit(_iter_corpus(args.input_dir), min_df=args.min_df)
+    if not model.n_docs:
+        parser.error(f"No job descriptions found in {args.input_dir}")
+    model.save(args.output)
+    print(
+        f"Fitted IDF on {model.n_docs} documents, {len(model)} terms "
+        f"in {time.perf_counter() - started:.2f}s -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
+from app.engines.resume_document import ResumeDocument
 
 class InterviewerSimulator:
     def __init__(self):
@@ -11,9 +12,10 @@ class InterviewerSimulator:
         }
         self.scan_time = 6.0 # seconds
 
-    def simulate_scan(self, resume_structure: Dict[str, Any]) -> Dict[str, Any]:
+    def simulate_scan(self, resume_structure: Union[ResumeDocument, Dict[str, Any]]) -> Dict[str, Any]:
         # Generate dynamic insights based on resume content length and structure
         # This is a heuristic simulation
+        resume_structure = ResumeDocument.of(resume_structure)
         
         # Calculate a mock rating based on completeness
         score = 3.0
@@ -21,19 +23,19 @@ class InterviewerSimulator:
         impression = "The resume looks structured."
         
         # Check for basics
-        if not resume_structure.get('experience', []):
+        if not resume_structure.has_section('experience'):
             concerns.append("Lack of experience details")
             score -= 0.5
         else:
             score += 1.0
             impression = "Solid experience section stands out."
             
-        if not resume_structure.get('education', []):
+        if not resume_structure.has_section('education'):
             concerns.append("Education section missing")
         else:
             score += 0.5
             
-        if not resume_structure.get('skills', []):
+        if not resume_structure.has_section('skills'):
             concerns.append("Skills section underpopulated")
         else:
             score += 0.5
@@ -55,5 +57,3 @@ class InterviewerSimulator:
             "recruiter_perspective": recruiter_perspective,
             "likely_questions": likely_questions
         }
-
-interviewer_simulator = InterviewerSimulator()
@@ -1,29 +1,47 @@
 import spacy
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
 import re
+from app.core.config import settings
+from app.engines.model_store import ModelStore, ModelStoreError, load_spacy
+from app.engines.skill_matcher import SkillMatcher, DEFAULT_TAXONOMY_PATH
+
+# Only the tokenizer and NER are consulted; skip the rest of the pipeline
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
 
 class JDIntelligenceEngine:
     def __init__(self):
+        store = ModelStore.from_settings()
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = load_spacy(store, UNUSED_PIPES) if store else spacy.load("en_core_web_sm", exclude=UNUSED_PIPES)
+            # The shared tok2vec only feeds the tagger/parser unless NER listens to it
+            if "tok2vec" in self.nlp.pipe_names and not self.nlp.get_pipe("tok2vec").listening_components:
+                self.nlp.remove_pipe("tok2vec")
         except OSError:
             print("Warning: en_core_web_sm not found. Using blank 'en' model.")
             self.nlp = spacy.blank("en")
+        except ModelStoreError as e:
+            print(f"Warning: {e}. Using blank 'en' model.")
+            self.nlp = spacy.blank("en")
 
-        # Basic taxonomy (in production this would be larger/external)
-        self.skill_taxonomy = {
-            "languages": {"python", "java", "javascript", "typescript", "c++", "go", "rust", "sql"},
-            "frameworks": {"react", "fastapi", "django", "flask", "spring boot", "next.js", "express"},
-            "tools": {"docker", "kubernetes", "aws", "gcp", "azure", "git", "jenkins", "redis", "kafka"},
-            "concepts": {"microservices", "rest api", "distributed systems", "ci/cd", "agile", "scrum"}
-        }
+        # Skill taxonomy is loaded from a file and compiled into a PhraseMatcher once
+        self.skill_matcher = SkillMatcher(self.nlp, settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
 
     def analyze(self, text: str) -> Dict[str, Any]:
-        doc = self.nlp(text)
+        return self._analyze_doc(self.nlp(text))
+
+    def analyze_many(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[Dict[str, Any]]:
+        """Analyze many JDs with nlp.pipe; results are returned in input order."""
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        return [self._analyze_doc(doc) for doc in docs]
+
+    def _analyze_doc(self, doc) -> Dict[str, Any]:
+        text = doc.text
+        skill_matches = self.skill_matcher.match(doc)
         return {
             "role": self._extract_role(text),
             "experience_level": self._extract_experience(text),
-            "primary_skills": self._extract_skills(text),
+            "primary_skills": self._extract_skills(doc, skill_matches),
+            "skill_matches": skill_matches,
             "must_have": [], # To be implemented with more complex logic
             "nice_to_have": []
         }
@@ -43,21 +61,17 @@ class JDIntelligenceEngine:
             return match.group(0)
         return "Not specified"
 
-    def _extract_skills(self, text: str) -> List[str]:
-        found_skills = set()
-        text_lower = text.lower()
-        
-        # Check against taxonomy
-        for category, skills in self.skill_taxonomy.items():
-            for skill in skills:
-                if skill in text_lower: # Simple substring match, better to use token matching
-                    found_skills.add(skill) # Normalize?
+    def _extract_skills(self, doc, skill_matches: List[Dict[str, Any]]) -> List[str]:
+        # Canonical taxonomy names first, in order of appearance
+        found_skills = [m["name"] for m in skill_matches]
+        seen = set(found_skills)
         
         # Also use NER for ORG/PRODUCT entities as potential skills
-        for ent in self.nlp(text).ents:
+        for ent in doc.ents:
             if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE"]:
-                found_skills.add(ent.text.lower())
+                name = ent.text.lower()
+                if name not in seen:
+                    seen.add(name)
+                    found_skills.append(name)
                 
-        return list(found_skills)
-
-jd_engine = JDIntelligenceEngine()
+        return found_skills
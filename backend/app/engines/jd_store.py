@@ -0,0 +1,91 @@
+import hashlib
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Optional
+
+from app.core.cache import LRUCache, SQLiteCache
+from app.core.config import settings
+from app.core.metrics import metrics, cache_samples
+from app.engines.idf_model import TermVector
+from app.engines.resume_text import jd_to_text
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class JDEntry:
+    """
+    One analyzed JD: the analysis, the jd_content used for scoring and its
+    TF-IDF vector. taxonomy is the skill taxonomy digest the analysis was
+    produced with, so a taxonomy reload invalidates it for /jds/analyze.
+    """
+
+    __slots__ = ("jd_id", "text", "analysis", "taxonomy", "content", "vector")
+
+    def __init__(self, jd_id: str, text: str, analysis: Dict[str, Any], taxonomy: Optional[str],
+                 vectorize: Callable[[str], TermVector]):
+        self.jd_id = jd_id
+        self.text = text
+        self.analysis = analysis
+        self.taxonomy = taxonomy
+        # The same payload the frontend sends to /resumes/score
+        self.content = {**analysis, "text": text}
+        self.vector = vectorize(jd_to_text(self.content))
+
+
+class JDStore:
+    """
+    Server-side cache of analyzed job descriptions keyed by jd_id.
+
+    Identical JD text maps to the same jd_id whoever submits it. The memory
+    tier (bounded LRU) keeps entries with their precomputed TermVector; the
+    optional sqlite tier keeps the analysis JSON so other worker processes and
+    restarts can resolve a jd_id, re-vectorizing it (no spaCy) on first use.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(settings.JD_CACHE_MAX_ENTRIES, settings.JD_CACHE_TTL_SECONDS)
+        self.disk = (
+            SQLiteCache(settings.JD_CACHE_DB_PATH, settings.JD_CACHE_TTL_SECONDS)
+            if settings.JD_CACHE_DB_PATH else None
+        )
+        metrics.register_collector("jd_store", self._metric_samples)
+
+    @staticmethod
+    def fingerprint(text: str) -> str:
+        """Stable jd_id: sha256 of the NFKC-normalized text with whitespace collapsed."""
+        normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, jd_id: str, vectorize: Callable[[str], TermVector]) -> Optional[JDEntry]:
+        entry = self.memory.get(jd_id)
+        if entry is not None:
+            return entry
+        if self.disk is None:
+            return None
+        stored = self.disk.get(jd_id)
+        if stored is None:
+            return None
+        entry = JDEntry(jd_id, stored["text"], stored["analysis"], stored.get("taxonomy"), vectorize)
+        self.memory.set(jd_id, entry)
+        return entry
+
+    def put(self, jd_id: str, text: str, analysis: Dict[str, Any], taxonomy: Optional[str],
+            vectorize: Callable[[str], TermVector]) -> JDEntry:
+        entry = JDEntry(jd_id, text, analysis, taxonomy, vectorize)
+        self.memory.set(jd_id, entry)
+        if self.disk is not None:
+            self.disk.set(jd_id, {"text": text, "analysis": analysis, "taxonomy": taxonomy})
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+    def _metric_samples(self):
+        stats = self.stats()
+        samples = cache_samples("jd_memory", stats["memory"])
+        if stats["disk"] is not None:
+            samples += cache_samples("jd_disk", stats["disk"])
+        return samples
@@ -0,0 +1,306 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import process_memory
+
+MB = 1024 * 1024
+MANIFEST = "manifest.json"
+# stat() signatures of files that last passed a full checksum, so later loads skip re-hashing them
+VERIFIED_STAMP = ".verified"
+# Per-model pointer to the version loaded by default; swapped atomically by `pull`
+CURRENT = "CURRENT"
+
+T5_MODEL = "t5-small"
+SPACY_MODEL = "en_core_web_sm"
+ARTIFACTS = (T5_MODEL, SPACY_MODEL)
+
+class ModelStoreError(Exception):
+    """Raised when an artifact is missing from the store or fails checksum verification."""
+
+
+def _sha256(path: str, chunk_size: int = 4 * MB) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _files(directory: str) -> List[str]:
+    paths = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.relpath(os.path.join(root, name), directory)
+            if path not in (MANIFEST, VERIFIED_STAMP):
+                paths.append(path.replace(os.sep, "/"))
+    return sorted(paths)
+
+
+class ModelStore:
+    """
+    Local, versioned model artifacts under MODEL_STORE_DIR.
+
+        <root>/<name>/<version>/...files...   immutable once written
+        <root>/<name>/<version>/manifest.json sha256 and size of every file
+        <root>/<name>/CURRENT                 version loaded by default
+
+    Engines load from here without touching the Hugging Face hub or the
+    installed spaCy packages, so an air-gapped box starts the same way as a
+    connected one. Every file is checked against the manifest before it is
+    loaded; `python -m app.engines.model_store pull` populates the store.
+    """
+
+    def __init__(self, root: str, verify: bool = True):
+        self.root = root
+        self.verify_checksums = verify
+
+    @classmethod
+    def from_settings(cls) -> Optional["ModelStore"]:
+        """None when MODEL_STORE_DIR is unset, i.e. engines load models the old way."""
+        if not settings.MODEL_STORE_DIR:
+            return None
+        return cls(settings.MODEL_STORE_DIR, settings.MODEL_STORE_VERIFY)
+
+    def current_version(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, name, CURRENT), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self, name: str) -> List[str]:
+        try:
+            entries = os.listdir(os.path.join(self.root, name))
+        except FileNotFoundError:
+            return []
+        return sorted(e for e in entries if os.path.isfile(os.path.join(self.root, name, e, MANIFEST)))
+
+    def manifest(self, name: str, version: str) -> Dict[str, Any]:
+        path = os.path.join(self.root, name, version, MANIFEST)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ModelStoreError(f"{name} {version} has no {MANIFEST} in {self.root}")
+        except ValueError as e:
+            raise ModelStoreError(f"Unreadable manifest {path}: {e}")
+
+    def verify(self, name: str, version: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Check every file listed in the manifest: sizes always, sha256 unless disabled.
+
+        Hashing runs once per version; afterwards files whose size, mtime and
+        inode still match the stamp left by the last full check are trusted.
+        `force` re-hashes everything regardless.
+        """
+        directory = os.path.join(self.root, name, version)
+        manifest = self.manifest(name, version)
+        signatures = {}
+        for path, expected in manifest["files"].items():
+            try:
+                stat = os.stat(os.path.join(directory, path))
+            except OSError:
+                raise ModelStoreError(f"{name} {version}: {path} is missing")
+            if stat.st_size != expected["size"]:
+                raise ModelStoreError(f"{name} {version}: {path} is {stat.st_size} bytes, manifest says {expected['size']}")
+            signatures[path] = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        if not self.verify_checksums:
+            return manifest
+
+        stamp = os.path.join(directory, VERIFIED_STAMP)
+        if not force:
+            try:
+                with open(stamp, "r", encoding="utf-8") as f:
+                    if json.load(f) == signatures:
+                        return manifest
+            except (OSError, ValueError):
+                pass
+        for path, expected in manifest["files"].items():
+            if _sha256(os.path.join(directory, path)) != expected["sha256"]:
+                raise ModelStoreError(f"{name} {version}: {path} does not match its sha256 checksum")
+        try:
+            with open(stamp, "w", encoding="utf-8") as f:
+                json.dump(signatures, f)
+        except OSError:
+            # Read-only store: every load keeps hashing
+            pass
+        return manifest
+
+    def path(self, name: str, version: Optional[str] = None, force: bool = False) -> str:
+        """Verified directory of an artifact version (CURRENT by default)."""
+        version = version or self.current_version(name)
+        if version is None:
+            raise ModelStoreError(
+                f"{name} is not in the model store at {self.root}; run python -m app.engines.model_store pull"
+            )
+        self.verify(name, version, force)
+        return os.path.join(self.root, name, version)
+
+    def add(self, name: str, version: str, build, source: str) -> str:
+        """
+        Write a new version with `build(directory)`, record its manifest and make it CURRENT.
+
+        The version is assembled in a temporary directory and renamed into
+        place, so a failed or interrupted pull never leaves a partial version.
+        """
+        model_dir = os.path.join(self.root, name)
+        os.makedirs(model_dir, exist_ok=True)
+        final = os.path.join(model_dir, version)
+        if os.path.isfile(os.path.join(final, MANIFEST)):
+            self.verify(name, version)
+        else:
+            staging = tempfile.mkdtemp(prefix=f".{version}-", dir=model_dir)
+            try:
+                build(staging)
+                manifest = {
+                    "name": name,
+                    "version": version,
+                    "source": source,
+                    "created": time.time(),
+                    "files": {
+                        path: {"sha256": _sha256(os.path.join(staging, path)), "size": os.path.getsize(os.path.join(staging, path))}
+                        for path in _files(staging)
+                    },
+                }
+                with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(staging, final)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        pointer = os.path.join(model_dir, CURRENT + ".tmp")
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(model_dir, CURRENT))
+        return final
+
+
+def log_load(name: str, version: str, started: float, rss_before: int):
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    rss_delta = (process_memory().get("rss", 0) - rss_before) / MB
+    print(f"Loaded {name} {version} from the model store in {elapsed_ms:.0f}ms (RSS {rss_delta:+.1f}MB)")
+
+
+def load_t5_tokenizer(store: ModelStore):
+    from transformers import T5TokenizerFast
+
+    return T5TokenizerFast.from_pretrained(store.path(T5_MODEL), local_files_only=True)
+
+
+def load_t5_model(store: ModelStore):
+    """
+    t5-small from the store's safetensors weights.
+
+    safetensors files are memory-mapped by the loader, so the weights are
+    paged in from the page cache as they are used rather than unpickled
+    into fresh memory as a hub .bin checkpoint would be.
+    """
+    from transformers import T5ForConditionalGeneration
+
+    started = time.perf_counter()
+    rss_before = process_memory().get("rss", 0)
+    path = store.path(T5_MODEL)
+    model = T5ForConditionalGeneration.from_pretrained(path, local_files_only=True, use_safetensors=True)
+    log_load(T5_MODEL, os.path.basename(path), started, rss_before)
+    return model
+
+
+def load_t5_onnx(store: ModelStore):
+    """t5-small exported to ONNX from the store's weights at load time, without contacting the hub."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    started = time.perf_counter()
+    rss_before = process_memory().get("rss", 0)
+    path = store.path(T5_MODEL)
+    model = ORTModelForSeq2SeqLM.from_pretrained(path, export=True, local_files_only=True)
+    log_load(f"{T5_MODEL} (ONNX export)", os.path.basename(path), started, rss_before)
+    return model
+
+
+def load_spacy(store: ModelStore, exclude: List[str]):
+    import spacy
+
+    started = time.perf_counter()
+    rss_before = process_memory().get("rss", 0)
+    path = store.path(SPACY_MODEL)
+    nlp = spacy.load(path, exclude=exclude)
+    log_load(SPACY_MODEL, os.path.basename(path), started, rss_before)
+    return nlp
+
+
+def pull_t5(store: ModelStore, revision: Optional[str] = None) -> str:
+    """Fetch t5-small from the hub (or its local cache) and store it as safetensors plus a fast tokenizer."""
+    from transformers import T5ForConditionalGeneration, T5TokenizerFast
+
+    model = T5ForConditionalGeneration.from_pretrained(T5_MODEL, revision=revision)
+    tokenizer = T5TokenizerFast.from_pretrained(T5_MODEL, revision=revision)
+    version = (getattr(model.config, "_commit_hash", None) or revision or time.strftime("%Y%m%d%H%M%S"))[:12]
+
+    def build(directory: str):
+        model.save_pretrained(directory, safe_serialization=True)
+        tokenizer.save_pretrained(directory)
+
+    return store.add(T5_MODEL, version, build, source=f"huggingface:{T5_MODEL}@{revision or 'main'}")
+
+
+def pull_spacy(store: ModelStore) -> str:
+    """Store the installed en_core_web_sm pipeline (downloading the package first when missing)."""
+    import spacy
+
+    try:
+        nlp = spacy.load(SPACY_MODEL)
+    except OSError:
+        from spacy.cli import download
+        download(SPACY_MODEL)
+        nlp = spacy.load(SPACY_MODEL)
+    version = nlp.meta.get("version", "unknown")
+    return store.add(SPACY_MODEL, version, nlp.to_disk, source=f"spacy:{SPACY_MODEL}=={version}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Populate and check the local model artifact store.")
+    parser.add_argument("--store", default=settings.MODEL_STORE_DIR or "models", help="Store root (MODEL_STORE_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pull = commands.add_parser("pull", help="Fetch models into the store and make them CURRENT")
+    pull.add_argument("models", nargs="*", default=list(ARTIFACTS), help=f"Any of: {', '.join(ARTIFACTS)}")
+    pull.add_argument("--revision", help="Hub revision of t5-small")
+    verify = commands.add_parser("verify", help="Re-hash the CURRENT version of each model against its manifest")
+    verify.add_argument("models", nargs="*", default=list(ARTIFACTS), help=f"Any of: {', '.join(ARTIFACTS)}")
+    commands.add_parser("list", help="Show stored versions")
+    args = parser.parse_args(argv)
+
+    unknown = set(getattr(args, "models", ())) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f"Unknown models: {', '.join(sorted(unknown))}")
+
+    store = ModelStore(args.store)
+    if args.command == "pull":
+        for name in args.models:
+            path = pull_t5(store, args.revision) if name == T5_MODEL else pull_spacy(store)
+            print(f"{name}: {path}")
+    elif args.command == "verify":
+        failed = False
+        for name in args.models:
+            try:
+                print(f"{name}: ok ({store.path(name, force=True)})")
+            except ModelStoreError as e:
+                print(f"{name}: FAILED ({e})")
+                failed = True
+        if failed:
+            raise SystemExit(1)
+    else:
+        for name in ARTIFACTS:
+            current = store.current_version(name)
+            for version in store.versions(name):
+                print(f"{name} {version}{' (current)' if version == current else ''}")
+
+
+if __name__ == "__main__":
+    main()
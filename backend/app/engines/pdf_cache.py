@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics, cache_samples
+
+TEMPLATE_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates", "resume.html")
+)
+
+
+def template_version(path: str = TEMPLATE_PATH) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class PDFCache:
+    """
+    Content-addressed, size-bounded on-disk cache of rendered PDFs.
+
+    The key is a hash of the canonicalized resume dict plus the template
+    version, so it doubles as a strong ETag. Entries are evicted least
+    recently used first once the directory exceeds max_bytes. Several worker
+    processes may share one directory; each keeps its own LRU index and
+    tolerates files removed by the others.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = os.path.abspath(directory or settings.PDF_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.PDF_CACHE_MAX_BYTES
+        self.template_version = template_version()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Rebuild the LRU order from what previous runs left on disk
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pdf"):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+        metrics.register_collector("pdf_cache", lambda: cache_samples("pdf", self.stats()))
+
+    def key_for(self, resume_data: Dict[str, Any]) -> str:
+        canonical = json.dumps(resume_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        digest = hashlib.sha256()
+        digest.update(self.template_version.encode("ascii"))
+        digest.update(canonical.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def open(self, key: str):
+        """Return an open binary file for a cached PDF, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if key not in self._index:
+                size = os.fstat(f.fileno()).st_size
+                self._index[key] = size
+                self._total_bytes += size
+            self._index.move_to_end(key)
+        return f
+
+    def put(self, key: str, pdf_bytes: bytes):
+        """Store a rendered PDF and return an open binary file for streaming it."""
+        # Write to a temp file and rename so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        # Opened before the rename, so a concurrent eviction cannot pull it away from us
+        reader = open(tmp_path, "rb")
+        os.replace(tmp_path, self.path_for(key))
+
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._index[key] = len(pdf_bytes)
+            self._total_bytes += len(pdf_bytes)
+            self._evict_locked(keep=key)
+        return reader
+
+    def _evict_locked(self, keep: str):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = next(iter(self._index.items()))
+            if key == keep:
+                break
+            del self._index[key]
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                # Open handles keep streaming from the unlinked inode
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "template_version": self.template_version,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
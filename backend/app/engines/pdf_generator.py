@@ -12,12 +12,12 @@ class PDFGenerator:
         template_dir = os.path.join(base_dir, "..", "templates")
         template_dir = os.path.normpath(template_dir)
         self.env = Environment(loader=FileSystemLoader(template_dir))
+        # Compile once; Template objects are safe to reuse across renders
+        self.template = self.env.get_template("resume.html")
 
     def generate(self, resume_data: Dict[str, Any]) -> bytes:
-        template = self.env.get_template("resume.html")
-        
         # Render HTML
-        html_content = template.render(resume=resume_data)
+        html_content = self.template.render(resume=resume_data)
         
         # Generate PDF using xhtml2pdf
         pdf_buffer = io.BytesIO()
@@ -30,5 +30,3 @@ class PDFGenerator:
             raise Exception("PDF Generation Error")
             
         return pdf_buffer.getvalue()
-
-pdf_generator = PDFGenerator()
@@ -0,0 +1,139 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics, PDF_RENDER_SECONDS
+from app.engines.process_pool import RecyclingPool
+
+# Per-process PDFGenerator, built once by the pool initializer
+_worker_generator = None
+
+
+def _init_worker():
+    global _worker_generator
+    from app.engines.pdf_generator import PDFGenerator
+    _worker_generator = PDFGenerator()
+
+
+def _render(resume_data: Dict[str, Any]):
+    started = time.perf_counter()
+    pdf_bytes = _worker_generator.generate(resume_data)
+    return pdf_bytes, time.perf_counter() - started
+
+
+class PDFQueueFull(Exception):
+    """Raised when the render queue is at capacity; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"PDF render queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PDFRenderService:
+    """
+    Renders PDFs on a bounded process pool so xhtml2pdf never holds the API worker's GIL.
+
+    Each pool process compiles the resume template once at startup. At most
+    PDF_MAX_PENDING renders may be queued or running; beyond that render()
+    fails fast with PDFQueueFull instead of letting latency grow. A slot is
+    freed when the render actually finishes, not when the caller gives up
+    on it; a render that overruns PDF_RENDER_TIMEOUT_SECONDS gets the pool
+    recycled so it cannot hold a worker forever.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.workers = max(1, workers or settings.PDF_WORKERS)
+        self.max_pending = max(self.workers, max_pending or settings.PDF_MAX_PENDING)
+        self.timeout = timeout or settings.PDF_RENDER_TIMEOUT_SECONDS
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._rendered = 0
+        self._failed = 0
+        self._rejected = 0
+        self._render_time_total = 0.0
+        self._render_time_max = 0.0
+        self._queue_wait_total = 0.0
+
+        metrics.register_collector("pdf_renderer", self._metric_samples)
+        self._pool = RecyclingPool(self.workers, initializer=_init_worker)
+
+    def render(self, resume_data: Dict[str, Any]) -> bytes:
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise PDFQueueFull(self.retry_after())
+
+        submitted = time.perf_counter()
+        with self._stats_lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(_render, resume_data)
+        except Exception:
+            self._finished()
+            raise
+        # The slot stays taken until the render is really over, even if we stop waiting for it
+        future.add_done_callback(lambda _: self._finished())
+        try:
+            pdf_bytes, render_time = self._pool.result(future, self.timeout)
+        except Exception:
+            with self._stats_lock:
+                self._failed += 1
+            raise
+
+        total = time.perf_counter() - submitted
+        PDF_RENDER_SECONDS.observe(render_time)
+        with self._stats_lock:
+            self._rendered += 1
+            self._render_time_total += render_time
+            self._render_time_max = max(self._render_time_max, render_time)
+            self._queue_wait_total += max(0.0, total - render_time)
+        return pdf_bytes
+
+    def _finished(self):
+        with self._stats_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, at least 1."""
+        with self._stats_lock:
+            mean = (self._render_time_total / self._rendered) if self._rendered else 1.0
+            pending = self._pending
+        return max(1, math.ceil(mean * pending / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            rendered = self._rendered
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._pending,
+                "rendered": rendered,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "pool_recycled": self._pool.recycled,
+                "mean_render_ms": (self._render_time_total / rendered * 1000.0) if rendered else 0.0,
+                "max_render_ms": self._render_time_max * 1000.0,
+                "mean_queue_wait_ms": (self._queue_wait_total / rendered * 1000.0) if rendered else 0.0,
+            }
+
+    def _metric_samples(self):
+        stats = self.stats()
+        return [
+            ("pdf_queue_depth", "gauge", "PDF renders queued or running", {}, stats["queue_depth"]),
+            ("pdf_rejected_total", "counter", "PDF renders rejected with 429", {}, stats["rejected"]),
+            ("pdf_failed_total", "counter", "PDF renders that raised", {}, stats["failed"]),
+        ]
+
+    def shutdown(self):
+        self._pool.shutdown()
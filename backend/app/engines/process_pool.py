@@ -0,0 +1,109 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Optional
+
+
+class WorkerLost(Exception):
+    """A pool task was lost because its worker crashed or the pool was recycled; safe to retry."""
+
+
+def _ping() -> bool:
+    return True
+
+
+def when_all_done(futures: Iterable[Future], callback: Callable[[], None]):
+    """Call `callback` once, after every future has finished (or immediately when there are none)."""
+    futures = list(futures)
+    if not futures:
+        callback()
+        return
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+class RecyclingPool:
+    """
+    A spawn ProcessPoolExecutor that replaces itself when it can no longer be trusted.
+
+    ProcessPoolExecutor cannot cancel a task that is already running, and
+    one crashed worker breaks the whole pool for good. So when a running task
+    overruns its timeout, or the pool is found broken, the executor is
+    swapped for a fresh one and the old workers are killed. Futures of the
+    old pool then fail with BrokenProcessPool, which result() reports as
+    WorkerLost, so every caller's done-callbacks still fire and nothing
+    stays queued behind a stuck worker.
+    """
+
+    def __init__(self, workers: int, initializer: Optional[Callable[[], None]] = None):
+        self.workers = workers
+        self.initializer = initializer
+        self.recycled = 0
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        # Start every worker now so the first requests don't pay process start-up
+        for f in [self._executor.submit(_ping) for _ in range(self.workers)]:
+            f.result()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that already runs server/model threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer,
+        )
+
+    def submit(self, fn, *args) -> Future:
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self.recycle(executor)
+            executor = self._executor
+            future = executor.submit(fn, *args)
+        future.pool_executor = executor
+        return future
+
+    def result(self, future: Future, timeout: float):
+        """
+        The future's result, waiting at most `timeout` seconds.
+
+        A task still waiting for a worker is just cancelled on timeout; a
+        running one takes its pool down with it (see recycle()). Raises
+        TimeoutError or WorkerLost.
+        """
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            if not future.cancel():
+                self.recycle(future.pool_executor)
+            raise
+        except BrokenProcessPool as e:
+            self.recycle(future.pool_executor)
+            raise WorkerLost(str(e) or "worker process died") from e
+
+    def recycle(self, executor: ProcessPoolExecutor):
+        """Replace `executor` with a fresh pool (once, however many callers hit it) and kill its workers."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._new_executor()
+            self.recycled += 1
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,174 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class _EngineEntry:
+    __slots__ = ("name", "target", "fork_safe", "instance", "state", "load_time", "error", "lock")
+
+    def __init__(self, name: str, target: str, fork_safe: bool = True):
+        self.name = name
+        self.target = target
+        self.fork_safe = fork_safe
+        self.instance = None
+        self.state = PENDING
+        self.load_time: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class EngineRegistry:
+    """
+    Lazily constructs engines on first use or during a background warm-up.
+
+    Engines are registered by import path ("module:ClassName") so that heavy
+    dependencies (torch, transformers, spaCy, xhtml2pdf) are only imported when
+    the engine is actually loaded, not when the API modules are imported.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _EngineEntry] = {}
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, target: str, fork_safe: bool = True):
+        """
+        fork_safe=False marks engines that own threads or child processes at
+        construction time; the preforking launcher leaves those to each worker.
+        """
+        self._entries[name] = _EngineEntry(name, target, fork_safe)
+
+    def fork_safe_names(self) -> list:
+        return [name for name, e in self._entries.items() if e.fork_safe]
+
+    def get(self, name: str) -> Any:
+        """Return the engine instance, loading it on the calling thread if needed."""
+        entry = self._entries[name]
+        if entry.instance is not None:
+            return entry.instance
+        return self._load(entry)
+
+    def peek(self, name: str) -> Any:
+        """Return the engine instance if it is already loaded, otherwise None."""
+        return self._entries[name].instance
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Load engines sequentially; failures are recorded and do not stop the others."""
+        started = time.perf_counter()
+        for name in (names or list(self._entries)):
+            try:
+                self.get(name)
+            except Exception:
+                # Already logged and recorded in _load; keep warming the rest
+                pass
+        logger.info(f"Engine warm-up finished in {time.perf_counter() - started:.3f}s")
+
+    def start_warm_up(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Warm up engines on a daemon thread so the server can accept traffic immediately."""
+        if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+            self._warm_up_thread = threading.Thread(
+                target=self.warm_up, args=(names,), name="engine-warm-up", daemon=True
+            )
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def shutdown(self):
+        """Release resources held by loaded engines (process pools, worker threads)."""
+        for entry in self._entries.values():
+            close = getattr(entry.instance, "shutdown", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Engine '{entry.name}' shutdown failed: {e}")
+
+    def readiness(self, required: Iterable[str] = (), lazy: bool = False) -> Dict[str, Any]:
+        """
+        Readiness summary for the /ready probe.
+
+        Ready once no engine is still pending or loading and every `required`
+        engine has loaded. Other engines that failed are listed but do not
+        hold readiness back; their routes report the error themselves. With
+        `lazy` (warm-up off) engines load on first use, so ones nobody has
+        asked for yet do not count as waiting.
+        """
+        required = set(required)
+        waiting = [] if lazy else [n for n, e in self._entries.items() if e.state in (PENDING, LOADING)]
+        failed = [n for n, e in self._entries.items() if e.state == FAILED]
+        failed_required = [n for n in failed if n in required]
+        if failed_required:
+            status = "failed"
+        elif waiting:
+            status = "starting"
+        else:
+            status = "degraded" if failed else "ready"
+        return {
+            "ready": status in ("ready", "degraded"),
+            "status": status,
+            "waiting": waiting,
+            "failed": failed,
+            "required": sorted(required),
+        }
+
+    def names(self) -> list:
+        return list(self._entries)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": e.state,
+                "load_time_ms": round(e.load_time * 1000.0, 1) if e.load_time is not None else None,
+                "error": e.error,
+            }
+            for name, e in self._entries.items()
+        }
+
+    def _load(self, entry: _EngineEntry) -> Any:
+        with entry.lock:
+            # Another thread may have finished loading while we waited on the lock
+            if entry.instance is not None:
+                return entry.instance
+
+            entry.state = LOADING
+            entry.error = None
+            started = time.perf_counter()
+            try:
+                module_path, attr = entry.target.split(":", 1)
+                factory = getattr(importlib.import_module(module_path), attr)
+                instance = factory()
+            except Exception as e:
+                entry.load_time = time.perf_counter() - started
+                entry.state = FAILED
+                entry.error = str(e)
+                logger.error(f"Engine '{entry.name}' failed to load after {entry.load_time:.3f}s: {e}", exc_info=True)
+                raise
+
+            entry.load_time = time.perf_counter() - started
+            entry.instance = instance
+            entry.state = READY
+            logger.info(f"Engine '{entry.name}' loaded in {entry.load_time:.3f}s")
+            return instance
+
+
+engines = EngineRegistry()
+# Registration order is warm-up order: cheap engines first so they are usable early
+engines.register("ats_scorer", "app.engines.ats_scorer:ATSScorer")
+engines.register("interviewer_simulator", "app.engines.interviewer_simulator:InterviewerSimulator")
+engines.register("gap_analyzer", "app.engines.gap_analyzer:GapAnalyzer")
+engines.register("skill_embeddings", "app.engines.skill_embeddings:SkillEmbeddings")
+engines.register("scoring_sessions", "app.engines.scoring_session:ScoringSessionStore")
+engines.register("jd_store", "app.engines.jd_store:JDStore")
+engines.register("resume_corpus", "app.engines.resume_corpus:ResumeCorpus")
+engines.register("jd_intelligence", "app.engines.jd_intelligence:JDIntelligenceEngine")
+engines.register("pdf_cache", "app.engines.pdf_cache:PDFCache")
+engines.register("pdf_renderer", "app.engines.pdf_service:PDFRenderService", fork_safe=False)
+engines.register("resume_parser", "app.engines.resume_parser:ResumeParser", fork_safe=False)
+engines.register("content_generator", "app.engines.content_generator:AIContentGenerator")
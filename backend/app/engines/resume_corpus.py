@@ -0,0 +1,666 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.engines.gap_analyzer import MIN_JD_TERM_WEIGHT
+from app.engines.idf_model import TermVector
+from app.engines.resume_document import ResumeDocument
+from app.engines.skill_matcher import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+
+# Skill facets are indexed as pseudo-terms; the analyzer never emits ':' so they cannot collide
+SKILL_PREFIX = "skill:"
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TF = np.iinfo(np.uint16).max
+# Relative cost of one binary-search step into mmapped postings vs scanning one posting
+LOOKUP_COST = 8
+# Block size for the block-maximum prefilter in _top_k
+TOP_K_BLOCK = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    segment INTEGER,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_resume_id ON docs (resume_id) WHERE deleted = 0;
+CREATE INDEX IF NOT EXISTS docs_unflushed ON docs (doc) WHERE segment IS NULL;
+CREATE INDEX IF NOT EXISTS docs_deleted ON docs (segment) WHERE deleted = 1;
+CREATE TABLE IF NOT EXISTS deletions (seq INTEGER PRIMARY KEY AUTOINCREMENT, doc INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('generation', '0'), ('segments', '[]'), ('next_segment', '1');
+"""
+
+
+class Segment:
+    """
+    Immutable postings for a set of flushed documents, memory-mapped from disk.
+
+    terms.npy is sorted; the postings of terms[i] are docs[offsets[i]:offsets[i+1]]
+    (ascending doc ids) with term frequencies in tfs. Pages are shared between
+    worker processes and only the postings a query touches are read.
+    """
+
+    FILES = ("terms", "offsets", "docs", "tfs")
+
+    def __init__(self, segment_id: int, path: str):
+        self.segment_id = segment_id
+        self.path = path
+        for name in self.FILES:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+    @property
+    def n_postings(self) -> int:
+        return len(self.docs)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        i = int(np.searchsorted(self.terms, term))
+        if i >= len(self.terms) or self.terms[i] != term:
+            return _EMPTY_DOCS, _EMPTY_TFS
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.docs[lo:hi], self.tfs[lo:hi]
+
+    def prefix_terms(self, prefix: str) -> range:
+        """Indices of the terms starting with prefix (a contiguous range of the sorted vocabulary)."""
+        lo = int(np.searchsorted(self.terms, prefix))
+        hi = int(np.searchsorted(self.terms, prefix + "\uffff"))
+        return range(lo, hi)
+
+    @classmethod
+    def write(cls, directory: str, segment_id: int, terms: np.ndarray, term_ids: np.ndarray,
+              docs: np.ndarray, tfs: np.ndarray) -> "Segment":
+        """
+        Build a segment from flat (term_id, doc, tf) postings; terms must be sorted.
+
+        Files are written to a temporary directory and renamed into place, so
+        readers never see a partial segment.
+        """
+        order = np.lexsort((docs, term_ids))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+        path = os.path.join(directory, f"seg_{segment_id:06d}")
+        tmp = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "terms.npy"), terms)
+        np.save(os.path.join(tmp, "offsets.npy"), offsets)
+        np.save(os.path.join(tmp, "docs.npy"), docs[order].astype(np.int32))
+        np.save(os.path.join(tmp, "tfs.npy"), np.minimum(tfs[order], MAX_TF).astype(np.uint16))
+        os.rename(tmp, path)
+        return cls(segment_id, path)
+
+
+_EMPTY_DOCS = np.zeros(0, dtype=np.int32)
+_EMPTY_TFS = np.zeros(0, dtype=np.uint16)
+_EMPTY_INDEX = np.zeros(0, dtype=np.int64)
+
+
+class ResumeCorpus:
+    """
+    Persistent resume corpus searchable with BM25.
+
+    Resumes are tokenized with the GapAnalyzer analyzer plus "skill:<name>"
+    facet terms for their listed skills (aliases resolved via the taxonomy).
+    New documents land in sqlite and an in-memory buffer; once
+    RESUME_CORPUS_FLUSH_DOCS are buffered they are written out as an immutable
+    memory-mapped Segment. Deletes are tombstones applied at query time and
+    purged when segments are merged (too many segments, or too many deletes
+    in one), so adds and deletes never rebuild the whole index.
+
+    sqlite is the source of truth shared by all worker processes: every write
+    bumps a generation counter and each process catches up incrementally
+    (new docs, deletions, segment manifest) before serving a request.
+    """
+
+    def __init__(self):
+        self.directory = settings.RESUME_CORPUS_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.db_path = os.path.join(self.directory, "corpus.sqlite3")
+        taxonomy = SkillTaxonomy.load(settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
+        self._skill_names = {}
+        for skill in taxonomy.skills.values():
+            for phrase in [skill["name"]] + skill["aliases"]:
+                self._skill_names[phrase.casefold()] = skill["name"].casefold()
+
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self.generation = -1
+        self.segments: Dict[int, Segment] = {}
+        self.lengths = np.zeros(1024, dtype=np.float32)
+        self.alive = np.zeros(1024, dtype=bool)
+        self.n_docs = 0
+        self.total_length = 0.0
+        self.max_doc = 0
+        self.deletion_seq = 0
+        # Unflushed documents: term -> ([doc, ...], [tf, ...])
+        self.buffer: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.buffer_docs = 0
+        # Counts of documents this process just ingested, so sync need not re-tokenize them
+        self._pending: Dict[int, Counter] = {}
+        self._norm_cache: Tuple[int, Optional[np.ndarray]] = (-1, None)
+        self.searches = 0
+        self._db()
+        self.sync()
+        metrics.register_collector("resume_corpus", self._metric_samples)
+
+    def _db(self) -> sqlite3.Connection:
+        # Each process (e.g. preforked web workers) opens its own connection
+        if self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def analyze(self, content: Union[ResumeDocument, dict]) -> Counter:
+        """Term counts of a resume plus its skill facet terms (tf 1)."""
+        document = ResumeDocument.of(content)
+        counts = Counter(document.counts)
+        for skill in document.skills:
+            if skill.strip():
+                name = " ".join(skill.split()).casefold()
+                counts[SKILL_PREFIX + self._skill_names.get(name, name)] = 1
+        return counts
+
+    @staticmethod
+    def _length(counts: Counter) -> int:
+        return sum(tf for term, tf in counts.items() if not term.startswith(SKILL_PREFIX))
+
+    # --- Writes -------------------------------------------------------------
+
+    def add(self, resumes: List[Tuple[Optional[str], dict]]) -> List[str]:
+        """Ingest (resume_id, content) pairs; an existing resume_id is replaced. Returns the ids."""
+        analyzed = [(resume_id or uuid.uuid4().hex, content, self.analyze(content)) for resume_id, content in resumes]
+        ids = []
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for resume_id, content, counts in analyzed:
+                    self._tombstone(conn, resume_id)
+                    cursor = conn.execute(
+                        "INSERT INTO docs (resume_id, content, length, created_at) VALUES (?, ?, ?, ?)",
+                        (resume_id, json.dumps(content), self._length(counts), time.time())
+                    )
+                    self._pending[cursor.lastrowid] = counts
+                    ids.append(resume_id)
+                self._bump(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._pending.clear()
+                raise
+            self.sync()
+            if self.buffer_docs >= settings.RESUME_CORPUS_FLUSH_DOCS:
+                self.flush()
+        return ids
+
+    def delete(self, resume_id: str) -> bool:
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._tombstone(conn, resume_id)
+                if deleted:
+                    self._bump(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.sync()
+        return deleted
+
+    def _tombstone(self, conn: sqlite3.Connection, resume_id: str) -> bool:
+        rows = conn.execute("SELECT doc FROM docs WHERE resume_id = ? AND deleted = 0", (resume_id,)).fetchall()
+        for (doc,) in rows:
+            conn.execute("UPDATE docs SET deleted = 1 WHERE doc = ?", (doc,))
+            conn.execute("INSERT INTO deletions (doc) VALUES (?)", (doc,))
+        return bool(rows)
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection):
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+
+    def flush(self):
+        """Write the buffered documents out as a new segment, then merge segments if needed."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Holding the write lock, the synced buffer is exactly the unflushed rows
+                self.sync()
+                if self.buffer_docs:
+                    segment_id = self._next_segment_id(conn)
+                    terms = np.array(sorted(self.buffer), dtype=str)
+                    term_ids, docs, tfs = [_EMPTY_INDEX], [_EMPTY_INDEX], [_EMPTY_INDEX]
+                    for i, term in enumerate(terms.tolist()):
+                        term_docs, term_tfs = self.buffer[term]
+                        term_ids.append(np.full(len(term_docs), i, dtype=np.int64))
+                        docs.append(np.asarray(term_docs, dtype=np.int64))
+                        tfs.append(np.asarray(term_tfs, dtype=np.int64))
+                    term_ids, docs, tfs = np.concatenate(term_ids), np.concatenate(docs), np.concatenate(tfs)
+                    keep = self.alive[docs]
+                    Segment.write(self.directory, segment_id, terms, term_ids[keep], docs[keep], tfs[keep])
+                    conn.execute("DELETE FROM docs WHERE segment IS NULL AND deleted = 1")
+                    conn.execute("UPDATE docs SET segment = ? WHERE segment IS NULL", (segment_id,))
+                    self._set_manifest(conn, self._manifest(conn) + [segment_id])
+                    self._bump(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.sync()
+            self.maintain()
+
+    def maintain(self):
+        """Merge the smallest segments when there are too many, and rewrite segments heavy with deletes."""
+        with self._lock:
+            conn = self._db()
+            deleted = dict(conn.execute(
+                "SELECT segment, COUNT(*) FROM docs WHERE deleted = 1 AND segment IS NOT NULL GROUP BY segment"
+            ).fetchall())
+            counts = dict(conn.execute(
+                "SELECT segment, COUNT(*) FROM docs WHERE segment IS NOT NULL GROUP BY segment"
+            ).fetchall())
+            for segment_id, n_deleted in deleted.items():
+                if n_deleted >= settings.RESUME_CORPUS_DELETED_RATIO * counts.get(segment_id, 1):
+                    self.merge([segment_id])
+            manifest = self._manifest(conn)
+            if len(manifest) > settings.RESUME_CORPUS_MAX_SEGMENTS:
+                smallest = sorted(manifest, key=lambda sid: counts.get(sid, 0))
+                self.merge(smallest[:settings.RESUME_CORPUS_MERGE_FACTOR])
+
+    def merge(self, segment_ids: List[int]):
+        """Replace segments with one segment holding their live documents; deleted rows are purged."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.sync()
+                segment_ids = [sid for sid in segment_ids if sid in self.segments]
+                if not segment_ids:
+                    conn.execute("COMMIT")
+                    return
+                sources = [self.segments[sid] for sid in segment_ids]
+                # Map every source vocabulary onto the merged one, all in NumPy
+                terms, inverse = np.unique(np.concatenate([np.asarray(s.terms) for s in sources]), return_inverse=True)
+                term_ids, docs, tfs, start = [], [], [], 0
+                for source in sources:
+                    local = inverse[start:start + len(source.terms)]
+                    start += len(source.terms)
+                    term_ids.append(np.repeat(local, np.diff(source.offsets)))
+                    docs.append(np.asarray(source.docs, dtype=np.int64))
+                    tfs.append(np.asarray(source.tfs, dtype=np.int64))
+                term_ids, docs, tfs = np.concatenate(term_ids), np.concatenate(docs), np.concatenate(tfs)
+                keep = self.alive[docs]
+                segment_id = self._next_segment_id(conn)
+                Segment.write(self.directory, segment_id, terms, term_ids[keep], docs[keep], tfs[keep])
+                placeholders = ",".join("?" * len(segment_ids))
+                conn.execute(f"DELETE FROM docs WHERE deleted = 1 AND segment IN ({placeholders})", segment_ids)
+                conn.execute(f"UPDATE docs SET segment = ? WHERE segment IN ({placeholders})", [segment_id] + segment_ids)
+                self._set_manifest(conn, [sid for sid in self._manifest(conn) if sid not in segment_ids] + [segment_id])
+                self._bump(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.sync()
+            # Processes still mapping the old files keep their inodes until they sync
+            for source in sources:
+                shutil.rmtree(source.path, ignore_errors=True)
+
+    @staticmethod
+    def _manifest(conn: sqlite3.Connection) -> List[int]:
+        return json.loads(conn.execute("SELECT value FROM meta WHERE key = 'segments'").fetchone()[0])
+
+    @staticmethod
+    def _set_manifest(conn: sqlite3.Connection, segment_ids: List[int]):
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'segments'", (json.dumps(segment_ids),))
+
+    @staticmethod
+    def _next_segment_id(conn: sqlite3.Connection) -> int:
+        segment_id = int(conn.execute("SELECT value FROM meta WHERE key = 'next_segment'").fetchone()[0])
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'next_segment'", (str(segment_id + 1),))
+        return segment_id
+
+    # --- Catching up with other processes -----------------------------------
+
+    def sync(self):
+        """Apply writes made since this process last looked (by any process)."""
+        with self._lock:
+            conn = self._db()
+            generation = int(conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0])
+            if generation == self.generation:
+                return
+            manifest = self._manifest(conn)
+            rebuild_buffer = set(manifest) != set(self.segments)
+            if rebuild_buffer:
+                self.segments = {
+                    sid: self.segments.get(sid) or Segment(sid, os.path.join(self.directory, f"seg_{sid:06d}"))
+                    for sid in manifest
+                }
+
+            rows = conn.execute(
+                "SELECT doc, length, segment IS NULL FROM docs WHERE doc > ? AND deleted = 0 ORDER BY doc",
+                (self.max_doc,)
+            ).fetchall()
+            if rows:
+                self._grow(rows[-1][0] + 1)
+                docs = np.array([r[0] for r in rows], dtype=np.int64)
+                lengths = np.array([r[1] for r in rows], dtype=np.float32)
+                self.lengths[docs] = lengths
+                self.alive[docs] = True
+                self.n_docs += len(rows)
+                self.total_length += float(lengths.sum())
+                self.max_doc = rows[-1][0]
+                if not rebuild_buffer:
+                    self._buffer_add([r[0] for r in rows if r[2]])
+
+            for seq, doc in conn.execute(
+                "SELECT seq, doc FROM deletions WHERE seq > ? ORDER BY seq", (self.deletion_seq,)
+            ).fetchall():
+                self.deletion_seq = seq
+                if doc < len(self.alive) and self.alive[doc]:
+                    self.alive[doc] = False
+                    self.n_docs -= 1
+                    self.total_length -= float(self.lengths[doc])
+
+            if rebuild_buffer:
+                self.buffer, self.buffer_docs = {}, 0
+                self._buffer_add([doc for (doc,) in conn.execute(
+                    "SELECT doc FROM docs WHERE segment IS NULL AND deleted = 0 ORDER BY doc"
+                ).fetchall()])
+            self._pending.clear()
+            self.generation = generation
+
+    def _grow(self, size: int):
+        if size <= len(self.alive):
+            return
+        capacity = max(size, 2 * len(self.alive))
+        self.lengths = np.concatenate([self.lengths, np.zeros(capacity - len(self.lengths), dtype=np.float32)])
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - len(self.alive), dtype=bool)])
+
+    def _buffer_add(self, docs: List[int]):
+        missing = [doc for doc in docs if doc not in self._pending]
+        contents = {}
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            contents.update(self._db().execute(
+                f"SELECT doc, content FROM docs WHERE doc IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        for doc in docs:
+            counts = self._pending.get(doc)
+            if counts is None:
+                counts = self.analyze(json.loads(contents[doc]))
+            for term, tf in counts.items():
+                postings = self.buffer.get(term)
+                if postings is None:
+                    postings = self.buffer[term] = ([], [])
+                postings[0].append(doc)
+                postings[1].append(tf)
+        self.buffer_docs += len(docs)
+
+    # --- Search -------------------------------------------------------------
+
+    def search(self, jd_vec: TermVector, top_k: int = 20, skills: Optional[List[str]] = None,
+               facets: int = 0, include_content: bool = False) -> Dict[str, Any]:
+        """
+        BM25 top-k over the corpus for a JD vector.
+
+        The query is the JD's RESUME_SEARCH_MAX_TERMS highest-weighted terms.
+        skills filters to resumes listing all of them; facets > 0 also returns
+        the most common skills among all matching resumes.
+
+        Terms are scored rarest first. Once the rare terms' postings cover
+        about one pass over the corpus, the k-th best score is estimated from
+        the current leaders (MaxScore): if the remaining common terms together
+        cannot lift any other document past it, they are only looked up for
+        the documents that still can, instead of scanning their long postings.
+        The result is exact either way. Facets need every match and always
+        take the full pass.
+        """
+        self.sync()
+        relevant = np.flatnonzero(jd_vec.weights >= MIN_JD_TERM_WEIGHT)
+        relevant = relevant[np.argsort(-jd_vec.weights[relevant], kind="stable")][:settings.RESUME_SEARCH_MAX_TERMS]
+        query = jd_vec.terms[relevant].tolist()
+        filters = [SKILL_PREFIX + self._skill_names.get(s, s) for s in
+                   (" ".join(str(s).split()).casefold() for s in skills or []) if s]
+
+        with self._lock:
+            # Snapshot: segment files are immutable and the arrays are only ever replaced or appended
+            segments = list(self.segments.values())
+            buffered = {t: (np.asarray(self.buffer[t][0], dtype=np.int64), np.asarray(self.buffer[t][1]))
+                        for t in query + filters if t in self.buffer}
+            size = self.max_doc + 1
+            alive, doc_norm = self.alive[:size], self._doc_norm(size)
+            n_docs = self.n_docs
+            self.searches += 1
+
+        def postings(term):
+            # Each part is sorted by doc and a doc lives in exactly one part
+            parts = [p for p in (seg.postings(term) for seg in segments) if len(p[0])]
+            if term in buffered:
+                parts.append(buffered[term])
+            return parts
+
+        def contribution(docs, tfs, idf):
+            # In place, float32: this runs once per posting and is the bulk of a search
+            tfs = tfs.astype(np.float32)
+            out = doc_norm[docs]
+            out += tfs
+            np.divide(tfs, out, out=out)
+            out *= np.float32(idf * (BM25_K1 + 1.0))
+            return out
+
+        mask = alive
+        for term in filters:
+            allowed = np.zeros(size, dtype=bool)
+            for docs, _ in postings(term):
+                allowed[docs] = True
+            mask = mask & allowed
+
+        terms = []
+        for term in query:
+            parts = postings(term)
+            if not parts:
+                continue
+            # Segment df includes tombstones until the next merge (as in Lucene), which every
+            # process sees identically; buffers differ per process, so only live docs count there
+            df = sum(len(docs) for docs, _ in parts[:-1]) + (
+                int(np.count_nonzero(alive[parts[-1][0]])) if term in buffered else len(parts[-1][0])
+            )
+            # Clamped so tombstones can't push idf negative (MaxScore needs positive bounds)
+            df = min(df, n_docs)
+            idf = float(np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)))
+            terms.append((term, parts, sum(len(docs) for docs, _ in parts), idf))
+        terms.sort(key=lambda t: t[2])
+
+        scores = np.zeros(size, dtype=np.float32)
+        scanned = 0
+        budget = max(n_docs, 1)
+        pruned = False
+        for i, (term, parts, n_postings, idf) in enumerate(terms):
+            if i and not facets and scanned + n_postings > budget and \
+                    sum(t[3] for t in terms[i:]) * (BM25_K1 + 1.0) < scores.max():
+                pruned = self._score_remaining(scores, mask, terms[i:], top_k, contribution)
+                if pruned:
+                    break
+                budget *= 4
+            for docs, tfs in parts:
+                scores[docs] += contribution(docs, tfs, idf)
+            scanned += n_postings
+
+        if not pruned:
+            scores *= mask
+        top = _top_k(scores, top_k)
+
+        result = {
+            "query_terms": query,
+            "hits": self._hits(top, scores, [(t[0], t[1]) for t in terms], include_content),
+        }
+        if facets > 0:
+            result["total"] = int(np.count_nonzero(scores))
+            result["facets"] = self._facets(segments, buffered_skills=self._buffered_skills(),
+                                            matched=scores > 0, limit=facets)
+        return result
+
+    def _doc_norm(self, size: int) -> np.ndarray:
+        """BM25 length normalization per doc, recomputed only when the corpus changed (caller holds the lock)."""
+        generation, norm = self._norm_cache
+        if generation != self.generation or norm is None or len(norm) != size:
+            avgdl = max(self.total_length / max(self.n_docs, 1), 1.0)
+            norm = np.float32(BM25_K1 * (1.0 - BM25_B)) + np.float32(BM25_K1 * BM25_B / avgdl) * self.lengths[:size]
+            self._norm_cache = (self.generation, norm)
+        return norm
+
+    @staticmethod
+    def _score_remaining(scores: np.ndarray, mask: np.ndarray, remaining, top_k: int, contribution) -> bool:
+        """
+        Try to finish scoring with the remaining (common) terms by lookups only.
+
+        Returns False, leaving scores untouched, when the remaining terms could
+        still lift a document that is not yet a candidate into the top k.
+        """
+        scores *= mask
+        candidates = np.flatnonzero(scores)
+        if len(candidates) < top_k:
+            return False
+        leaders = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        leader_scores = scores[leaders] + sum(_lookup(parts, leaders, idf, contribution) for _, parts, _, idf in remaining)
+        threshold = float(leader_scores.min())
+        upper_bound = sum(idf * (BM25_K1 + 1.0) for _, _, _, idf in remaining)
+        if upper_bound >= threshold:
+            return False
+        survivors = candidates[scores[candidates] + upper_bound >= threshold]
+        # Random probes into every part cost far more per step than a sequential scan
+        remaining_postings = sum(n_postings for _, _, n_postings, _ in remaining)
+        probes = sum(np.log2(len(docs) + 1) for _, parts, _, _ in remaining for docs, _ in parts)
+        if len(survivors) * probes * LOOKUP_COST > remaining_postings:
+            return False
+        final = scores[survivors] + sum(_lookup(parts, survivors, idf, contribution) for _, parts, _, idf in remaining)
+        # Everything else is out of reach; clear it so only survivors rank
+        scores[candidates] = 0.0
+        scores[survivors] = final
+        return True
+
+    def _hits(self, top: np.ndarray, scores: np.ndarray, terms: List[Tuple[str, list]],
+              include_content: bool) -> List[Dict[str, Any]]:
+        if not len(top):
+            return []
+        docs = top.tolist()
+        columns = "doc, resume_id, content" if include_content else "doc, resume_id, NULL"
+        rows = {doc: (resume_id, content) for doc, resume_id, content in self._db().execute(
+            f"SELECT {columns} FROM docs WHERE doc IN ({','.join('?' * len(docs))})", docs
+        ).fetchall()}
+        # (term, hit) membership by binary search for the few hits only
+        present = np.array([_find(parts, top)[0] for _, parts in terms]).reshape(len(terms), len(top))
+        hits = []
+        for i, doc in enumerate(docs):
+            if doc not in rows:
+                continue  # Deleted by another process since the snapshot
+            resume_id, content = rows[doc]
+            hit = {
+                "id": resume_id,
+                "score": round(float(scores[doc]), 4),
+                "matched_terms": [terms[j][0] for j in np.flatnonzero(present[:, i]).tolist()],
+            }
+            if include_content:
+                hit["resume_content"] = json.loads(content)
+            hits.append(hit)
+        return hits
+
+    def _buffered_skills(self) -> Dict[str, np.ndarray]:
+        with self._lock:
+            return {t: np.asarray(p[0], dtype=np.int64) for t, p in self.buffer.items() if t.startswith(SKILL_PREFIX)}
+
+    @staticmethod
+    def _facets(segments: List[Segment], buffered_skills: Dict[str, np.ndarray], matched: np.ndarray,
+                limit: int) -> List[Dict[str, Any]]:
+        counts = Counter()
+        for seg in segments:
+            for i in seg.prefix_terms(SKILL_PREFIX):
+                n = int(np.count_nonzero(matched[seg.docs[seg.offsets[i]:seg.offsets[i + 1]]]))
+                if n:
+                    counts[str(seg.terms[i])] += n
+        for term, docs in buffered_skills.items():
+            n = int(np.count_nonzero(matched[docs[docs < len(matched)]]))
+            if n:
+                counts[term] += n
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"skill": term[len(SKILL_PREFIX):], "count": n} for term, n in ranked]
+
+    # --- Introspection ------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        self.sync()
+        with self._lock:
+            return {
+                "docs": self.n_docs,
+                "buffered_docs": self.buffer_docs,
+                "segments": len(self.segments),
+                "postings": sum(seg.n_postings for seg in self.segments.values()),
+                "avg_doc_length": round(self.total_length / max(self.n_docs, 1), 1),
+                "generation": self.generation,
+                "searches": self.searches,
+            }
+
+    def _metric_samples(self):
+        with self._lock:
+            return [
+                ("resume_corpus_docs", "gauge", "Live documents in the resume corpus", {}, self.n_docs),
+                ("resume_corpus_segments", "gauge", "Resume corpus index segments", {}, len(self.segments)),
+                ("resume_corpus_buffered_docs", "gauge", "Resume corpus documents not yet flushed", {}, self.buffer_docs),
+            ]
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest positive scores, best first (ties by index).
+
+    The k-th largest block maximum is a lower bound on the k-th largest score,
+    so only documents at or above it need a partial sort.
+    """
+    n_blocks = len(scores) // TOP_K_BLOCK
+    candidates = np.flatnonzero(scores)
+    if n_blocks > k:
+        block_max = scores[:n_blocks * TOP_K_BLOCK].reshape(n_blocks, TOP_K_BLOCK).max(axis=1)
+        floor = np.partition(block_max, n_blocks - k)[n_blocks - k]
+        if floor > 0:
+            candidates = np.flatnonzero(scores >= floor)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def _find(parts, docs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Which of docs appear in a term's sorted postings parts, and their term frequencies."""
+    found = np.zeros(len(docs), dtype=bool)
+    tfs = np.zeros(len(docs), dtype=np.int64)
+    for part_docs, part_tfs in parts:
+        idx = np.minimum(np.searchsorted(part_docs, docs), len(part_docs) - 1)
+        hit = part_docs[idx] == docs
+        found |= hit
+        tfs[hit] = part_tfs[idx[hit]]
+    return found, tfs
+
+
+def _lookup(parts, docs: np.ndarray, idf: float, contribution) -> np.ndarray:
+    """BM25 contribution of one term to each of docs (0 where absent)."""
+    found, tfs = _find(parts, docs)
+    out = np.zeros(len(docs), dtype=np.float32)
+    out[found] = contribution(docs[found], tfs[found], idf)
+    return out
@@ -0,0 +1,92 @@
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.engines.idf_model import tokenize
+from app.engines.resume_text import dict_to_text
+
+
+def section_text(name: str, value: Any) -> str:
+    """Plain text of one top-level resume section, as dict_to_text renders it inside the whole resume."""
+    return dict_to_text({name: value})
+
+
+def section_counts(name: str, value: Any) -> Counter:
+    """Raw term counts of one top-level resume section."""
+    return Counter(tokenize(section_text(name, value)))
+
+
+class ResumeDocument:
+    """
+    A resume payload parsed once per request and shared by every engine.
+
+    Wraps the raw resume dict and derives per-section text, term counts and
+    the listed skills on first use, caching each, so flattening and
+    tokenizing happen once however many engines read the document. Sections
+    are joined with spaces and tokens never span a space, so the summed
+    section counts equal the counts of the whole resume text. Instances are
+    read-only: build a new document when the content changes.
+    """
+
+    __slots__ = ("content", "_sections", "_text", "_section_counts", "_counts", "_skills")
+
+    def __init__(self, content: Dict[str, Any]):
+        self.content = content
+        self._sections: Optional[Dict[str, str]] = None
+        self._text: Optional[str] = None
+        self._section_counts: Optional[Dict[str, Counter]] = None
+        self._counts: Optional[Counter] = None
+        self._skills: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def of(cls, resume: Union["ResumeDocument", Dict[str, Any]]) -> "ResumeDocument":
+        """Engines accept either a document or a raw dict; wrap the latter."""
+        return resume if isinstance(resume, cls) else cls(resume)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.content.get(name, default)
+
+    def has_section(self, name: str) -> bool:
+        """True when the section is present and non-empty."""
+        return bool(self.content.get(name))
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        """Plain text of each top-level section, in payload order."""
+        if self._sections is None:
+            self._sections = {name: section_text(name, value) for name, value in self.content.items()}
+        return self._sections
+
+    @property
+    def text(self) -> str:
+        """Plain text of the whole resume for NLP analysis."""
+        if self._text is None:
+            self._text = " ".join(text for text in self.sections.values() if text)
+        return self._text
+
+    @property
+    def section_counts(self) -> Dict[str, Counter]:
+        """Raw term counts of each top-level section."""
+        if self._section_counts is None:
+            self._section_counts = {name: Counter(tokenize(text)) for name, text in self.sections.items()}
+        return self._section_counts
+
+    @property
+    def counts(self) -> Counter:
+        """Raw term counts of the whole resume."""
+        if self._counts is None:
+            if self._section_counts is None:
+                self._counts = Counter(tokenize(self.text))
+            else:
+                counts = Counter()
+                for section in self._section_counts.values():
+                    counts.update(section)
+                self._counts = counts
+        return self._counts
+
+    @property
+    def skills(self) -> Tuple[str, ...]:
+        """Entries of the skills section that are strings, as listed."""
+        if self._skills is None:
+            skills = self.content.get("skills") or []
+            self._skills = tuple(s for s in skills if isinstance(s, str)) if isinstance(skills, list) else ()
+        return self._skills
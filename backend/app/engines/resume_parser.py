@@ -0,0 +1,561 @@
+import math
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.engines.process_pool import RecyclingPool, when_all_done
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+DOCX_BODY = "word/document.xml"
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "education and training", "qualifications"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "core competencies",
+               "competencies", "technologies", "tech stack"],
+    "projects": ["projects", "personal projects", "selected projects", "key projects"],
+    "additional": ["certifications", "certificates", "awards", "achievements", "publications",
+                   "languages", "interests", "volunteering", "volunteer experience", "activities"],
+}
+HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+# Headings are short; a longer line that happens to start with "Experience" is content
+MAX_HEADING_WORDS = 4
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+)?(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)\d{{2}}"
+DATE_RANGE_RE = re.compile(rf"({DATE})\s*(?:-|–|—|to)\s*({DATE}|present|current|now)", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+# Bullet glyphs, including the private-use codepoints Symbol/Wingdings bullets extract as
+BULLET_RE = re.compile(r"^(?:[•●▪◦‣∙·\uf0a7\uf0b7]\s*|[-*–—]\s+)")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+URL_RE = re.compile(r"(?:https?://|www\.|linkedin\.com|github\.com)\S*", re.IGNORECASE)
+# "3", "Page 2 of 5"; a bare 4-digit number is more likely a year
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s+)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$", re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|doctor|associate|diploma|degree|mba|ph\.?\s?d|b\.?\s?(?:s|a|sc|e|eng|tech)\b\.?"
+    r"|m\.?\s?(?:s|a|sc|e|eng|tech)\b\.?)",
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+ROLE_COMPANY_RE = re.compile(r"\s+(?:at|@)\s+|\s*[|,]\s*|\s+[-–—]\s+")
+EDUCATION_PART_RE = re.compile(r"\s*[|,;]\s*|\s+[-–—]\s+")
+SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·●▪•\t]\s*|\s{2,}")
+MAX_SKILL_CHARS = 40
+# Errors a malformed PDF or DOCX raises while being read
+READ_ERRORS = (ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError, PyPdfError)
+
+
+class UnsupportedDocument(ValueError):
+    """The upload is neither a PDF nor a DOCX file."""
+
+
+class DocumentTooLarge(ValueError):
+    """The document exceeds a page, text or memory limit."""
+
+
+class UnreadableDocument(ValueError):
+    """The file claims to be a PDF or DOCX but could not be read."""
+
+
+class ParserQueueFull(Exception):
+    """Raised when the parse queue is at capacity; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Resume parser queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ParseTimeout(Exception):
+    """Extraction overran UPLOAD_PARSE_TIMEOUT_SECONDS; the document is too expensive to parse."""
+
+
+# --- Extraction (runs in the pool processes) -------------------------------
+
+def _proc_status() -> Dict[str, int]:
+    """VmSize, VmRSS and VmHWM (peak RSS) of this process in bytes; empty where /proc is unavailable."""
+    fields = {}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmSize", "VmRSS", "VmHWM"):
+                    fields[key] = int(rest.split()[0]) * 1024
+    except OSError:
+        pass
+    return fields
+
+
+class _MemoryBudget:
+    """
+    Caps and measures the memory of one pool task.
+
+    The cap is an address-space rlimit of the task's starting size plus
+    memory_limit, so an allocation past it raises MemoryError inside the
+    task (reported as DocumentTooLarge) rather than swapping the box. The
+    peak is the kernel's high-water RSS mark, reset at the start of the task
+    through /proc/self/clear_refs. Both are Linux-only; elsewhere the task
+    runs uncapped and reports a peak of 0.
+    """
+
+    def __init__(self, memory_limit: int):
+        self.memory_limit = memory_limit
+        self.peak = 0
+
+    def __enter__(self):
+        status = _proc_status()
+        self._base_rss = status.get("VmRSS", 0)
+        self._rlimit = None
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+        if "VmSize" in status:
+            try:
+                import resource
+                self._rlimit = resource.getrlimit(resource.RLIMIT_AS)
+                resource.setrlimit(resource.RLIMIT_AS, (status["VmSize"] + self.memory_limit, self._rlimit[1]))
+            except (ImportError, ValueError, OSError):
+                self._rlimit = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._rlimit is not None:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS, self._rlimit)
+        self.peak = max(0, _proc_status().get("VmHWM", 0) - self._base_rss)
+        if exc_type is MemoryError:
+            raise DocumentTooLarge(f"Parsing needs more than {self.memory_limit // (1024 * 1024)}MB") from exc
+        return False
+
+
+def _extract_pdf_pages(path: str, start: int, stop: int, memory_limit: int) -> Tuple[List[str], int]:
+    """
+    Text of pages [start, stop) and the task's peak memory growth.
+
+    PdfReader resolves objects on demand, so only these pages are parsed.
+    """
+    with _MemoryBudget(memory_limit) as budget:
+        reader = PdfReader(path)
+        if reader.is_encrypted:
+            reader.decrypt("")
+        pages = [reader.pages[number].extract_text() or "" for number in range(start, stop)]
+    return pages, budget.peak
+
+
+def _extract_docx(path: str, memory_limit: int, max_chars: int) -> Tuple[List[str], int]:
+    """
+    Paragraph lines of a DOCX body and the task's peak memory growth.
+
+    word/document.xml is streamed through iterparse and each paragraph is
+    cleared once its text is taken, so memory stays flat with document size.
+    List paragraphs (numbering properties) are prefixed with a bullet.
+    """
+    with _MemoryBudget(memory_limit) as budget:
+        lines, parts, is_list, chars = [], [], False, 0
+        with zipfile.ZipFile(path) as archive, archive.open(DOCX_BODY) as body:
+            for _, element in ElementTree.iterparse(body, events=("end",)):
+                tag = element.tag
+                if tag == f"{W}t":
+                    parts.append(element.text or "")
+                elif tag == f"{W}tab":
+                    parts.append("\t")
+                elif tag in (f"{W}br", f"{W}cr"):
+                    parts.append("\n")
+                elif tag == f"{W}numPr":
+                    is_list = True
+                elif tag == f"{W}p":
+                    text = "".join(parts)
+                    chars += len(text)
+                    if chars > max_chars:
+                        raise DocumentTooLarge(f"Document text exceeds {max_chars} characters")
+                    lines.extend(f"• {line}" if is_list else line for line in text.split("\n"))
+                    parts, is_list = [], False
+                    element.clear()
+    return lines, budget.peak
+
+
+# --- Sectioning -------------------------------------------------------------
+
+def _clean_lines(lines: List[str]) -> List[str]:
+    cleaned = []
+    for line in lines:
+        line = line.strip()
+        if line and not PAGE_NUMBER_RE.match(line):
+            cleaned.append(line)
+    return cleaned
+
+
+def _heading(line: str) -> Optional[str]:
+    key = " ".join(re.sub(r"[^\w&/ ]", " ", line).split()).casefold().replace("&", "and")
+    if len(key.split()) > MAX_HEADING_WORDS:
+        return None
+    return HEADING_SECTIONS.get(key)
+
+
+def _strip_bullet(line: str) -> Tuple[str, bool]:
+    match = BULLET_RE.match(line)
+    return (line[match.end():].strip(), True) if match else (line, False)
+
+
+def _personal_info(lines: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """Name, email and phone from the lines above the first heading; returns the leftover lines."""
+    info = {"name": "", "email": "", "phone": ""}
+    rest = []
+    for line in lines:
+        email, phone = EMAIL_RE.search(line), PHONE_RE.search(line)
+        if email and not info["email"]:
+            info["email"] = email.group(0)
+        if phone and not info["phone"]:
+            info["phone"] = " ".join(phone.group(0).split())
+        if email or phone or URL_RE.search(line):
+            continue
+        if not info["name"] and len(line.split()) <= 5:
+            info["name"] = line
+        else:
+            rest.append(line)
+    return info, rest
+
+
+def _experience(lines: List[str]) -> List[Dict[str, Any]]:
+    jobs: List[Dict[str, Any]] = []
+    current = None
+    last_was_bullet = False
+    for line in lines:
+        text, is_bullet = _strip_bullet(line)
+        if is_bullet:
+            if current is None:
+                current = {"role": "", "company": "", "duration": "", "bullets": []}
+                jobs.append(current)
+            current["bullets"].append(text)
+            last_was_bullet = True
+            continue
+        if last_was_bullet and text[:1].islower():
+            # A bullet wrapped onto the next line by the PDF layout
+            current["bullets"][-1] += " " + text
+            continue
+        last_was_bullet = False
+
+        dates = DATE_RANGE_RE.search(text)
+        header = (text[:dates.start()] + " " + text[dates.end():]).strip(" ,|()-–—\t") if dates else text
+        if current is None or current["bullets"] or (dates and current["duration"]) or (header and current["company"]):
+            current = {"role": "", "company": "", "duration": "", "bullets": []}
+            jobs.append(current)
+        if dates:
+            current["duration"] = dates.group(0)
+        if not header:
+            continue
+        if not current["role"]:
+            current["role"], current["company"] = _split_role(header)
+        else:
+            current["company"] = header
+    return jobs
+
+
+def _split_role(header: str) -> Tuple[str, str]:
+    parts = ROLE_COMPANY_RE.split(header, maxsplit=1)
+    return (parts[0].strip(), parts[1].strip()) if len(parts) == 2 else (header, "")
+
+
+def _education(lines: List[str]) -> List[Dict[str, str]]:
+    entries: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        dates = DATE_RANGE_RE.search(text)
+        if dates:
+            text = (text[:dates.start()] + " " + text[dates.end():]).strip()
+        for part in EDUCATION_PART_RE.split(text):
+            part = part.strip(" ()")
+            if not part:
+                continue
+            if YEAR_RE.fullmatch(part):
+                field = "year"
+            elif INSTITUTION_RE.search(part):
+                field = "institution"
+            elif DEGREE_RE.search(part) or current is None or not current["degree"]:
+                field = "degree"
+            else:
+                current["degree"] += ", " + part
+                continue
+            if current is None or current[field]:
+                current = {"degree": "", "institution": "", "year": ""}
+                entries.append(current)
+            current[field] = part
+        if dates and current is not None and not current["year"]:
+            current["year"] = dates.group(0)
+        elif current is not None and not current["year"]:
+            years = YEAR_RE.findall(line)
+            if years:
+                current["year"] = years[-1]
+    return entries
+
+
+def _skills(lines: List[str]) -> List[str]:
+    skills = {}
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        label, colon, rest = text.partition(":")
+        # "Languages: Python, Go" -> drop the short category label
+        if colon and len(label.split()) <= 3:
+            text = rest
+        for skill in SKILL_SPLIT_RE.split(text):
+            skill = skill.strip(" .")
+            if skill and len(skill) <= MAX_SKILL_CHARS:
+                skills.setdefault(skill.casefold(), skill)
+    return list(skills.values())
+
+
+def structure_resume(lines: List[str]) -> Dict[str, Any]:
+    """
+    Heuristically turn extracted text lines into the resume dict the API consumes.
+
+    Lines are grouped under recognized section headings; everything above the
+    first heading is contact details. The result has the personalInfo,
+    summary, experience, education and skills fields used by /score and the
+    PDF template, plus projects/additional when those sections exist.
+    """
+    lines = _clean_lines(lines)
+    groups: Dict[str, List[str]] = {"header": []}
+    section = "header"
+    for line in lines:
+        heading = _heading(line)
+        if heading is not None:
+            section = heading
+            groups.setdefault(section, [])
+            continue
+        groups.setdefault(section, []).append(line)
+
+    personal_info, leftover = _personal_info(groups["header"])
+    summary_lines = groups.get("summary") or leftover
+    resume: Dict[str, Any] = {
+        "personalInfo": personal_info,
+        "summary": " ".join(_strip_bullet(line)[0] for line in summary_lines),
+        "experience": _experience(groups.get("experience", [])),
+        "education": _education(groups.get("education", [])),
+        "skills": _skills(groups.get("skills", [])),
+    }
+    for extra in ("projects", "additional"):
+        if groups.get(extra):
+            resume[extra] = [_strip_bullet(line)[0] for line in groups[extra]]
+    return resume
+
+
+# --- Engine -----------------------------------------------------------------
+
+def _spool_to_disk(file: BinaryIO, kind: str) -> str:
+    """
+    Copy an upload to a named temporary file and return its path.
+
+    Pool tasks open the document by path, so no task is sent the file's
+    bytes; the caller removes the file once every task is done with it.
+    """
+    fd, path = tempfile.mkstemp(prefix="resume-upload-", suffix=f".{kind}")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            file.seek(0)
+            shutil.copyfileobj(file, out, 1024 * 1024)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def detect_format(head: bytes) -> str:
+    if head.startswith(PDF_MAGIC):
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        return "docx"
+    raise UnsupportedDocument("Only PDF and DOCX files are supported")
+
+
+class ResumeParser:
+    """
+    Extracts resume files into the resume dict on a bounded process pool.
+
+    PDF pages are split into ranges of at least UPLOAD_PAGES_PER_TASK pages
+    and extracted in parallel, one range per pool task; DOCX bodies are
+    streamed in a single task. Every task may grow by at most
+    UPLOAD_MEMORY_LIMIT_MB (see _MemoryBudget), so a hostile or huge document
+    fails alone instead of exhausting the API worker. At most UPLOAD_MAX_PENDING parses
+    may be queued or running; beyond that parse() raises ParserQueueFull.
+
+    Tasks open the upload from a temporary file rather than receiving its
+    bytes, and a parse keeps its slot until every one of its tasks has
+    finished. A task that overruns UPLOAD_PARSE_TIMEOUT_SECONDS gets the
+    pool recycled (see RecyclingPool).
+    """
+
+    def __init__(self):
+        self.workers = max(1, settings.UPLOAD_WORKERS)
+        self.max_pending = max(1, settings.UPLOAD_MAX_PENDING)
+        self.max_pages = settings.UPLOAD_MAX_PAGES
+        self.pages_per_task = max(1, settings.UPLOAD_PAGES_PER_TASK)
+        self.memory_limit = settings.UPLOAD_MEMORY_LIMIT_MB * 1024 * 1024
+        self.max_chars = settings.UPLOAD_MAX_TEXT_CHARS
+        self.timeout = settings.UPLOAD_PARSE_TIMEOUT_SECONDS
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._parsed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._pages = 0
+        self._parse_time_total = 0.0
+        self._peak_memory_max = 0
+
+        metrics.register_collector("resume_parser", self._metric_samples)
+        self._pool = RecyclingPool(self.workers)
+
+    def parse(self, file: BinaryIO) -> Dict[str, Any]:
+        """
+        Parse an uploaded PDF or DOCX into {"resume_content", "format", "pages", "parse_ms", "peak_memory_bytes"}.
+
+        peak_memory_bytes sums the peak memory growth of the document's pool
+        tasks, which may run at the same time.
+        """
+        file.seek(0)
+        kind = detect_format(file.read(len(PDF_MAGIC)))
+
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise ParserQueueFull(self.retry_after())
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._pending += 1
+        futures: List[Future] = []
+        path = None
+        try:
+            path = _spool_to_disk(file, kind)
+            if kind == "pdf":
+                lines, pages, peak = self._parse_pdf(path, futures)
+            else:
+                futures.append(self._pool.submit(_extract_docx, path, self.memory_limit, self.max_chars))
+                lines, peak = self._result(futures[0])
+                pages = None
+            resume_content = structure_resume(lines)
+        except Exception as e:
+            with self._stats_lock:
+                self._failed += 1
+            if isinstance(e, READ_ERRORS) and not isinstance(e, DocumentTooLarge):
+                raise UnreadableDocument(f"Could not read {kind.upper()} file: {e}") from e
+            raise
+        finally:
+            # Tasks we stopped waiting for may still be running: keep the slot and the file until they end
+            when_all_done(futures, lambda: self._finished(path))
+
+        parse_time = time.perf_counter() - started
+        with self._stats_lock:
+            self._parsed += 1
+            self._pages += pages or 0
+            self._parse_time_total += parse_time
+            self._peak_memory_max = max(self._peak_memory_max, peak)
+        return {
+            "resume_content": resume_content,
+            "format": kind,
+            "pages": pages,
+            "parse_ms": round(parse_time * 1000.0, 2),
+            "peak_memory_bytes": peak,
+        }
+
+    def _parse_pdf(self, path: str, futures: List[Future]) -> Tuple[List[str], int, int]:
+        # Only the trailer and page tree are read here; page content stays unparsed
+        reader = PdfReader(path)
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise ValueError("Password-protected PDFs are not supported")
+        n_pages = len(reader.pages)
+        if n_pages > self.max_pages:
+            raise DocumentTooLarge(f"At most {self.max_pages} pages per document")
+
+        per_task = max(self.pages_per_task, math.ceil(n_pages / self.workers))
+        futures.extend(
+            self._pool.submit(_extract_pdf_pages, path, start, min(start + per_task, n_pages), self.memory_limit)
+            for start in range(0, n_pages, per_task)
+        )
+        lines, peak, chars = [], 0, 0
+        try:
+            for future in futures:
+                pages, task_peak = self._result(future)
+                peak += task_peak
+                for text in pages:
+                    chars += len(text)
+                    lines.extend(text.splitlines())
+        finally:
+            for future in futures:
+                future.cancel()
+        if chars > self.max_chars:
+            raise DocumentTooLarge(f"Document text exceeds {self.max_chars} characters")
+        return lines, n_pages, peak
+
+    def _result(self, future: Future):
+        try:
+            return self._pool.result(future, self.timeout)
+        except TimeoutError:
+            raise ParseTimeout(f"Parsing took longer than {self.timeout:g}s")
+
+    def _finished(self, path: Optional[str]):
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._stats_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, at least 1."""
+        with self._stats_lock:
+            mean = (self._parse_time_total / self._parsed) if self._parsed else 1.0
+            pending = self._pending
+        return max(1, math.ceil(mean * pending / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            parsed = self._parsed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._pending,
+                "parsed": parsed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "pool_recycled": self._pool.recycled,
+                "pages": self._pages,
+                "mean_parse_ms": (self._parse_time_total / parsed * 1000.0) if parsed else 0.0,
+                "max_peak_memory_bytes": self._peak_memory_max,
+            }
+
+    def _metric_samples(self):
+        stats = self.stats()
+        return [
+            ("resume_parse_queue_depth", "gauge", "Resume uploads queued or being parsed", {}, stats["queue_depth"]),
+            ("resume_parsed_total", "counter", "Resume uploads parsed", {}, stats["parsed"]),
+            ("resume_parse_failed_total", "counter", "Resume uploads that failed to parse", {}, stats["failed"]),
+            ("resume_parse_rejected_total", "counter", "Resume uploads rejected with 429", {}, stats["rejected"]),
+        ]
+
+    def shutdown(self):
+        self._pool.shutdown()
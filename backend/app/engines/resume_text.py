@@ -0,0 +1,20 @@
+# Structured JD analysis fields that must not leak into the JD text used for TF-IDF
+JD_METADATA_KEYS = {"skill_matches", "jd_id"}
+
+
+def dict_to_text(data: dict) -> str:
+    """Convert resume dict to clean plain text for NLP analysis."""
+    parts = []
+    for key, value in data.items():
+        if isinstance(value, list):
+            parts.extend([str(v) for v in value])
+        elif isinstance(value, dict):
+            parts.append(dict_to_text(value))
+        elif value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def jd_to_text(jd_content: dict) -> str:
+    """Plain text of a JD payload, without the analysis metadata fields."""
+    return dict_to_text({k: v for k, v in jd_content.items() if k not in JD_METADATA_KEYS})
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Union
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.sessions import SessionStore, SQLiteSessionTier
+from app.engines.idf_model import TermVector
+from app.engines.resume_document import ResumeDocument, section_counts
+from app.engines.resume_text import jd_to_text
+
+# Expired rows are swept from the shared tier once every this many new sessions
+PURGE_EVERY_CREATES = 100
+# Times an edit is rebased onto a concurrent save before giving up with SessionConflict
+SAVE_ATTEMPTS = 8
+
+
+class SessionConflict(Exception):
+    """An edit kept losing the race against concurrent saves of the same session."""
+
+# Approximate memory per distinct term held in a Counter (dict slot + str object)
+TERM_OVERHEAD_BYTES = 100
+
+
+def content_hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Section:
+    __slots__ = ("hash", "counts", "nbytes")
+
+    def __init__(self, digest: str, counts: Counter, nbytes: int):
+        self.hash = digest
+        self.counts = counts
+        self.nbytes = nbytes
+
+
+class ScoringSession:
+    """
+    Server-side state for one live-editing session.
+
+    Holds the vectorized JD and one raw term Counter per top-level resume
+    section. The summed section counts equal the counts of the whole resume
+    (see ResumeDocument); an edit re-tokenizes only the changed section and
+    patches the totals. Callers hold `lock` while mutating or reading a session.
+    """
+
+    def __init__(self, jd_content: Dict[str, Any], jd_vec: TermVector,
+                 resume: Union[ResumeDocument, Dict[str, Any]]):
+        self.lock = threading.Lock()
+        self.jd_content = jd_content
+        self.jd_vec = jd_vec
+        self.resume_content: Dict[str, Any] = {}
+        self.sections: Dict[str, _Section] = {}
+        self.totals: Counter = Counter()
+        # Last analysis and document view, reused until a section changes
+        self.analysis = None
+        self._document: Optional[ResumeDocument] = None
+        # Shared-tier revision this copy reflects (None without a shared tier)
+        self.revision: Optional[str] = None
+        self._base_bytes = (
+            jd_vec.terms.nbytes + jd_vec.weights.nbytes + len(json.dumps(jd_content, default=str))
+        )
+        document = ResumeDocument.of(resume)
+        for name, value in document.content.items():
+            self.set_section(name, value, document.section_counts[name])
+
+    def state(self) -> Dict[str, Any]:
+        """What the shared tier stores; the JD vector and term counts are rebuilt from it."""
+        return {"jd_content": self.jd_content, "resume_content": self.resume_content}
+
+    @property
+    def document(self) -> ResumeDocument:
+        """The current resume content as a document for the scoring engines."""
+        if self._document is None:
+            self._document = ResumeDocument(self.resume_content)
+        return self._document
+
+    def set_section(self, name: str, value: Any, counts: Optional[Counter] = None) -> bool:
+        """Replace one section; returns False when its content hash is unchanged."""
+        digest = content_hash(value)
+        current = self.sections.get(name)
+        self.resume_content[name] = value
+        self._document = None
+        if current is not None and current.hash == digest:
+            return False
+
+        if counts is None:
+            counts = section_counts(name, value)
+        if current is not None:
+            self._subtract(current.counts)
+        self.totals.update(counts)
+        nbytes = len(json.dumps(value, default=str)) + sum(len(t) + TERM_OVERHEAD_BYTES for t in counts)
+        self.sections[name] = _Section(digest, counts, nbytes)
+        return True
+
+    def replace_content(self, resume_content: Dict[str, Any]):
+        """Bring the sections in line with `resume_content`; unchanged sections are not re-tokenized."""
+        for name in [n for n in self.sections if n not in resume_content]:
+            self.remove_section(name)
+        for name, value in resume_content.items():
+            self.set_section(name, value)
+        self.analysis = None
+
+    def remove_section(self, name: str) -> bool:
+        current = self.sections.pop(name, None)
+        self.resume_content.pop(name, None)
+        self._document = None
+        if current is None:
+            return False
+        self._subtract(current.counts)
+        return True
+
+    def _subtract(self, counts: Counter):
+        totals = self.totals
+        for term, n in counts.items():
+            remaining = totals[term] - n
+            if remaining > 0:
+                totals[term] = remaining
+            else:
+                del totals[term]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._base_bytes
+            + sum(s.nbytes for s in self.sections.values())
+            + len(self.totals) * TERM_OVERHEAD_BYTES
+        )
+
+
+class ScoringSessionStore(SessionStore):
+    """
+    Live-editing scoring sessions, bounded by SESSION_IDLE_TTL_SECONDS and SESSION_MAX_BYTES.
+
+    With SESSION_DB_PATH set, every saved edit is also written to a sqlite
+    tier shared by the worker processes. A worker whose in-memory copy is
+    missing (evicted, or the session was created elsewhere) or out of date
+    rebuilds it from the stored JD and resume content, so requests need no
+    sticky routing and the memory cap only bounds the cache.
+    """
+
+    def __init__(self):
+        super().__init__(settings.SESSION_IDLE_TTL_SECONDS, settings.SESSION_MAX_BYTES)
+        self.shared = (
+            SQLiteSessionTier(settings.SESSION_DB_PATH, settings.SESSION_IDLE_TTL_SECONDS)
+            if settings.SESSION_DB_PATH else None
+        )
+        self.reloads = 0
+        metrics.register_collector("scoring_sessions", self._metric_samples)
+
+    def create(self, value: ScoringSession) -> str:
+        session_id = super().create(value)
+        if self.shared is not None:
+            value.revision = self.shared.save(session_id, value.state())
+            if self.created % PURGE_EVERY_CREATES == 0:
+                self.shared.purge_expired()
+        return session_id
+
+    def get(self, session_id: str, vectorize: Optional[Callable[[str], TermVector]] = None) -> Optional[ScoringSession]:
+        """
+        The session, or None when it is unknown or expired.
+
+        `vectorize` re-vectorizes the JD when the session has to be rebuilt
+        from the shared tier.
+        """
+        session = super().get(session_id)
+        if self.shared is None:
+            return session
+        revision = self.shared.revision(session_id)
+        if revision is None:
+            # Deleted or expired in the shared tier: drop any local copy too
+            if session is not None:
+                super().delete(session_id)
+            return None
+        if session is not None and session.revision == revision:
+            return session
+        if vectorize is None:
+            return None
+        stored = self.shared.load(session_id)
+        if stored is None:
+            return None
+        revision, state = stored
+        jd_content = state["jd_content"]
+        session = ScoringSession(jd_content, vectorize(jd_to_text(jd_content)), state["resume_content"])
+        session.revision = revision
+        self.put(session_id, session)
+        with self._lock:
+            self.reloads += 1
+        return session
+
+    def save(self, session_id: str, session: ScoringSession, section: str) -> bool:
+        """
+        Record an edit of `section` (caller holds session.lock); False when the session is gone.
+
+        The shared tier only accepts the write on top of the revision this
+        copy was loaded at. When another worker saved first, the copy is
+        brought up to date from the stored content, this edit is applied
+        again on top and the write is retried, so edits to different
+        sections never overwrite each other.
+        """
+        if self.shared is not None:
+            edit = session.resume_content.get(section)
+            for _ in range(SAVE_ATTEMPTS):
+                revision = self.shared.save(session_id, session.state(), expected=session.revision)
+                if revision is not None:
+                    session.revision = revision
+                    break
+                stored = self.shared.load(session_id)
+                if stored is None:
+                    super().delete(session_id)
+                    return False
+                session.revision, state = stored
+                session.replace_content(state["resume_content"])
+                if edit is None:
+                    session.remove_section(section)
+                else:
+                    session.set_section(section, edit)
+            else:
+                raise SessionConflict(f"Session {session_id} is being edited concurrently; retry the edit")
+        self.resize(session_id)
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        deleted = super().delete(session_id)
+        if self.shared is not None:
+            deleted = self.shared.delete(session_id) or deleted
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["shared"] = {"path": self.shared.path, "reloads": self.reloads} if self.shared else None
+        return stats
+
+    def new_session(self, jd_content: Dict[str, Any], jd_vec: TermVector,
+                    resume: Union[ResumeDocument, Dict[str, Any]]) -> ScoringSession:
+        """Build a session (not yet stored; see create())."""
+        return ScoringSession(jd_content, jd_vec, resume)
+
+    def _metric_samples(self):
+        stats = self.stats()
+        return [
+            ("scoring_sessions", "gauge", "Live scoring sessions held in memory", {}, stats["sessions"]),
+            ("scoring_session_bytes", "gauge", "Approximate memory held by scoring sessions", {}, stats["bytes"]),
+            ("scoring_session_evictions_total", "counter", "Sessions evicted by the memory cap", {}, stats["evictions"]),
+            ("scoring_session_expirations_total", "counter", "Sessions expired by the idle TTL", {}, stats["expirations"]),
+            ("scoring_session_reloads_total", "counter", "Sessions rebuilt from the shared sqlite tier", {}, self.reloads),
+        ]
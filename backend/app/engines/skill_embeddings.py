@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.json"
+ANN_FILE = "skills.hnsw"
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(str(term).split()).casefold()
+
+
+class SkillEmbeddingIndex:
+    """
+    Precomputed term embeddings with the canonical skills as the first rows.
+
+    vectors.npy holds L2-normalized float32 rows and is memory-mapped, so
+    preforked workers share the pages. vocab.json lists the surface term of
+    every row ({"terms": [...], "n_skills": N}); rows [0, N) are canonical
+    skills and the rest are aliases and variants ("k8s", "postgres") that
+    point near them. Embedding a term is a vocabulary lookup, never a model
+    call. Nearest canonical skills come from one matrix product and
+    argpartition, or from an hnswlib index when one is available and the
+    skill vocabulary is large.
+    """
+
+    def __init__(self, directory: str, ann_min_skills: int = 20000):
+        with open(os.path.join(directory, VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        self.directory = directory
+        self.vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        terms = np.array([_normalize_term(t) for t in vocab["terms"]], dtype=str)
+        if len(terms) != self.vectors.shape[0]:
+            raise ValueError(f"{VOCAB_FILE} has {len(terms)} terms but {VECTORS_FILE} has {self.vectors.shape[0]} rows")
+        self.n_skills = int(vocab["n_skills"])
+        self.skill_names = terms[:self.n_skills]
+        # Canonical rows are contiguous, so this is a view into the memory map
+        self.skill_matrix = self.vectors[:self.n_skills]
+        # Sorted view for binary-search lookups; _rows maps it back to vector rows
+        self._rows = np.argsort(terms, kind="stable")
+        self._sorted_terms = terms[self._rows]
+        self.ann = self._load_ann(ann_min_skills)
+
+    def _load_ann(self, min_skills: int):
+        if self.n_skills < min_skills:
+            return None
+        try:
+            import hnswlib
+        except ImportError:
+            print(f"Warning: hnswlib not installed; exact top-k over {self.n_skills} skills.")
+            return None
+        dim = self.vectors.shape[1]
+        index = hnswlib.Index(space="ip", dim=dim)
+        path = os.path.join(self.directory, ANN_FILE)
+        if os.path.exists(path):
+            index.load_index(path, max_elements=self.n_skills)
+        else:
+            index.init_index(max_elements=self.n_skills, ef_construction=200, M=16)
+            index.add_items(np.asarray(self.skill_matrix), np.arange(self.n_skills))
+        index.set_ef(64)
+        return index
+
+    def lookup(self, terms: List[str]) -> np.ndarray:
+        """Row index of each term, or -1 when it is not in the vocabulary."""
+        if not terms or not len(self._sorted_terms):
+            return np.full(len(terms), -1, dtype=np.int64)
+        query = np.array([_normalize_term(t) for t in terms], dtype=str)
+        idx = np.minimum(np.searchsorted(self._sorted_terms, query), len(self._sorted_terms) - 1)
+        found = self._sorted_terms[idx] == query
+        return np.where(found, self._rows[idx], -1)
+
+    def nearest(self, rows: np.ndarray, k: int):
+        """Top-k canonical skills for each embedded row: (skill indices, cosine similarities), both (n, k)."""
+        k = min(k, self.n_skills)
+        queries = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.ann is not None:
+            labels, distances = self.ann.knn_query(queries, k=k)
+            return labels.astype(np.int64), 1.0 - distances
+        sims = queries @ self.skill_matrix.T
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        return top, np.take_along_axis(sims, top, axis=1)
+
+
+class SkillEmbeddings:
+    """
+    Semantic skill matching on top of SkillEmbeddingIndex.
+
+    A resume is embedded once into a profile: for every canonical skill, the
+    best similarity of any resume term to it. Query terms (JD skills, missing
+    JD keywords) are then scored against the profile through their own
+    nearest skills, so "postgres" in a JD matches "PostgreSQL" on a resume
+    with score sim(postgres, postgresql) * sim(postgresql, postgresql).
+    Disabled (every score 0) unless SKILL_EMBEDDINGS_DIR is configured.
+    """
+
+    def __init__(self):
+        self.index: Optional[SkillEmbeddingIndex] = None
+        self.threshold = settings.SKILL_MATCH_THRESHOLD
+        self.top_k = settings.SKILL_MATCH_TOP_K
+        if settings.SKILL_EMBEDDINGS_DIR:
+            try:
+                self.index = SkillEmbeddingIndex(settings.SKILL_EMBEDDINGS_DIR, settings.SKILL_ANN_MIN_SKILLS)
+            except Exception as e:
+                print(f"Warning: Could not load skill embeddings from {settings.SKILL_EMBEDDINGS_DIR}. "
+                      f"Semantic skill matching is disabled. Error: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.index is not None
+
+    def profile(self, terms: Iterable[str]) -> np.ndarray:
+        """Best similarity of any of the terms to each canonical skill (zeros below the threshold)."""
+        profile = np.zeros(self.index.n_skills, dtype=np.float32)
+        rows = self.index.lookup(list(dict.fromkeys(terms)))
+        rows = rows[rows >= 0]
+        if len(rows):
+            skills, sims = self.index.nearest(rows, self.top_k)
+            sims = np.where(sims >= self.threshold, sims, 0.0)
+            np.maximum.at(profile, skills.ravel(), sims.ravel())
+        return profile
+
+    def match(self, terms: List[str], profile: np.ndarray) -> np.ndarray:
+        """Semantic match score in [0, 1] of each term against a profile; 0 below the threshold."""
+        scores = np.zeros(len(terms), dtype=np.float32)
+        rows = self.index.lookup(terms)
+        known = np.flatnonzero(rows >= 0)
+        if len(known):
+            skills, sims = self.index.nearest(rows[known], self.top_k)
+            scores[known] = (np.where(sims >= self.threshold, sims, 0.0) * profile[skills]).max(axis=1)
+        # float32 products land just under 1.0 for exact aliases
+        return np.where(scores >= self.threshold, np.round(scores, 4), 0.0)
+
+    def matcher(self, resume_terms: Iterable[str]) -> Optional[Callable[[List[str]], np.ndarray]]:
+        """Embed a resume once and return a scorer for query terms, or None when disabled."""
+        if not self.enabled:
+            return None
+        profile = self.profile(resume_terms)
+        return lambda terms: self.match(list(terms), profile)
+
+    def stats(self) -> Dict[str, object]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "directory": self.index.directory,
+            "terms": int(self.index.vectors.shape[0]),
+            "skills": self.index.n_skills,
+            "dim": int(self.index.vectors.shape[1]),
+            "ann": self.index.ann is not None,
+            "threshold": self.threshold,
+            "top_k": self.top_k,
+        }
+
+
+def _embedder(backend: str, model: str) -> Callable[[List[str]], np.ndarray]:
+    if backend == "spacy":
+        import spacy
+        nlp = spacy.load(model, exclude=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler", "senter"])
+        if not nlp.vocab.vectors.shape[0]:
+            raise SystemExit(f"spaCy model '{model}' has no word vectors (use en_core_web_md or _lg)")
+        return lambda phrases: np.array([doc.vector for doc in nlp.pipe(phrases)], dtype=np.float32)
+    if backend == "sentence-transformers":
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(model)
+        return lambda phrases: np.asarray(encoder.encode(phrases, batch_size=256), dtype=np.float32)
+    raise SystemExit(f"Unknown backend '{backend}'")
+
+
+def build(output: str, embed: Callable[[List[str]], np.ndarray], taxonomy_path: str,
+          extra_terms: List[str], ann: bool = False):
+    """Write vectors.npy/vocab.json: canonical skills first, aliases copy their skill's vector."""
+    from app.engines.skill_matcher import SkillTaxonomy
+
+    taxonomy = SkillTaxonomy.load(taxonomy_path)
+    skills = list(dict.fromkeys(_normalize_term(s["name"]) for s in taxonomy.skills.values()))
+    skill_row = {name: i for i, name in enumerate(skills)}
+    skill_vectors = embed(skills)
+
+    terms, vectors = list(skills), [skill_vectors]
+    seen = set(skills)
+    alias_rows = []
+    for skill in taxonomy.skills.values():
+        for alias in skill["aliases"]:
+            alias = _normalize_term(alias)
+            if alias not in seen:
+                seen.add(alias)
+                terms.append(alias)
+                alias_rows.append(skill_row[_normalize_term(skill["name"])])
+    if alias_rows:
+        vectors.append(skill_vectors[alias_rows])
+
+    extra = [t for t in dict.fromkeys(_normalize_term(t) for t in extra_terms) if t and t not in seen]
+    if extra:
+        extra_vectors = embed(extra)
+        # Out-of-vocabulary phrases embed to zero vectors; they could never match
+        keep = np.linalg.norm(extra_vectors, axis=1) > 0
+        terms.extend(np.array(extra, dtype=object)[keep].tolist())
+        vectors.append(extra_vectors[keep])
+
+    matrix = np.vstack(vectors).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1.0)
+
+    os.makedirs(output, exist_ok=True)
+    np.save(os.path.join(output, VECTORS_FILE), matrix)
+    with open(os.path.join(output, VOCAB_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "dim": int(matrix.shape[1]), "n_skills": len(skills), "terms": terms}, f)
+    if ann:
+        import hnswlib
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        index.init_index(max_elements=len(skills), ef_construction=200, M=16)
+        index.add_items(matrix[:len(skills)], np.arange(len(skills)))
+        index.save_index(os.path.join(output, ANN_FILE))
+    return len(skills), len(terms)
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.engines.skill_matcher import DEFAULT_TAXONOMY_PATH
+
+    parser = argparse.ArgumentParser(description="Build the skill embedding index used for semantic skill matching.")
+    parser.add_argument("--output", required=True, help="Directory for vectors.npy and vocab.json")
+    parser.add_argument("--backend", choices=["spacy", "sentence-transformers"], default="spacy")
+    parser.add_argument("--model", default="en_core_web_md", help="spaCy model with vectors or sentence-transformers model")
+    parser.add_argument("--taxonomy", default=settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
+    parser.add_argument("--extra-terms", help="Text file of additional surface terms, one per line")
+    parser.add_argument("--ann", action="store_true", help="Also build an hnswlib index over the skills")
+    args = parser.parse_args(argv)
+
+    extra = []
+    if args.extra_terms:
+        with open(args.extra_terms, "r", encoding="utf-8") as f:
+            extra = [line.strip() for line in f if line.strip()]
+
+    started = time.perf_counter()
+    n_skills, n_terms = build(args.output, _embedder(args.backend, args.model), args.taxonomy, extra, args.ann)
+    print(f"Embedded {n_skills} skills and {n_terms - n_skills} extra terms in "
+          f"{time.perf_counter() - started:.1f}s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+
+DEFAULT_TAXONOMY_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "skill_taxonomy.json")
+)
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills loaded from a JSON file of the form:
+
+        {"version": 1, "skills": [{"id": "kubernetes", "name": "kubernetes",
+                                   "category": "tools", "aliases": ["k8s"]}, ...]}
+    """
+
+    def __init__(self, skills: Dict[str, Dict[str, Any]], version: Any = None, path: Optional[str] = None,
+                 digest: Optional[str] = None):
+        self.skills = skills
+        self.version = version
+        self.path = path
+        # Content hash of the source file; identifies the taxonomy across processes
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        with open(path, "rb") as f:
+            data = f.read()
+        raw = json.loads(data.decode("utf-8"))
+
+        skills = {}
+        for entry in raw.get("skills", []):
+            name = str(entry["name"]).strip()
+            skill_id = str(entry.get("id") or name).strip()
+            if not skill_id or not name:
+                continue
+            skills[skill_id] = {
+                "id": skill_id,
+                "name": name,
+                "category": entry.get("category", "other"),
+                "aliases": [str(a).strip() for a in entry.get("aliases", []) if str(a).strip()],
+            }
+        return cls(skills, version=raw.get("version"), path=path, digest=hashlib.sha256(data).hexdigest()[:16])
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+
+class _CompiledMatcher:
+    """A taxonomy plus the PhraseMatcher compiled from it; swapped as one unit on reload."""
+
+    __slots__ = ("taxonomy", "matcher", "pattern_count", "built_at", "build_time", "mtime")
+
+    def __init__(self, nlp, taxonomy: SkillTaxonomy):
+        started = time.perf_counter()
+        # LOWER matching over spaCy tokens gives case-insensitive, token-boundary matches
+        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        pattern_count = 0
+        for skill_id, skill in taxonomy.skills.items():
+            phrases = [skill["name"]] + skill["aliases"]
+            matcher.add(skill_id, list(nlp.tokenizer.pipe(phrases)))
+            pattern_count += len(phrases)
+
+        self.taxonomy = taxonomy
+        self.matcher = matcher
+        self.pattern_count = pattern_count
+        self.built_at = time.time()
+        self.build_time = time.perf_counter() - started
+        self.mtime = os.path.getmtime(taxonomy.path) if taxonomy.path else None
+
+
+class SkillMatcher:
+    """
+    Finds taxonomy skills in spaCy Docs using a PhraseMatcher compiled once per taxonomy.
+
+    Matching runs in a single pass over the document's tokens regardless of
+    taxonomy size. Overlapping matches resolve to the longest span, so
+    "spring boot" wins over a hypothetical "spring" entry.
+    reload() rebuilds off to the side and swaps atomically, so in-flight
+    requests keep using the previous matcher.
+    """
+
+    def __init__(self, nlp, path: str = DEFAULT_TAXONOMY_PATH):
+        self.nlp = nlp
+        self.path = path
+        self._reload_lock = threading.Lock()
+        self._compiled = _CompiledMatcher(nlp, SkillTaxonomy.load(path))
+
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        return self._compiled.taxonomy
+
+    def match(self, doc) -> List[Dict[str, Any]]:
+        """Return canonical skills found in doc, in order of first occurrence."""
+        compiled = self._compiled
+        strings = self.nlp.vocab.strings
+        spans = filter_spans(compiled.matcher(doc, as_spans=True))
+
+        found = {}
+        for span in sorted(spans, key=lambda s: s.start):
+            skill_id = strings[span.label]
+            if skill_id not in found:
+                skill = compiled.taxonomy.skills[skill_id]
+                found[skill_id] = {"id": skill_id, "name": skill["name"], "category": skill["category"]}
+        return list(found.values())
+
+    def reload(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Rebuild the matcher from the taxonomy file and swap it in."""
+        with self._reload_lock:
+            target = path or self.path
+            compiled = _CompiledMatcher(self.nlp, SkillTaxonomy.load(target))
+            self.path = target
+            self._compiled = compiled
+        return self.stats()
+
+    def reload_if_modified(self) -> bool:
+        """Reload only when the taxonomy file has changed on disk since the last build."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if self._compiled.mtime is not None and mtime <= self._compiled.mtime:
+            return False
+        self.reload()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        compiled = self._compiled
+        return {
+            "path": self.path,
+            "version": compiled.taxonomy.version,
+            "digest": compiled.taxonomy.digest,
+            "skills": len(compiled.taxonomy),
+            "patterns": compiled.pattern_count,
+            "built_at": compiled.built_at,
+            "build_time_ms": round(compiled.build_time * 1000.0, 1),
+        }
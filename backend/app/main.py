@@ -1,8 +1,15 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Match
 from app.core.config import settings, get_cors_origins
-from app.api.v1.api import api_router
+from app.core.metrics import metrics, HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from app.api.v1.api import api_router, ROUTE_LANES
+from app.core.lanes import LaneMiddleware, size_thread_limiter
+from app.core.profiler import ProfilingMiddleware
+from app.core.jobs import job_queue
+from app.engines.governor import EngineBusy, configure_torch_threads
+from app.engines.registry import engines
 import logging
 import time
 
@@ -14,6 +21,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Engines that must load for /ready to pass; others may fail and only degrade it
+REQUIRED_ENGINES = [name.strip() for name in settings.READY_REQUIRED_ENGINES.split(",") if name.strip()]
+_unknown_engines = set(REQUIRED_ENGINES) - set(engines.names())
+if _unknown_engines:
+    print(f"Warning: READY_REQUIRED_ENGINES names unknown engines: {', '.join(sorted(_unknown_engines))}")
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -21,6 +34,13 @@ app = FastAPI(
     description="AI-powered ATS Resume Builder with intelligent analysis and optimization"
 )
 
+# Request lanes; added first so it sits inside CORS and the logging middleware,
+# which then time requests including their lane queue wait
+app.add_middleware(
+    LaneMiddleware,
+    route_lanes={settings.API_V1_STR + path: lane for path, lane in ROUTE_LANES.items()},
+)
+
 # CORS Configuration — uses get_cors_origins() which handles any env var format safely
 app.add_middleware(
     CORSMiddleware,
@@ -30,18 +50,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def route_template(request: Request) -> str:
+    """Resolve the matching route's path template so metric labels stay low-cardinality."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all incoming requests with timing."""
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    """Log all incoming requests with timing and record per-route metrics."""
+    route = route_template(request)
+    in_flight = HTTP_IN_FLIGHT.labels(route)
+    in_flight.inc()
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        # Streaming responses are timed to the first byte
+        process_time = time.perf_counter() - start_time
+        in_flight.dec()
+        HTTP_REQUEST_SECONDS.labels(request.method, route).observe(process_time)
+        HTTP_REQUESTS.labels(request.method, route, status_code).inc()
     logger.info(
-        f"{request.method} {request.url.path} - {response.status_code} - {process_time:.2f}s"
+        f"{request.method} {request.url.path} - {status_code} - {process_time * 1000:.1f}ms"
     )
     return response
 
+@app.exception_handler(EngineBusy)
+async def engine_busy_handler(request: Request, exc: EngineBusy):
+    """Shed engine calls: 429 when the engine's queue is full, 503 when the wait is too long."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Opt-in request profiling; added last so it is outermost and covers the whole chain
+app.add_middleware(ProfilingMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -65,7 +116,9 @@ async def root():
         "message": "Resume Intelligence Platform API",
         "version": settings.VERSION,
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready",
+        "metrics": "/metrics"
     }
 
 @app.get("/health")
@@ -76,12 +129,42 @@ async def health_check():
         "service": settings.PROJECT_NAME
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus text exposition, merged across worker processes when configured."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 503 while engines are still warming up or a READY_REQUIRED_ENGINES engine failed.
+
+    Failed engines that are not required are listed under "failed" with
+    status "degraded" but leave the probe at 200.
+    """
+    readiness = engines.readiness(REQUIRED_ENGINES, lazy=not settings.ENGINE_WARMUP)
+    ready = readiness.pop("ready")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={**readiness, "engines": engines.status()}
+    )
+
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     logger.info(f"CORS allowed origins: {get_cors_origins()}")
     logger.info("API Documentation available at /docs")
+    # No-op in start_prod.py workers, which already sized torch for their worker count
+    configure_torch_threads()
+    size_thread_limiter()
+    if settings.ENGINE_WARMUP:
+        engines.start_warm_up()
+        logger.info("Engine warm-up started in background")
+    job_queue.start()
+    metrics.start_flusher(settings.METRICS_FLUSH_SECONDS)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info(f"Shutting down {settings.PROJECT_NAME}")
\ No newline at end of file
+    logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    job_queue.stop()
+    engines.shutdown()
\ No newline at end of file
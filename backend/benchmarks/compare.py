@@ -0,0 +1,63 @@
+"""
+Compare two benchmark result files and flag latency regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --metric p95_ms --threshold 0.10
+
+Exits with status 1 when any shared benchmark's metric grew by more than the
+threshold (a fraction of the baseline), so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.common import print_table
+
+
+def load(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, metric: str, threshold: float):
+    rows = []
+    regressions = 0
+    for key, base in baseline["results"].items():
+        cand = candidate["results"].get(key)
+        if cand is None or metric not in base or metric not in cand:
+            continue
+        before, after = base[metric], cand[metric]
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold
+        regressions += regressed
+        rows.append({
+            "benchmark": key,
+            "baseline": round(before, 3),
+            "candidate": round(after, 3),
+            "change": f"{change:+.1%}",
+            "status": "REGRESSION" if regressed else "ok",
+        })
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p95_ms", help="Lower-is-better metric to compare")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative increase")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get("kind") != candidate.get("kind"):
+        parser.error(f"Cannot compare '{baseline.get('kind')}' results with '{candidate.get('kind')}' results")
+
+    rows, regressions = compare(baseline, candidate, args.metric, args.threshold)
+    print(f"baseline:  {baseline['environment'].get('git_commit')}  candidate: {candidate['environment'].get('git_commit')}")
+    print_table(rows, ["benchmark", "baseline", "candidate", "change", "status"])
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:.0%} on {args.metric}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Deterministic synthetic JD and resume corpora for benchmarks."""
+import random
+from typing import Any, Dict, List
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "sql", "react", "fastapi",
+    "django", "flask", "spring boot", "next.js", "docker", "kubernetes", "aws", "gcp", "azure",
+    "git", "jenkins", "redis", "kafka", "microservices", "rest api", "distributed systems",
+    "ci/cd", "agile", "scrum", "postgresql", "terraform", "graphql", "machine learning",
+]
+ROLES = ["Backend Engineer", "Frontend Developer", "Full Stack Developer", "DevOps Engineer", "Data Scientist"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Implemented", "Scaled", "Reduced", "Shipped"]
+OBJECTS = [
+    "a high-throughput API gateway", "the payments service", "CI/CD pipelines", "a data ingestion platform",
+    "container orchestration", "the search backend", "observability tooling", "a recommendation engine",
+    "the customer dashboard", "batch ETL jobs",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "saving ${n}K per year", "serving {n}M daily requests",
+    "improving deploy frequency {n}x", "reducing incidents by {n}%", "onboarding {n} teams",
+]
+FILLER = (
+    "We value ownership, collaboration and clear communication. You will work closely with product "
+    "and design to deliver reliable features for our customers."
+)
+
+
+def make_jd(rng: random.Random, n_sentences: int = 8) -> str:
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, k=min(len(SKILLS), 4 + n_sentences // 2))
+    sentences = [f"We are hiring a {role} with {rng.randint(2, 10)}+ years of experience."]
+    for i in range(n_sentences):
+        skill = skills[i % len(skills)]
+        sentences.append(f"Experience with {skill} and {rng.choice(skills)} is {rng.choice(['required', 'a plus', 'preferred'])}.")
+    sentences.append(FILLER)
+    return " ".join(sentences)
+
+
+def make_bullet(rng: random.Random) -> str:
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 90))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, {outcome}."
+
+
+def make_resume(rng: random.Random, n_jobs: int = 3, bullets_per_job: int = 4) -> Dict[str, Any]:
+    return {
+        "personalInfo": {
+            "name": f"Candidate {rng.randint(1, 10**6)}",
+            "email": f"candidate{rng.randint(1, 10**6)}@example.com",
+            "phone": "+1 (555) 000-0000",
+            "location": "Remote",
+        },
+        "summary": f"{rng.choice(ROLES)} with {rng.randint(1, 15)} years of experience. " + make_bullet(rng),
+        "experience": [
+            {
+                "id": j,
+                "role": rng.choice(ROLES),
+                "company": f"Company {rng.randint(1, 500)}",
+                "years": f"{2010 + j} - {2012 + j}",
+                "description": [make_bullet(rng) for _ in range(bullets_per_job)],
+            }
+            for j in range(n_jobs)
+        ],
+        "education": [{"id": 1, "degree": "B.S. Computer Science", "school": "State University", "year": "2012"}],
+        "skills": rng.sample(SKILLS, k=rng.randint(5, 12)),
+    }
+
+
+def jd_corpus(size: int, seed: int = 7, n_sentences: int = 8) -> List[str]:
+    rng = random.Random(seed)
+    return [make_jd(rng, n_sentences) for _ in range(size)]
+
+
+def resume_corpus(size: int, seed: int = 11, n_jobs: int = 3) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_resume(rng, n_jobs=n_jobs) for _ in range(size)]
+
+
+def bullet_corpus(size: int, seed: int = 13) -> List[str]:
+    rng = random.Random(seed)
+    return [make_bullet(rng) for _ in range(size)]
@@ -0,0 +1,178 @@
+"""
+Micro-benchmarks for each engine over synthetic corpora of increasing size.
+
+    python -m benchmarks.engines --sizes 10 100 1000 --output benchmarks/results/engines.json
+
+Each engine is timed per call with perf_counter; results report mean/p50/p95/p99
+latency and calls per second for every corpus size and document length.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from app.core.cache import LRUCache, TieredCache
+from benchmarks.common import print_table, summarize, write_results
+from benchmarks.corpus import bullet_corpus, jd_corpus, resume_corpus
+
+
+def _time_calls(fn: Callable[[Any], Any], inputs: List[Any], warmup: int = 2) -> Dict[str, Any]:
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def bench_jd_analyze(size: int, length: int) -> Dict[str, Any]:
+    from app.engines.registry import engines
+    engine = engines.get("jd_intelligence")
+    return _time_calls(engine.analyze, jd_corpus(size, n_sentences=8 * length))
+
+
+def bench_jd_analyze_many(size: int, length: int) -> Dict[str, Any]:
+    from app.engines.registry import engines
+    engine = engines.get("jd_intelligence")
+    texts = jd_corpus(size, n_sentences=8 * length)
+    started = time.perf_counter()
+    engine.analyze_many(texts)
+    wall = time.perf_counter() - started
+    return {"count": size, "wall_ms": wall * 1000.0, "throughput_per_s": size / wall if wall else 0.0}
+
+
+def bench_gap_analyzer(size: int, length: int) -> Dict[str, Any]:
+    from app.engines.resume_text import dict_to_text
+    from app.engines.registry import engines
+    engine = engines.get("gap_analyzer")
+    jds = jd_corpus(size, n_sentences=8 * length)
+    resumes = [dict_to_text(r) for r in resume_corpus(size, n_jobs=3 * length)]
+    return _time_calls(lambda pair: engine.analyze_gaps(*pair), list(zip(jds, resumes)))
+
+
+def bench_ats_scorer(size: int, length: int) -> Dict[str, Any]:
+    from app.engines.resume_text import dict_to_text
+    from app.engines.registry import engines
+    gap_analyzer = engines.get("gap_analyzer")
+    scorer = engines.get("ats_scorer")
+    jd_data = {"primary_skills": ["python", "aws", "docker", "kubernetes"]}
+    cases = []
+    for jd, resume in zip(jd_corpus(size, n_sentences=8 * length), resume_corpus(size, n_jobs=3 * length)):
+        cases.append((resume, gap_analyzer.analyze_gaps(jd, dict_to_text(resume))))
+    return _time_calls(lambda case: scorer.score_resume(case[0], jd_data, case[1]), cases)
+
+
+def bench_pdf_generator(size: int, length: int) -> Dict[str, Any]:
+    # The in-process generator, i.e. the work each render-pool process does per request
+    from app.engines.pdf_generator import PDFGenerator
+    generator = PDFGenerator()
+    return _time_calls(generator.generate, resume_corpus(size, n_jobs=3 * length))
+
+
+def bench_enhance(size: int, length: int, preset: str) -> Dict[str, Any]:
+    from app.engines.registry import engines
+    generator = engines.get("content_generator")
+    if preset != "heuristic" and generator.model is None:
+        raise RuntimeError("T5 model is not available; model mode cannot be benchmarked")
+    jd_context = {"role": "Backend Engineer", "primary_skills": ["python", "aws"]}
+    cache = generator.cache
+    # Measure generation, not the result cache: swap in a private memory-only
+    # cache and empty it before every call so the shared sqlite tier is untouched
+    generator.cache = TieredCache(LRUCache(max_entries=1))
+    try:
+        def call(text):
+            generator.cache.memory.clear()
+            return generator.enhance_bullet(text, jd_context, preset=preset)
+        return _time_calls(call, bullet_corpus(size))
+    finally:
+        generator.cache = cache
+
+
+_corpora: Dict[Any, Any] = {}
+
+
+def _built_corpus(size: int, length: int):
+    """A ResumeCorpus of `size` synthetic resumes in a temp dir, built once per size/length."""
+    if (size, length) not in _corpora:
+        from app.core.config import settings
+        from app.engines.resume_corpus import ResumeCorpus
+        settings.RESUME_CORPUS_DIR = tempfile.mkdtemp(prefix="bench-corpus-")
+        corpus = ResumeCorpus()
+        batch = settings.RESUME_CORPUS_MAX_INGEST
+        started = time.perf_counter()
+        for start in range(0, size, batch):
+            resumes = resume_corpus(min(batch, size - start), seed=start, n_jobs=3 * length)
+            corpus.add([(f"r{start + i}", r) for i, r in enumerate(resumes)])
+        corpus.flush()
+        _corpora[(size, length)] = (corpus, time.perf_counter() - started)
+    return _corpora[(size, length)]
+
+
+def bench_corpus_add(size: int, length: int) -> Dict[str, Any]:
+    _, wall = _built_corpus(size, length)
+    return {"count": size, "wall_ms": wall * 1000.0, "throughput_per_s": size / wall if wall else 0.0}
+
+
+def bench_corpus_search(size: int, length: int) -> Dict[str, Any]:
+    from app.engines.registry import engines
+    corpus, _ = _built_corpus(size, length)
+    gap_analyzer = engines.get("gap_analyzer")
+    queries = [gap_analyzer.vectorize(jd) for jd in jd_corpus(50, n_sentences=8 * length)]
+    return _time_calls(lambda jd_vec: corpus.search(jd_vec, top_k=20), queries)
+
+
+BENCHMARKS = {
+    "jd_intelligence.analyze": bench_jd_analyze,
+    "jd_intelligence.analyze_many": bench_jd_analyze_many,
+    "gap_analyzer.analyze_gaps": bench_gap_analyzer,
+    "ats_scorer.score_resume": bench_ats_scorer,
+    "pdf_generator.generate": bench_pdf_generator,
+    "resume_corpus.add": bench_corpus_add,
+    "resume_corpus.search": bench_corpus_search,
+    "content_generator.enhance_bullet[heuristic]": lambda size, length: bench_enhance(size, length, "heuristic"),
+    "content_generator.enhance_bullet[model]": lambda size, length: bench_enhance(size, length, None),
+}
+
+# Model generation is orders of magnitude slower; cap its corpus size separately
+SLOW_BENCHMARKS = {"content_generator.enhance_bullet[model]", "pdf_generator.generate"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine micro-benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Corpus sizes (documents)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 4], help="Document length multipliers")
+    parser.add_argument("--slow-max-size", type=int, default=50, help="Size cap for model/PDF benchmarks")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks whose name contains one of these")
+    parser.add_argument("--output", default="benchmarks/results/engines.json")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    rows = []
+    for name, bench in BENCHMARKS.items():
+        if args.only and not any(o in name for o in args.only):
+            continue
+        for length in args.lengths:
+            for size in args.sizes:
+                if name in SLOW_BENCHMARKS:
+                    size = min(size, args.slow_max_size)
+                key = f"{name}/size={size}/length={length}"
+                if key in results:
+                    continue
+                try:
+                    summary = bench(size, length)
+                except Exception as e:
+                    summary = {"skipped": str(e)}
+                results[key] = summary
+                rows.append({"benchmark": key, **summary})
+                print(f"{key}: {summary}", file=sys.stderr)
+
+    print_table(rows, ["benchmark", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "skipped"])
+    write_results(args.output, "engines", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Latency and output comparison across content-generation tiers.
+
+    python -m benchmarks.generation_tiers --backends torch torch-int8 --size 50
+
+Every (backend, preset) pair enhances the same bullets with the result cache
+bypassed. Outputs are compared with the torch/quality reference per bullet
+(token Jaccard similarity) so faster tiers can be judged on what they give up.
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List
+
+from app.core.cache import LRUCache, TieredCache
+from app.core.config import settings
+from benchmarks.common import print_table, summarize, write_results
+from benchmarks.corpus import bullet_corpus
+
+REFERENCE = "torch/quality"
+JD_CONTEXT = {"role": "Backend Engineer", "primary_skills": ["python", "aws", "docker"]}
+
+
+def load_generator(backend: str):
+    from app.engines.content_generator import AIContentGenerator
+    settings.INFERENCE_BACKEND = backend
+    generator = AIContentGenerator()
+    if generator.model is None:
+        raise RuntimeError("T5 model is not available")
+    if generator.backend != backend:
+        raise RuntimeError(f"backend '{backend}' unavailable (fell back to '{generator.backend}')")
+    # Measure generation, not the result cache
+    generator.cache = TieredCache(LRUCache(max_entries=1))
+    return generator
+
+
+def run_tier(generator, preset: str, bullets: List[str]) -> Dict[str, Any]:
+    outputs, latencies = [], []
+    started = time.perf_counter()
+    for text in bullets:
+        generator.cache.memory.clear()
+        t0 = time.perf_counter()
+        outputs.append(generator.enhance_bullet(text, JD_CONTEXT, preset=preset))
+        latencies.append(time.perf_counter() - t0)
+    return {"summary": summarize(latencies, time.perf_counter() - started), "outputs": outputs}
+
+
+def _tokens(variants: List[str]) -> set:
+    return {t for v in variants for t in v.casefold().split()}
+
+
+def similarity(outputs: List[List[str]], reference: List[List[str]]) -> float:
+    """Mean token Jaccard similarity between a tier's variants and the reference variants."""
+    scores = []
+    for ours, ref in zip(outputs, reference):
+        a, b = _tokens(ours), _tokens(ref)
+        scores.append(len(a & b) / len(a | b) if a | b else 1.0)
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def output_stats(outputs: List[List[str]]) -> Dict[str, float]:
+    variants = [v for vs in outputs for v in vs]
+    return {
+        "mean_words": sum(len(v.split()) for v in variants) / len(variants) if variants else 0.0,
+        "distinct_variant_ratio": (
+            sum(len(set(vs)) for vs in outputs) / len(variants) if variants else 0.0
+        ),
+    }
+
+
+def main(argv=None):
+    from app.engines.content_generator import GENERATION_PRESETS, HEURISTIC_PRESET
+
+    parser = argparse.ArgumentParser(description="Content generation tier benchmark")
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--presets", nargs="+", default=[HEURISTIC_PRESET, *GENERATION_PRESETS])
+    parser.add_argument("--size", type=int, default=50, help="Bullets per tier")
+    parser.add_argument("--samples", type=int, default=3, help="Example outputs kept per tier")
+    parser.add_argument("--output", default="benchmarks/results/generation_tiers.json")
+    args = parser.parse_args(argv)
+
+    bullets = bullet_corpus(args.size)
+    results: Dict[str, Any] = {}
+    outputs: Dict[str, List[List[str]]] = {}
+    for backend in args.backends:
+        try:
+            generator = load_generator(backend)
+        except Exception as e:
+            results[backend] = {"skipped": str(e)}
+            print(f"{backend}: skipped ({e})", file=sys.stderr)
+            continue
+        for preset in args.presets:
+            # The heuristic tier never touches the model, so it is the same for every backend
+            key = preset if preset == HEURISTIC_PRESET else f"{backend}/{preset}"
+            if key in outputs:
+                continue
+            run = run_tier(generator, preset, bullets)
+            outputs[key] = run["outputs"]
+            results[key] = {
+                **run["summary"],
+                **output_stats(run["outputs"]),
+                "samples": [{"input": b, "variants": o} for b, o in zip(bullets, run["outputs"])][:args.samples],
+            }
+            print(f"{key}: {run['summary']}", file=sys.stderr)
+
+    reference = outputs.get(REFERENCE)
+    rows = []
+    for key, result in results.items():
+        if reference is not None and key in outputs:
+            result["similarity_to_reference"] = similarity(outputs[key], reference)
+        rows.append({"tier": key, **result})
+
+    print_table(rows, ["tier", "mean_ms", "p50_ms", "p95_ms", "mean_words", "distinct_variant_ratio",
+                       "similarity_to_reference", "skipped"])
+    write_results(args.output, "generation_tiers", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Concurrent HTTP load driver for a running server.
+
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 1 8 32 --requests 200
+    python -m benchmarks.load --scenarios resume_score --background download_pdf --background-concurrency 16
+
+Every scenario is replayed at each concurrency level by a pool of client threads
+sharing one request budget. Latency percentiles are computed over successful
+responses; non-2xx statuses and transport errors are counted separately.
+--background keeps another scenario running at a fixed concurrency for the whole
+run, e.g. to check that interactive p99 stays flat while exports saturate their
+lane; its status counts are reported under "background".
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import print_table, summarize, write_results
+from benchmarks.corpus import bullet_corpus, jd_corpus, resume_corpus
+
+API_PREFIX = "/api/v1"
+
+
+def _jd_content(text: str) -> Dict[str, Any]:
+    return {"role": "Backend Engineer", "primary_skills": ["python", "aws", "docker"], "text": text}
+
+
+def build_scenarios(seed: int) -> Dict[str, Callable[[random.Random], tuple]]:
+    """Each scenario returns (method, path, body) for one request."""
+    jds = jd_corpus(64, seed=seed)
+    resumes = resume_corpus(64, seed=seed)
+    bullets = bullet_corpus(64, seed=seed)
+    return {
+        "jd_analyze": lambda rng: ("POST", "/jds/analyze", {"text": rng.choice(jds)}),
+        "resume_score": lambda rng: ("POST", "/resumes/score", {
+            "resume_content": rng.choice(resumes),
+            "jd_content": _jd_content(rng.choice(jds)),
+        }),
+        "enhance_content": lambda rng: ("POST", "/resumes/enhance-content", {
+            "text": rng.choice(bullets),
+            "jd_context": {"role": "Backend Engineer", "primary_skills": ["python", "aws"]},
+        }),
+        "download_pdf": lambda rng: ("POST", "/resumes/download-pdf", {
+            "content": rng.choice(resumes),
+            "title": "Resume",
+        }),
+    }
+
+
+def _send(base_url: str, method: str, path: str, body: Any, timeout: float) -> int:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(
+        base_url + API_PREFIX + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def run_scenario(base_url: str, scenario: Callable, concurrency: int, total: int,
+                 timeout: float, seed: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    remaining = [total]
+
+    def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            method, path, body = scenario(rng)
+            t0 = time.perf_counter()
+            try:
+                status = _send(base_url, method, path, body, timeout)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - t0
+            with lock:
+                statuses[str(status)] += 1
+                if isinstance(status, int) and 200 <= status < 300:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary["statuses"] = dict(statuses)
+    summary["errors"] = sum(n for s, n in statuses.items() if not s.startswith("2"))
+    return summary
+
+
+def run_background(base_url: str, scenario: Callable, concurrency: int, timeout: float,
+                   seed: int, stop: threading.Event) -> Counter:
+    """Replay `scenario` until `stop` is set; returns its status counts once every thread has exited."""
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + 500 + worker_id)
+        while not stop.is_set():
+            method, path, body = scenario(rng)
+            try:
+                status = _send(base_url, method, path, body, timeout)
+            except Exception as e:
+                status = type(e).__name__
+            with lock:
+                statuses[str(status)] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    stop.wait()
+    for t in threads:
+        t.join()
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load driver")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--scenarios", nargs="*", help="Subset of scenarios to run")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--background", help="Scenario kept running at --background-concurrency throughout")
+    parser.add_argument("--background-concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/load.json")
+    args = parser.parse_args(argv)
+
+    scenarios = build_scenarios(args.seed)
+    selected = args.scenarios or list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if args.background and args.background not in scenarios:
+        unknown.add(args.background)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {}
+    rows = []
+    stop = threading.Event()
+    background_statuses: List[Counter] = []
+    background = None
+    if args.background:
+        background = threading.Thread(target=lambda: background_statuses.append(run_background(
+            args.base_url, scenarios[args.background], args.background_concurrency, args.timeout, args.seed, stop
+        )), daemon=True)
+        background.start()
+    for name in selected:
+        for concurrency in args.concurrency:
+            key = f"{name}/concurrency={concurrency}"
+            summary = run_scenario(args.base_url, scenarios[name], concurrency, args.requests, args.timeout, args.seed)
+            results[key] = summary
+            rows.append({"scenario": key, **summary})
+            print(f"{key}: {summary}", file=sys.stderr)
+
+    if background is not None:
+        stop.set()
+        background.join()
+        results["background"] = {"scenario": args.background, "statuses": dict(background_statuses[0])}
+        print(f"background: {results['background']}", file=sys.stderr)
+
+    print_table(rows, ["scenario", "count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms", "throughput_per_s"])
+    write_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
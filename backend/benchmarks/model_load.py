@@ -0,0 +1,83 @@
+"""
+Cold-start time and memory of loading t5-small, with and without the model store.
+
+    python -m app.engines.model_store pull --store models
+    python -m benchmarks.model_load --store models --runs 3
+
+Each run loads the model in a fresh interpreter after transformers and torch
+are imported, so only the load itself is measured:
+
+    hub     T5ForConditionalGeneration.from_pretrained("t5-small") (hub cache)
+    store   load_t5_model: checksum-verified safetensors from the store, as the engine loads it
+
+RSS is reported right after loading and again after one generate() call,
+which pages in the memory-mapped weights it touches.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import print_table, write_results
+
+METHODS = ("hub", "store")
+
+LOADER = r"""
+import json, os, sys, time
+from app.core.metrics import process_memory
+from app.engines.model_store import ModelStore, T5_MODEL, load_t5_model
+from transformers import T5ForConditionalGeneration
+import torch
+
+method, root = sys.argv[1], sys.argv[2]
+rss = process_memory()["rss"]
+started = time.perf_counter()
+if method == "hub":
+    model = T5ForConditionalGeneration.from_pretrained(T5_MODEL)
+else:
+    model = load_t5_model(ModelStore(root))
+model.eval()
+loaded = time.perf_counter() - started
+loaded_rss = process_memory()["rss"] - rss
+with torch.no_grad():
+    model.generate(torch.tensor([[13, 8, 1]]), max_new_tokens=8)
+print(json.dumps({
+    "load_ms": loaded * 1000.0,
+    "rss_after_load_mb": loaded_rss / 1048576,
+    "rss_after_generate_mb": (process_memory()["rss"] - rss) / 1048576,
+}))
+"""
+
+
+def measure(method: str, store: str) -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-c", LOADER, method, store],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="t5-small cold-start load benchmark")
+    parser.add_argument("--store", required=True, help="Model store populated by app.engines.model_store pull")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per method")
+    parser.add_argument("--output", default="benchmarks/results/model_load.json")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    rows = []
+    for method in args.methods:
+        runs: List[Dict[str, float]] = [measure(method, args.store) for _ in range(args.runs)]
+        summary = {key: sum(r[key] for r in runs) / len(runs) for key in runs[0]}
+        results[method] = {"runs": runs, **summary}
+        rows.append({"method": method, **summary})
+        print(f"{method}: {summary}", file=sys.stderr)
+
+    print_table(rows, ["method", "load_ms", "rss_after_load_mb", "rss_after_generate_mb"])
+    write_results(args.output, "model_load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Latency and allocations of /score with and without the shared ResumeDocument.
+
+    python -m benchmarks.resume_document --size 500 --lengths 1 4
+
+"dict" replays the pipeline where every engine receives the raw resume dict
+and the gap analyzer flattens and tokenizes it on its own; "document" parses
+one ResumeDocument and passes it to every engine, as /score does. Both run
+the gap, ATS and interviewer engines against a pre-vectorized JD. Latency is
+measured with tracemalloc off; a second pass records each call's peak traced
+memory.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import print_table, summarize, write_results
+from benchmarks.corpus import jd_corpus, resume_corpus
+
+JD_CONTENT = {"primary_skills": ["python", "aws", "docker", "kubernetes"]}
+
+
+def pipelines() -> Dict[str, Callable[[dict, Any], dict]]:
+    from app.engines.registry import engines
+    from app.engines.resume_document import ResumeDocument
+    from app.engines.resume_text import dict_to_text
+
+    gap_analyzer = engines.get("gap_analyzer")
+    ats_scorer = engines.get("ats_scorer")
+    interviewer_simulator = engines.get("interviewer_simulator")
+
+    def score_dict(resume: dict, jd_vec) -> dict:
+        gaps = gap_analyzer.compare(jd_vec, gap_analyzer.vectorize(dict_to_text(resume)))
+        return {
+            "ats_score": ats_scorer.score_resume(resume, JD_CONTENT, gaps),
+            "gap_analysis": gaps,
+            "interviewer_simulation": interviewer_simulator.simulate_scan(resume),
+        }
+
+    def score_document(resume: dict, jd_vec) -> dict:
+        document = ResumeDocument(resume)
+        gaps = gap_analyzer.compare(jd_vec, gap_analyzer.vectorize_resume(document))
+        return {
+            "ats_score": ats_scorer.score_resume(document, JD_CONTENT, gaps),
+            "gap_analysis": gaps,
+            "interviewer_simulation": interviewer_simulator.simulate_scan(document),
+        }
+
+    return {"dict": score_dict, "document": score_document}
+
+
+def run(fn: Callable[[dict, Any], dict], cases: List[tuple], warmup: int = 5) -> Dict[str, Any]:
+    for resume, jd_vec in cases[:warmup]:
+        fn(resume, jd_vec)
+
+    latencies = []
+    started = time.perf_counter()
+    for resume, jd_vec in cases:
+        t0 = time.perf_counter()
+        fn(resume, jd_vec)
+        latencies.append(time.perf_counter() - t0)
+    summary = summarize(latencies, time.perf_counter() - started)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for resume, jd_vec in cases:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(resume, jd_vec)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    summary["mean_peak_kib"] = sum(peaks) / len(peaks) / 1024.0
+    summary["max_peak_kib"] = max(peaks) / 1024.0
+    return summary
+
+
+def main(argv=None):
+    from app.engines.registry import engines
+
+    parser = argparse.ArgumentParser(description="ResumeDocument vs raw dict scoring benchmark")
+    parser.add_argument("--size", type=int, default=500, help="Resumes per run")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 4], help="Document length multipliers")
+    parser.add_argument("--output", default="benchmarks/results/resume_document.json")
+    args = parser.parse_args(argv)
+
+    gap_analyzer = engines.get("gap_analyzer")
+    results: Dict[str, Any] = {}
+    rows = []
+    for length in args.lengths:
+        jd_vecs = [gap_analyzer.vectorize(jd) for jd in jd_corpus(args.size, n_sentences=8 * length)]
+        cases = list(zip(resume_corpus(args.size, n_jobs=3 * length), jd_vecs))
+        for name, fn in pipelines().items():
+            key = f"{name}/length={length}"
+            results[key] = run(fn, cases)
+            rows.append({"pipeline": key, **results[key]})
+            print(f"{key}: {results[key]}", file=sys.stderr)
+
+    print_table(rows, ["pipeline", "count", "mean_ms", "p50_ms", "p95_ms", "mean_peak_kib", "max_peak_kib"])
+    write_results(args.output, "resume_document", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
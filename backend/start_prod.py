@@ -1,13 +1,151 @@
-import uvicorn
+import gc
 import os
+import signal
+import socket
+import sys
+import time
 
-if __name__ == "__main__":
-    # Production start script for Render
-    # Uses uvicorn directly without Windows-specific port management
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=int(os.environ.get("PORT", 8000)),
-        workers=1,
-        reload=False  # Disable reload in production
+import uvicorn
+
+# Production start script for Render.
+#
+# On POSIX the models are loaded once in this master process and the web
+# workers are fork()ed from it, so T5/spaCy weights are shared copy-on-write
+# instead of being loaded again by every worker. Elsewhere (or with a single
+# worker) it falls back to a plain uvicorn.run().
+
+HOST = "0.0.0.0"
+MB = 1024 * 1024
+
+
+def available_memory() -> int:
+    """MemAvailable in bytes, or 0 when it cannot be determined."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def size_workers(settings, shared_bytes: int) -> int:
+    """Explicit WEB_WORKERS wins; otherwise one per CPU, capped by what the memory budget can hold."""
+    if settings.WEB_WORKERS > 0:
+        return settings.WEB_WORKERS
+    cpus = os.cpu_count() or 1
+    budget = settings.WEB_MEMORY_BUDGET_MB * MB or available_memory()
+    if not budget:
+        return cpus
+    per_worker = max(1, settings.WEB_WORKER_MEMORY_MB) * MB
+    return max(1, min(cpus, (budget - shared_bytes) // per_worker))
+
+
+def format_memory(usage) -> str:
+    return " ".join(f"{k}={v / MB:.1f}MB" for k, v in usage.items())
+
+
+def run_worker(app, sock: socket.socket, workers: int):
+    from app.core.metrics import process_memory
+    from app.engines.governor import configure_torch_threads
+
+    # Workers exit on SIGTERM/SIGINT through uvicorn's own handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    configure_torch_threads(workers)
+    print(f"[worker {os.getpid()}] started, {format_memory(process_memory())}", flush=True)
+    config = uvicorn.Config(app, proxy_headers=True, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_forked(port: int):
+    from app.core.config import settings
+
+    # Every worker keeps its own counters; merge them through a shared snapshot dir
+    if not settings.METRICS_MULTIPROC_DIR:
+        settings.METRICS_MULTIPROC_DIR = os.path.abspath(os.path.join("cache", "metrics"))
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    for name in os.listdir(settings.METRICS_MULTIPROC_DIR):
+        if name.endswith(".json"):
+            os.remove(os.path.join(settings.METRICS_MULTIPROC_DIR, name))
+
+    from app.core.metrics import process_memory
+    from app.engines.registry import engines
+    from app.main import app
+
+    started = time.perf_counter()
+    engines.warm_up(engines.fork_safe_names())
+    # Keep the loaded objects out of future GC passes; otherwise the collector
+    # touches their headers in each worker and un-shares the pages
+    gc.collect()
+    gc.freeze()
+    master_memory = process_memory()
+    workers = size_workers(settings, master_memory["rss"])
+    print(
+        f"[master {os.getpid()}] engines preloaded in {time.perf_counter() - started:.1f}s, "
+        f"{format_memory(master_memory)}; forking {workers} workers",
+        flush=True,
     )
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(app, sock, workers)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    # Supervise: replace workers that die unexpectedly, exit once all are gone after a stop
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"[master] worker {pid} exited with status {status}; restarting", flush=True)
+            time.sleep(1)  # Don't spin if a worker crashes on startup
+            spawn()
+    sock.close()
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 8000))
+    if hasattr(os, "fork") and sys.platform != "win32":
+        serve_forked(port)
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=HOST,
+            port=port,
+            workers=1,
+            reload=False  # Disable reload in production
+        )